@@ -0,0 +1,81 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+# 앱 전체 로깅. 호출한 쪽(UI 스레드)은 큐에 레코드만 넣고,
+# 실제 stdout/파일 쓰기는 QueueListener 스레드가 맡는다.
+# 레벨은 환경 변수 MP3PLAYER_LOG 또는 --log 로 정한다.
+#   MP3PLAYER_LOG=debug                         전체 debug
+#   MP3PLAYER_LOG=info,temp9=debug,gapless=warning  기본 info + 모듈별 레벨
+# 매 프레임/매 틱 호출되는 곳은 debug 로만 남기므로 기본 레벨(info)에서는 아무것도 쓰지 않는다.
+ROOT_LOGGER = "mp3player"
+ENV_VAR = "MP3PLAYER_LOG"
+DEFAULT_SPEC = "info"
+LOG_FORMAT = "%(asctime)s %(levelname).1s %(name)s: %(message)s"
+
+_listener = None
+_module_loggers = set()
+
+
+def get_logger(name):
+    # 모듈 이름 그대로 넘긴다 (예: get_logger("temp9"))
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def parse_spec(spec):
+    # "info,temp9=debug" -> (INFO, {"temp9": DEBUG})
+    level = logging.INFO
+    modules = {}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, value = part.rpartition("=")
+        value = logging.getLevelName(value.strip().upper())
+        if not isinstance(value, int):
+            raise ValueError(f"알 수 없는 로그 레벨: {part}")
+        if name:
+            modules[name.strip()] = value
+        else:
+            level = value
+    return level, modules
+
+
+def setup_logging(spec=None, stream=None):
+    # 다시 부르면 이전 리스너를 멈추고(남은 레코드는 모두 쓴 뒤) 새 설정으로 바꾼다
+    global _listener
+    if spec is None:
+        spec = os.environ.get(ENV_VAR, DEFAULT_SPEC)
+    level, modules = parse_spec(spec)
+    shutdown_logging()
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, "%H:%M:%S"))
+    records = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(records, handler)
+    _listener.start()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = [logging.handlers.QueueHandler(records)]
+    root.setLevel(level)
+    root.propagate = False
+    for name in _module_loggers - set(modules):
+        get_logger(name).setLevel(logging.NOTSET)
+    for name, module_level in modules.items():
+        get_logger(name).setLevel(module_level)
+    _module_loggers.clear()
+    _module_loggers.update(modules)
+    return root
+
+
+def shutdown_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,174 @@
+import random
+import statistics
+import sys
+
+from PyQt5 import QtCore
+from PyQt5.QtMultimedia import QMediaPlayer
+
+from app_log import get_logger
+
+# 뮤직비디오 모드의 오디오/비디오 동기화. 타이머로 두 플레이어의 위치 차이(drift)를 계속 재고,
+# 작은 차이는 비디오 재생 속도를 조금 바꿔 따라잡게 하고, 큰 차이에만 setPosition 으로 점프한다.
+# 오디오가 기준 시계이므로 오디오 쪽은 건드리지 않는다.
+log = get_logger("av_sync")
+
+SYNC_INTERVAL_MS = 200
+DEADBAND_MS = 40  # 이 안쪽이면 정상 속도
+SEEK_THRESHOLD_MS = 500  # 이보다 크면 강제 탐색 (속도 보정으로는 너무 오래 걸림)
+RATE_GAIN = 1 / 1000  # drift 1 ms 당 속도 보정량 (50 ms 차이 -> 5%)
+MAX_RATE_DELTA = 0.05  # 재생 속도는 0.95 ~ 1.05 로 제한
+
+
+def drift_stats(samples, seeks):
+    if not samples:
+        return {"samples": 0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0, "seeks": seeks}
+    ordered = sorted(samples)
+    return {
+        "samples": len(samples),
+        "mean_ms": statistics.mean(ordered),
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max_ms": ordered[-1],
+        "seeks": seeks,
+    }
+
+
+def correction_rate(drift):
+    # drift = 비디오 - 오디오 (ms). 비디오가 앞서면 느리게, 뒤처지면 빠르게.
+    if abs(drift) <= DEADBAND_MS:
+        return 1.0
+    delta = max(-MAX_RATE_DELTA, min(MAX_RATE_DELTA, drift * RATE_GAIN))
+    return round(1.0 - delta, 3)
+
+
+class AVSyncController(QtCore.QObject):
+    def __init__(self, audio_player, video_player, interval=SYNC_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.audio_player = audio_player
+        self.video_player = video_player
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.tick)
+        self.track = None
+        self.rate = 1.0
+        self.samples = []
+        self.seeks = 0
+        self.history = []  # 곡별 통계 (track, stats)
+
+    def start(self, track):
+        if self.track != track:
+            self.finish_track()
+            self.set_rate(1.0)
+            self.track = track
+        self.timer.start()
+
+    def stop(self):
+        # 가사 모드로 돌아가거나 곡이 바뀔 때. 현재 곡 통계를 남기고 속도를 되돌린다.
+        self.timer.stop()
+        self.finish_track()
+        self.set_rate(1.0)
+
+    def finish_track(self):
+        if self.track is not None and self.samples:
+            stats = drift_stats(self.samples, self.seeks)
+            self.history.append((self.track, stats))
+            log.info("AV 동기화 (%s): 측정 %d회, 평균 %.0f ms, p95 %.0f ms, 최대 %.0f ms, 강제 탐색 %d회",
+                     self.track, stats["samples"], stats["mean_ms"], stats["p95_ms"], stats["max_ms"],
+                     stats["seeks"])
+        self.track = None
+        self.samples = []
+        self.seeks = 0
+
+    def stats(self):
+        return drift_stats(self.samples, self.seeks)
+
+    def set_rate(self, rate):
+        if rate != self.rate:
+            self.rate = rate
+            self.video_player.setPlaybackRate(rate)
+
+    def tick(self):
+        if (self.audio_player.state() != QMediaPlayer.PlayingState
+                or self.video_player.state() != QMediaPlayer.PlayingState):
+            return
+        audio_position = self.audio_player.position()
+        drift = self.video_player.position() - audio_position
+        self.samples.append(abs(drift))
+        if abs(drift) > SEEK_THRESHOLD_MS:
+            self.seeks += 1
+            self.video_player.setPosition(audio_position)
+            self.set_rate(1.0)
+            log.debug("AV 동기화 탐색: drift=%d ms", drift)
+        else:
+            self.set_rate(correction_rate(drift))
+
+
+class SimulatedPlayer:
+    # 벤치마크용 시계. 재생 속도에 오차(skew)와 잡음(jitter)이 있고, 탐색하면 잠깐 멈춘다.
+    def __init__(self, skew=0.0, jitter_ms=0.0, seek_stall_ms=0.0, rng=None):
+        self.clock = 0.0
+        self.rate = 1.0
+        self.skew = skew
+        self.jitter_ms = jitter_ms
+        self.seek_stall_ms = seek_stall_ms
+        self.stall = 0.0
+        self.rng = rng or random.Random(0)
+
+    def advance(self, ms):
+        if self.stall > 0:
+            used = min(self.stall, ms)
+            self.stall -= used
+            ms -= used
+        self.clock += ms * self.rate * (1 + self.skew) + self.rng.gauss(0, self.jitter_ms)
+
+    def position(self):
+        return int(self.clock)
+
+    def setPosition(self, position):
+        self.clock = float(position)
+        self.stall = self.seek_stall_ms
+
+    def setPlaybackRate(self, rate):
+        self.rate = rate
+
+    def state(self):
+        return QMediaPlayer.PlayingState
+
+
+def _simulate(policy, seconds, skew, jitter_ms, seed):
+    rng = random.Random(seed)
+    audio = SimulatedPlayer()
+    video = SimulatedPlayer(skew=skew, jitter_ms=jitter_ms, seek_stall_ms=150, rng=rng)
+    controller = AVSyncController(audio, video)
+    samples = []
+    seeks = 0
+    step_ms = 10
+    for now in range(0, seconds * 1000, step_ms):
+        audio.advance(step_ms)
+        video.advance(step_ms)
+        # 한 번씩 디코더가 밀리는 상황 (키프레임, 시스템 부하)
+        if rng.random() < 0.0005:
+            video.stall += rng.uniform(200, 1500)
+        if now % SYNC_INTERVAL_MS == 0:
+            if policy == "legacy":
+                # 기존 방식: 비디오 positionChanged(약 1초 간격)에서 500 ms 넘으면 탐색
+                if now % 1000 == 0 and abs(video.position() - audio.position()) > 500:
+                    video.setPosition(audio.position())
+                    seeks += 1
+            else:
+                controller.tick()
+            samples.append(abs(video.position() - audio.position()))
+    if policy != "legacy":
+        seeks = controller.seeks
+    return drift_stats(samples, seeks)
+
+
+def _benchmark(seconds=240, skew=0.01, jitter_ms=3.0):
+    # 재생 백엔드 없이 시계 모델로 기존 방식과 컨트롤러의 drift/탐색 횟수를 비교한다
+    for policy in ("legacy", "controller"):
+        stats = _simulate(policy, seconds, skew, jitter_ms, seed=1)
+        print(f"{policy}: 평균 {stats['mean_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms, "
+              f"최대 {stats['max_ms']:.0f} ms, 강제 탐색 {stats['seeks']}회 ({seconds}초, 속도 오차 {skew:+.1%})")
+
+
+if __name__ == "__main__":
+    _benchmark(skew=float(sys.argv[1]) if len(sys.argv) > 1 else 0.01)
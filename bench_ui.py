@@ -0,0 +1,324 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+from app_log import setup_logging, shutdown_logging
+
+# UI 벤치마크 스크립트. music/thumbnail 폴더가 있는 곳에서 실행한다.
+#   python bench_ui.py drag --tiles 7
+#   python bench_ui.py inertia --carousel painter
+#   python bench_ui.py cpu
+#   python bench_ui.py prefetch --prefetch 6
+#   python bench_ui.py progress
+#   python bench_ui.py logging
+#   python bench_ui.py modeswitch [--no-preroll]
+
+
+def report(name, samples_ms):
+    if not samples_ms:
+        print(f"{name}: 측정값 없음")
+        return
+    ordered = sorted(samples_ms)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name}: {len(samples_ms)}프레임, 평균 {statistics.mean(samples_ms):.2f} ms, "
+          f"p95 {p95:.2f} ms, 최대 {ordered[-1]:.2f} ms")
+
+
+def send_mouse(widget, kind, x, button=QtCore.Qt.LeftButton):
+    buttons = QtCore.Qt.NoButton if kind == QtCore.QEvent.MouseButtonRelease else button
+    event = QtGui.QMouseEvent(kind, QtCore.QPointF(x, 80), button, buttons, QtCore.Qt.NoModifier)
+    QtWidgets.QApplication.sendEvent(widget, event)
+
+
+def wait_for_library(app, window, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        if window.scan_task is None or window.songs_list and window.library_index.last_scan_stats:
+            break
+        time.sleep(0.01)
+
+
+def bench_drag(app, window, args):
+    # 왼쪽/오른쪽으로 왕복 드래그하면서 이벤트 처리 + 다시 그리기 시간을 잰다
+    widget = window.thumbnail_widget
+    if not window.thumbnail_visible:
+        window.toggle_thumbnails()
+    app.processEvents()
+    frames = []
+    x = widget.width() // 2
+    send_mouse(widget, QtCore.QEvent.MouseButtonPress, x)
+    for step in range(args.frames):
+        direction = -1 if (step // 100) % 2 == 0 else 1
+        x += direction * args.step
+        start = time.perf_counter()
+        send_mouse(widget, QtCore.QEvent.MouseMove, x)
+        widget.on_frame()
+        widget.repaint()
+        frames.append((time.perf_counter() - start) * 1000)
+    send_mouse(widget, QtCore.QEvent.MouseButtonRelease, x)
+    report(f"드래그 ({window.carousel_mode}, 타일 {window.visible_tiles}개, 곡 {len(window.songs_list)}개)", frames)
+
+
+def bench_inertia(app, window, args):
+    # 빠르게 던진 뒤 관성 스크롤이 끝날 때까지 프레임 비용과 FPS 를 잰다
+    widget = window.thumbnail_widget
+    if not window.thumbnail_visible:
+        window.toggle_thumbnails()
+    app.processEvents()
+    frames = []
+    original = widget.on_frame
+
+    def timed_frame():
+        start = time.perf_counter()
+        original()
+        widget.repaint()
+        frames.append((time.perf_counter() - start) * 1000)
+
+    widget.frame_timer.timeout.disconnect()
+    widget.frame_timer.timeout.connect(timed_frame)
+    x = widget.width() - 20
+    send_mouse(widget, QtCore.QEvent.MouseButtonPress, x)
+    for _ in range(5):
+        x -= 40
+        send_mouse(widget, QtCore.QEvent.MouseMove, x)
+    widget.velocity = -args.fling
+    send_mouse(widget, QtCore.QEvent.MouseButtonRelease, x)
+    start = time.perf_counter()
+    while widget.frame_timer.isActive() and time.perf_counter() - start < 30:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+    elapsed = time.perf_counter() - start
+    report(f"관성 스크롤 ({window.carousel_mode})", frames)
+    if frames and elapsed > 0:
+        print(f"  실제 {len(frames) / elapsed:.1f} fps, "
+              f"프레임 비용 기준 최대 {1000 / statistics.mean(frames):.0f} fps")
+
+
+def measure_cpu(app, seconds, tick=None):
+    # 주어진 시간 동안 이벤트 루프를 돌리며 프로세스 CPU 사용률을 잰다
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    next_tick = wall_start
+    while time.perf_counter() - wall_start < seconds:
+        if tick is not None and time.perf_counter() >= next_tick:
+            tick()
+            next_tick += 1 / 60
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        time.sleep(0.001)
+    wall = time.perf_counter() - wall_start
+    return (time.process_time() - cpu_start) / wall * 100
+
+
+def bench_cpu(app, window, args):
+    # 캐러셀이 멈춰 있을 때와 드래그 중일 때의 CPU 사용률, 프레임 수
+    widget = window.thumbnail_widget
+    if not window.thumbnail_visible:
+        window.toggle_thumbnails()
+    if window.is_playing:
+        window.toggle_play_pause()  # 재생 타이머 영향 제외
+    app.processEvents()
+
+    frames_before = widget.frame_count
+    idle = measure_cpu(app, args.seconds)
+    print(f"정지 상태: CPU {idle:.1f}%, 프레임 {widget.frame_count - frames_before}개, "
+          f"프레임 타이머 {'동작' if widget.frame_timer.isActive() else '정지'}")
+
+    state = {"x": widget.width() // 2, "dir": -1}
+    send_mouse(widget, QtCore.QEvent.MouseButtonPress, state["x"])
+
+    def move():
+        state["x"] += state["dir"] * args.step
+        if not 20 < state["x"] < widget.width() - 20:
+            state["dir"] = -state["dir"]
+        # 한 프레임에 입력 이벤트 3개가 몰려도 다시 그리기는 한 번이다
+        for _ in range(3):
+            send_mouse(widget, QtCore.QEvent.MouseMove, state["x"])
+
+    frames_before = widget.frame_count
+    scrolling = measure_cpu(app, args.seconds, move)
+    send_mouse(widget, QtCore.QEvent.MouseButtonRelease, state["x"])
+    print(f"스크롤 중: CPU {scrolling:.1f}%, 프레임 {widget.frame_count - frames_before}개 "
+          f"({args.seconds:.0f}초, 입력 {int(args.seconds * 60 * 3)}개)")
+
+
+def bench_prefetch(app, window, args):
+    # 메모리 캐시를 비운 뒤 한 방향으로 스크롤하다가 반대로 돌아오면서 선읽기 적중률을 잰다
+    widget = window.thumbnail_widget
+    if not window.thumbnail_visible:
+        window.toggle_thumbnails()
+    window.pixmap_cache.clear()
+    app.processEvents()
+    before = window.pixmap_cache.stats()
+    x = widget.width() // 2
+    send_mouse(widget, QtCore.QEvent.MouseButtonPress, x)
+    for step in range(args.frames):
+        direction = -1 if step < args.frames // 2 else 1
+        x += direction * args.step
+        send_mouse(widget, QtCore.QEvent.MouseMove, x)
+        widget.on_frame()
+        deadline = time.perf_counter() + 1 / 60
+        while time.perf_counter() < deadline:
+            app.processEvents(QtCore.QEventLoop.AllEvents, 2)
+    send_mouse(widget, QtCore.QEvent.MouseButtonRelease, x)
+    after = window.pixmap_cache.stats()
+    lookups = (after["hits"] + after["misses"]) - (before["hits"] + before["misses"])
+    prefetch_hits = after["prefetch_hits"] - before["prefetch_hits"]
+    misses = after["misses"] - before["misses"]
+    prefetch = window.prefetcher.stats()
+    print(f"선읽기 (±{window.prefetcher.radius}칸): 조회 {lookups}회, 선읽기 적중 {prefetch_hits}회 "
+          f"({prefetch_hits / lookups if lookups else 0:.0%}), 동기 로드 {misses}회, "
+          f"요청 {prefetch['requested']}개, 취소 {prefetch['cancelled']}개")
+
+
+def bench_progress(app, window, args):
+    # 재생 중 진행 표시의 초당 호출(깨어남) 수와 실제 다시 그리기 수.
+    # 오프스크린에서는 재생 백엔드가 없을 수 있으므로 알림 간격대로 위치 시그널을 흉내 낸다.
+    player = window.audio_player
+    window.set_current_duration(window.current_duration or 180000)
+    state = {"position": 0, "last": time.perf_counter()}
+
+    def tick():
+        now = time.perf_counter()
+        state["position"] += int((now - state["last"]) * 1000)
+        state["last"] = now
+        player.positionChanged.emit(state["position"])
+
+    timer = QtCore.QTimer()
+    timer.timeout.connect(tick)
+
+    def run(label):
+        timer.start(player.notifyInterval())
+        updates, repaints = window.progress_updates, window.progress_repaints
+        start = time.perf_counter()
+        cpu = measure_cpu(app, args.seconds)
+        elapsed = time.perf_counter() - start
+        timer.stop()
+        print(f"{label}: 알림 간격 {player.notifyInterval()} ms, "
+              f"깨어남 {(window.progress_updates - updates) / elapsed:.1f}회/s, "
+              f"다시 그리기 {(window.progress_repaints - repaints) / elapsed:.1f}회/s, CPU {cpu:.1f}%")
+
+    run("창 표시")
+    window.hide()
+    app.processEvents()
+    run("창 숨김")
+    window.show()
+
+
+def bench_logging(app, window, args):
+    # 로그 레벨 info(기본)와 debug(자세히)에서 드래그 프레임, 재생 틱(진행 표시 + AV 동기화) 비용.
+    # 로그는 파일로 리다이렉트한 것처럼 임시 파일에 쓴다.
+    widget = window.thumbnail_widget
+    if not window.thumbnail_visible:
+        window.toggle_thumbnails()
+    window.set_current_duration(window.current_duration or 180000)
+    app.processEvents()
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as log_file:
+        for spec in ("info", "debug"):
+            setup_logging(spec, stream=log_file)
+            frames = []
+            x = widget.width() // 2
+            send_mouse(widget, QtCore.QEvent.MouseButtonPress, x)
+            for step in range(args.frames):
+                x += (-1 if (step // 100) % 2 == 0 else 1) * args.step
+                start = time.perf_counter()
+                send_mouse(widget, QtCore.QEvent.MouseMove, x)
+                widget.on_frame()
+                frames.append((time.perf_counter() - start) * 1000)
+            send_mouse(widget, QtCore.QEvent.MouseButtonRelease, x)
+
+            ticks = []
+            for step in range(args.frames):
+                position = step * 250
+                window.progress_state = None
+                start = time.perf_counter()
+                window.update_progress(position)
+                window.av_sync.tick()
+                ticks.append((time.perf_counter() - start) * 1000)
+            shutdown_logging()  # 리스너를 멈춰 남은 로그를 모두 쓴다
+            size = log_file.tell()
+            report(f"드래그 (로그 {spec})", frames)
+            report(f"재생 틱 (로그 {spec})", ticks)
+            print(f"  로그 누적 {size // 1024} KB")
+    setup_logging()
+
+
+def run_events(app, seconds, until=None):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline and not (until and until()):
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+
+
+def bench_modeswitch(app, window, args):
+    # 뮤직비디오가 있는 곡들을 돌아가며 재생하고, 곡이 시작된 뒤 가사 -> 비디오 모드로 바꿀 때
+    # 버튼 처리 시간과 영상이 실제로 재생되기 시작할 때까지의 지연을 잰다
+    def has_music_video(song):
+        mv_path = window.match_music_video(window.parse_song_info(song)[1])
+        return bool(mv_path) and os.path.exists(mv_path)
+
+    mv_songs = [i for i, song in enumerate(window.songs_list) if has_music_video(song)]
+    if not mv_songs:
+        print("뮤직비디오가 매칭되는 곡이 없습니다.")
+        return
+    calls = []
+    for switch in range(args.switches):
+        window.play_song(mv_songs[switch % len(mv_songs)])
+        run_events(app, 1.0)  # 곡 시작 후 가사 모드에서 MV 를 미리 여는 시간
+        start = time.perf_counter()
+        window.show_video_mode()
+        calls.append((time.perf_counter() - start) * 1000)
+        run_events(app, 5.0, lambda: window.mode_switch_started is None)
+        window.show_lyrics_mode()
+    report(f"show_video_mode 호출 (미리 열기 {'켬' if window.preroll_enabled else '끔'})", calls)
+    report("전환 -> 재생 시작 (미리 열림)", [ms for ms, warm in window.mode_switch_times if warm])
+    report("전환 -> 재생 시작 (새로 열기)", [ms for ms, warm in window.mode_switch_times if not warm])
+    stats = window.video_preroll.stats()
+    print(f"  미리 열림 {stats['warm']}회, 새로 열기 {stats['cold']}회, 메모리 상한으로 닫음 {stats['dropped']}회, "
+          f"RSS {stats['rss_mb']} MB")
+
+
+BENCHMARKS = {
+    "cpu": bench_cpu,
+    "prefetch": bench_prefetch,
+    "progress": bench_progress,
+    "drag": bench_drag,
+    "inertia": bench_inertia,
+    "logging": bench_logging,
+    "modeswitch": bench_modeswitch,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--tiles", type=int, default=5)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--step", type=int, default=9)
+    parser.add_argument("--carousel", choices=("widgets", "painter"), default="widgets")
+    parser.add_argument("--prefetch", type=int, default=4, help="선읽기 범위 (±칸)")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--fling", type=float, default=4000.0, help="관성 시작 속도 (px/s)")
+    parser.add_argument("--switches", type=int, default=10, help="모드 전환 반복 횟수")
+    parser.add_argument("--no-preroll", dest="preroll", action="store_false", help="뮤직비디오 미리 열기 끄기")
+    args = parser.parse_args()
+
+    setup_logging()
+    app = QtWidgets.QApplication(sys.argv[:1])
+    import temp9
+
+    window = temp9.MP3PlayerUI(visible_tiles=args.tiles, carousel_mode=args.carousel,
+                               prefetch_radius=args.prefetch, video_preroll=args.preroll, replaygain=False)
+    window.show()
+    wait_for_library(app, window)
+    if not window.songs_list:
+        print(f"{os.getcwd()}/music 에 곡이 없습니다.")
+        return
+    BENCHMARKS[args.benchmark](app, window, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+from PyQt5 import QtCore, QtGui
+
+from app_log import get_logger
+from workers import worker_pool
+
+# 배경 블러 파이프라인: 3회 박스 블러로 가우시안을 근사하고 NumPy 로 QImage 버퍼를
+# 직접 처리한다. QThreadPool 워커에서 실행되고 결과는 곡(썸네일)별로 메모리와
+# cache/backgrounds 에 저장된다.
+log = get_logger("blur")
+CACHE_DIR = os.path.join("cache", "backgrounds")
+BLUR_RADIUS = 15
+OVERLAY_ALPHA = 100
+
+
+def qimage_to_array(image):
+    # ARGB32 QImage -> (h, w, 4) uint8 배열 (복사본)
+    image = image.convertToFormat(QtGui.QImage.Format_ARGB32)
+    width, height = image.width(), image.height()
+    ptr = image.constBits()
+    ptr.setsize(image.byteCount())
+    rows = np.frombuffer(ptr, np.uint8).reshape(height, image.bytesPerLine())
+    return rows[:, :width * 4].reshape(height, width, 4).copy()
+
+
+def array_to_qimage(array):
+    array = np.ascontiguousarray(array, dtype=np.uint8)
+    height, width, _ = array.shape
+    image = QtGui.QImage(array.data, width, height, width * 4, QtGui.QImage.Format_ARGB32)
+    return image.copy()  # numpy 버퍼와 분리
+
+
+def box_sizes_for_gauss(sigma, passes=3):
+    # 박스 블러 n회로 표준편차 sigma 인 가우시안을 근사하는 박스 크기들
+    ideal = np.sqrt(12 * sigma * sigma / passes + 1)
+    lower = int(np.floor(ideal))
+    if lower % 2 == 0:
+        lower -= 1
+    upper = lower + 2
+    m = round((12 * sigma * sigma - passes * lower * lower - 4 * passes * lower - 3 * passes) / (-4 * lower - 4))
+    return [lower if i < m else upper for i in range(passes)]
+
+
+def box_blur_axis(data, radius, axis):
+    # 누적합으로 구간 평균을 구한다 (가장자리는 edge 패딩)
+    if radius <= 0:
+        return data
+    data = np.moveaxis(data, axis, 0)
+    length = data.shape[0]
+    padded = np.concatenate([np.repeat(data[:1], radius + 1, 0), data, np.repeat(data[-1:], radius, 0)])
+    summed = np.cumsum(padded, axis=0, dtype=np.float32)
+    blurred = (summed[2 * radius + 1:] - summed[:length]) * (1.0 / (2 * radius + 1))
+    return np.moveaxis(blurred, 0, axis)
+
+
+def gaussian_blur(array, sigma):
+    data = array.astype(np.float32)
+    for size in box_sizes_for_gauss(sigma):
+        radius = (size - 1) // 2
+        data = box_blur_axis(data, radius, 1)
+        data = box_blur_axis(data, radius, 0)
+    return data
+
+
+def blur_background(image, radius=BLUR_RADIUS, overlay_alpha=OVERLAY_ALPHA, downscale=4):
+    # QGraphicsBlurEffect(radius) 와 비슷한 세기로 흐리게 한 뒤 검은 반투명 오버레이를 합성.
+    # 강한 블러라 1/downscale 크기에서 처리하고 다시 키워도 차이가 보이지 않는다.
+    width, height = image.width(), image.height()
+    small = image.scaled(max(1, width // downscale), max(1, height // downscale),
+                         QtCore.Qt.IgnoreAspectRatio, QtCore.Qt.SmoothTransformation)
+    blurred = gaussian_blur(qimage_to_array(small), radius / 2.0 / downscale)
+    blurred[..., :3] *= 1.0 - overlay_alpha / 255.0
+    blurred[..., 3] = 255
+    result = array_to_qimage(np.clip(blurred + 0.5, 0, 255))
+    return result.scaled(width, height, QtCore.Qt.IgnoreAspectRatio, QtCore.Qt.SmoothTransformation)
+
+
+def cache_path(source, cache_dir=CACHE_DIR):
+    digest = hashlib.sha1(os.path.abspath(source).encode("utf-8", "surrogatepass")).hexdigest()[:20]
+    return os.path.join(cache_dir, f"{digest}_blur.jpg")
+
+
+class BlurSignals(QtCore.QObject):
+    ready = QtCore.pyqtSignal(str, QtGui.QImage)
+
+
+class BlurTask(QtCore.QRunnable):
+    def __init__(self, source, disk_cache, signals, cache_dir=CACHE_DIR):
+        super().__init__()
+        self.source = source
+        self.disk_cache = disk_cache
+        self.signals = signals
+        self.cache_dir = cache_dir
+
+    def run(self):
+        try:
+            source_mtime = os.stat(self.source).st_mtime_ns
+            path = cache_path(self.source, self.cache_dir)
+            if os.path.exists(path) and os.stat(path).st_mtime_ns == source_mtime:
+                image = QtGui.QImage(path)
+                if not image.isNull():
+                    self.signals.ready.emit(self.source, image)
+                    return
+            resized = self.disk_cache.get(self.source, 800, 600) if self.disk_cache else None
+            image = QtGui.QImage(resized or self.source)
+            if image.isNull():
+                self.signals.ready.emit(self.source, image)  # 빈 이미지: 실패를 알려 대기 목록에서 빼게 한다
+                return
+            if image.width() != 800 or image.height() != 600:
+                image = image.scaled(800, 600, QtCore.Qt.KeepAspectRatioByExpanding, QtCore.Qt.SmoothTransformation)
+                image = image.copy((image.width() - 800) // 2, (image.height() - 600) // 2, 800, 600)
+            blurred = blur_background(image)
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            temp_path = path + ".tmp"
+            if blurred.save(temp_path, "JPG", 90):
+                os.utime(temp_path, ns=(source_mtime, source_mtime))
+                os.replace(temp_path, path)
+            self.signals.ready.emit(self.source, blurred)
+        except Exception:
+            log.exception("배경 블러 오류: %s", self.source)
+            self.signals.ready.emit(self.source, QtGui.QImage())
+
+
+class BlurredBackgroundCache:
+    # 곡별로 완성된 배경 QPixmap 을 보관하고, 없으면 워커에 생성을 맡긴다
+    def __init__(self, disk_cache=None, max_entries=16, pool=None):
+        self.disk_cache = disk_cache
+        self.max_entries = max_entries
+        self.pool = pool or worker_pool()
+        self.signals = BlurSignals()
+        self.signals.ready.connect(self.store)
+        self.pixmaps = {}
+        self.pending = set()
+        self.listeners = []
+
+    def get(self, source):
+        pixmap = self.pixmaps.pop(source, None)
+        if pixmap is not None:
+            self.pixmaps[source] = pixmap  # 최근 사용 순서 갱신
+        return pixmap
+
+    def request(self, source):
+        if not source or source in self.pixmaps or source in self.pending:
+            return
+        self.pending.add(source)
+        self.pool.start(BlurTask(source, self.disk_cache, self.signals))
+
+    def store(self, source, image):
+        self.pending.discard(source)
+        if image.isNull():
+            return
+        self.pixmaps[source] = QtGui.QPixmap.fromImage(image)
+        while len(self.pixmaps) > self.max_entries:
+            self.pixmaps.pop(next(iter(self.pixmaps)))
+        for listener in self.listeners:
+            listener(source)
+
+
+def _benchmark(rounds=10):
+    # 기존 QGraphicsBlurEffect + grab() 방식과 NumPy 블러를 비교
+    from PyQt5 import QtWidgets
+
+    app = QtWidgets.QApplication(sys.argv)
+    image = QtGui.QImage(800, 600, QtGui.QImage.Format_RGB32)
+    gradient = QtGui.QLinearGradient(0, 0, 800, 600)
+    gradient.setColorAt(0, QtGui.QColor(200, 60, 30))
+    gradient.setColorAt(1, QtGui.QColor(20, 80, 200))
+    painter = QtGui.QPainter(image)
+    painter.fillRect(image.rect(), gradient)
+    painter.end()
+    pixmap = QtGui.QPixmap.fromImage(image)
+
+    def grab_blur():
+        label = QtWidgets.QLabel()
+        label.setPixmap(pixmap)
+        label.setFixedSize(800, 600)
+        effect = QtWidgets.QGraphicsBlurEffect()
+        effect.setBlurRadius(BLUR_RADIUS)
+        label.setGraphicsEffect(effect)
+        result = label.grab()
+        overlay = QtGui.QPixmap(800, 600)
+        overlay.fill(QtGui.QColor(0, 0, 0, OVERLAY_ALPHA))
+        painter = QtGui.QPainter(result)
+        painter.drawPixmap(0, 0, overlay)
+        painter.end()
+
+    for label, func in (("grab 방식 (UI 스레드)", grab_blur), ("NumPy 박스 블러", lambda: blur_background(image))):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        print(f"{label}: 1회 {(time.perf_counter() - start) * 1000 / rounds:.1f} ms")
+
+    # 미리 계산해 둔 배경을 곡 전환 시 꺼내 쓰는 비용 (UI 스레드에서 실제로 드는 시간)
+    cache = BlurredBackgroundCache()
+    cache.store("bench", blur_background(image))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        cache.get("bench")
+    print(f"캐시된 배경 사용: 1회 {(time.perf_counter() - start) * 1000 / rounds:.3f} ms")
+    del app
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,274 @@
+import hashlib
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+from app_log import get_logger
+
+# MP3 에 들어 있는 앨범아트(ID3v2 APIC/PIC 프레임)를 썸네일로 쓴다.
+# 파일을 mmap 으로 열고 memoryview 슬라이스로 태그 헤더만 따라가므로 오디오 부분은 읽지 않고,
+# 그림 데이터도 bytes 로 복사하지 않은 채 그대로 cache/covers 에 쓴다.
+# 추출한 파일의 mtime 은 MP3 와 같게 맞춰 두어 썸네일 디스크 캐시/PixmapCache 가 그대로 쓸 수 있다.
+log = get_logger("cover_art")
+CACHE_DIR = os.path.join("cache", "covers")
+
+MIN_COVER_PX = 200  # 이보다 작은 앨범아트는 매칭된 .webp 가 있으면 그쪽을 쓴다
+FRONT_COVER = 3
+EXTENSIONS = {"image/jpeg": ".jpg", "image/jpg": ".jpg", "image/png": ".png", "JPG": ".jpg", "PNG": ".png"}
+
+
+def syncsafe(data):
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def image_info(data):
+    # 그림 앞부분만 보고 (확장자, 가로, 세로). 모르는 형식이면 None.
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        width, height = struct.unpack(">II", data[16:24])
+        return ".png", width, height
+    if data[:2] != b"\xff\xd8":
+        return None
+    pos = 2
+    while pos + 9 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # 채움 바이트
+            pos += 1
+            continue
+        length = (data[pos + 2] << 8) | data[pos + 3]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+            return ".jpg", width, height
+        pos += 2 + length
+    return ".jpg", 0, 0
+
+
+def find_picture(data):
+    # ID3v2 태그에서 앞표지(없으면 첫 번째) 그림을 찾아 memoryview 슬라이스와 MIME/형식 문자열을 돌려준다.
+    # 비동기화/압축/암호화된 프레임은 복사 없이 꺼낼 수 없으므로 건너뛴다.
+    if len(data) < 10 or data[:3] != b"ID3":
+        return None
+    version, flags = data[3], data[5]
+    end = min(len(data), 10 + syncsafe(data[6:10]))
+    if flags & 0x80 and version < 4:
+        return None  # 태그 전체 비동기화 (v2.2/2.3)
+    pos = 10
+    if flags & 0x40 and version >= 3:
+        size = syncsafe(data[10:14]) if version == 4 else struct.unpack(">I", data[10:14])[0] + 4
+        pos += size
+    id_size, header_size = (3, 6) if version == 2 else (4, 10)
+    found = None
+    while pos + header_size <= end:
+        frame_id = bytes(data[pos:pos + id_size])
+        if frame_id[0] == 0:
+            break  # 패딩
+        if version == 2:
+            size = int.from_bytes(data[pos + 3:pos + 6], "big")
+        elif version == 4:
+            size = syncsafe(data[pos + 4:pos + 8])
+        else:
+            size = struct.unpack(">I", data[pos + 4:pos + 8])[0]
+        body_start = pos + header_size
+        pos = body_start + size
+        if frame_id not in (b"APIC", b"PIC") or pos > end:
+            continue
+        frame_flags = (data[body_start - 2] << 8) | data[body_start - 1] if version >= 3 else 0
+        if version == 4:
+            if frame_flags & 0x000E:  # 비동기화, 압축, 암호화
+                continue
+            if frame_flags & 0x0001:  # 데이터 길이 표시
+                body_start += 4
+            if frame_flags & 0x0040:  # 그룹 ID
+                body_start += 1
+        elif version == 3:
+            if frame_flags & 0x00C0:
+                continue
+            if frame_flags & 0x0020:
+                body_start += 1
+        picture = parse_picture(data[body_start:pos], version)
+        if picture is None:
+            continue
+        if picture[2] == FRONT_COVER:
+            return picture
+        if found is None:
+            found = picture
+    return found
+
+
+def parse_picture(body, version):
+    # APIC: 인코딩(1) MIME\0 그림종류(1) 설명\0 데이터 / PIC(v2.2): 인코딩(1) 형식(3) 그림종류(1) 설명\0 데이터
+    if len(body) < 4:
+        return None
+    encoding = body[0]
+    if version == 2:
+        mime = bytes(body[1:4]).decode("latin-1")
+        pos = 4
+    else:
+        zero = bytes(body[1:min(len(body), 65)]).find(b"\0")
+        if zero < 0:
+            return None
+        mime = bytes(body[1:1 + zero]).decode("latin-1").lower()
+        pos = 2 + zero
+    if pos >= len(body):
+        return None
+    picture_type = body[pos]
+    pos += 1
+    if encoding in (1, 2):  # UTF-16 설명은 2바이트 정렬된 \0\0 으로 끝난다
+        while pos + 1 < len(body) and (body[pos] or body[pos + 1]):
+            pos += 2
+        pos += 2
+    else:
+        while pos < len(body) and body[pos]:
+            pos += 1
+        pos += 1
+    if pos >= len(body):
+        return None
+    return body[pos:], mime, picture_type
+
+
+def cover_path(mp3_path, extension, cache_dir=CACHE_DIR):
+    digest = hashlib.sha1(os.path.abspath(mp3_path).encode("utf-8", "surrogatepass")).hexdigest()[:20]
+    return os.path.join(cache_dir, digest + extension)
+
+
+def extract_cover(mp3_path, cache_dir=CACHE_DIR):
+    # 앨범아트를 cache/covers 에 쓰고 (경로, 짧은 변 픽셀) 을 돌려준다. 없으면 ("", 0).
+    try:
+        with open(mp3_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_size < 10:
+                return "", 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    return write_cover(mp3_path, view, st.st_mtime_ns, cache_dir)
+                finally:
+                    view.release()
+    except Exception:
+        log.exception("앨범아트 추출 오류: %s", mp3_path)
+        return "", 0
+
+
+def write_cover(mp3_path, view, mtime_ns, cache_dir=CACHE_DIR):
+    picture = find_picture(view)
+    if picture is None:
+        return "", 0
+    data, mime, _ = picture
+    info = image_info(data[:65536])
+    if info is None:
+        extension = EXTENSIONS.get(mime)
+        if extension is None:
+            return "", 0
+        info = extension, 0, 0
+    extension, width, height = info
+    path = cover_path(mp3_path, extension, cache_dir)
+    try:
+        if os.stat(path).st_mtime_ns == mtime_ns:
+            return path, min(width, height)
+    except OSError:
+        pass
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as out:
+        out.write(data)  # memoryview 그대로 쓴다 (복사 없음)
+    os.utime(temp_path, ns=(mtime_ns, mtime_ns))
+    os.replace(temp_path, path)
+    return path, min(width, height)
+
+
+def choose_thumbnail(cover, cover_px, matched):
+    # 썸네일 우선순위:
+    # 1. 충분히 큰 앨범아트 (곡 파일 자체에 들어 있으므로 제목 매칭이 틀릴 일이 없다)
+    # 2. 제목으로 매칭한 thumbnail/*.webp
+    # 3. 작은 앨범아트
+    if cover and cover_px >= MIN_COVER_PX:
+        return cover
+    return matched or cover or None
+
+
+def fake_jpeg(width, height, size, rng):
+    # 벤치마크용: 헤더(SOF0)만 올바르고 나머지는 임의 바이트인 JPEG
+    header = (b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+              + b"\xff\xc0\x00\x11\x08" + struct.pack(">HH", height, width) + b"\x03\x01\x22\x00\x02\x11\x01\x03\x11\x01")
+    return header + rng(size - len(header) - 2) + b"\xff\xd9"
+
+
+def write_tagged_mp3(path, picture, audio_bytes, version=3):
+    # ID3v2.3/2.4 태그(TIT2 + APIC) 뒤에 오디오 자리만 잡아 둔다 (희소 파일)
+    def frame(frame_id, body):
+        size = struct.pack(">I", len(body)) if version == 3 else bytes(
+            (len(body) >> shift) & 0x7F for shift in (21, 14, 7, 0))
+        return frame_id + size + b"\0\0" + body
+
+    frames = frame(b"TIT2", b"\x03Test Song\0")
+    frames += frame(b"APIC", b"\x00image/jpeg\0" + bytes([FRONT_COVER]) + b"cover\0" + picture)
+    size = len(frames)
+    header = b"ID3" + bytes([version, 0, 0]) + bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    with open(path, "wb") as f:
+        f.write(header + frames)
+        f.truncate(len(header) + size + audio_bytes)
+
+
+def _run_method(method, folder, cache_dir):
+    # 자식 프로세스에서 실행: 추출 방식별 처리량과 최대 RSS 증가량
+    # resource 는 POSIX 전용이라 벤치마크에서만 가져온다 (플레이어는 Windows 에서도 이 모듈을 읽는다)
+    import resource
+
+    from mutagen.id3 import ID3
+
+    files = sorted(os.path.join(folder, name) for name in os.listdir(folder))
+    os.makedirs(cache_dir, exist_ok=True)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    written = 0
+    for path in files:
+        if method == "mmap":
+            cover, _ = extract_cover(path, cache_dir)
+        elif method == "read":
+            with open(path, "rb") as f:
+                data = f.read()
+            cover, _ = write_cover(path, memoryview(data), os.stat(path).st_mtime_ns, cache_dir)
+        else:
+            pictures = ID3(path).getall("APIC")
+            cover = cover_path(path, ".jpg", cache_dir) if pictures else ""
+            if pictures:
+                with open(cover, "wb") as out:
+                    out.write(pictures[0].data)
+        if cover:
+            written += os.path.getsize(cover)
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{len(files)} {written} {seconds} {(peak - baseline) / 1024}")
+
+
+def _benchmark(count=60, audio_mb=8, art_kb=800):
+    # 큰 태그(앨범아트 art_kb KB)가 붙은 audio_mb MB 짜리 MP3 들에서 앨범아트를 꺼낼 때
+    # 파일 전체 읽기 / mutagen / mmap + memoryview 방식의 처리량과 최대 RSS 증가량을 비교한다.
+    with tempfile.TemporaryDirectory() as root:
+        folder = os.path.join(root, "music")
+        os.makedirs(folder)
+        for i in range(count):
+            picture = fake_jpeg(1000 + i, 1000, art_kb * 1024, os.urandom)
+            write_tagged_mp3(os.path.join(folder, f"song{i:03d}.mp3"), picture, audio_mb * 1024 * 1024,
+                             version=3 if i % 2 else 4)
+        print(f"{count}개 파일, 파일당 오디오 {audio_mb} MB + 앨범아트 {art_kb} KB")
+        for method in ("read", "mutagen", "mmap"):
+            cache_dir = os.path.join(root, "covers_" + method)
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "_run", method, folder, cache_dir],
+                                    check=True, capture_output=True, text=True).stdout.split()
+            files, written, seconds, peak_mb = int(output[0]), int(output[1]), float(output[2]), float(output[3])
+            print(f"{method:8s}: {files / seconds:7.0f} 파일/s, {written / seconds / 1e6:6.0f} MB/s 앨범아트, "
+                  f"최대 RSS 증가 {peak_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "_run":
+        _run_method(*sys.argv[2:5])
+    else:
+        _benchmark(*(int(arg) for arg in sys.argv[1:4]))
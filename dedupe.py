@@ -0,0 +1,438 @@
+import hashlib
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app_log import get_logger
+from library_index import DEFAULT_INDEX_PATH, LibraryIndex
+from mp3_frames import probe_duration_ms
+
+# 라이브러리 중복 찾기 (같은 곡이 다시 올라온 경우, outtmpl 이 제목만 써서 생기는 사본).
+# 1. 완전히 같은 파일: 크기 -> 앞/뒤 64 KB 해시 -> 전체 해시(1 MB 씩 읽기) 순서로 후보를 줄인다.
+#    이미 하드 링크된 파일(같은 inode)은 해시하지 않고 바로 묶는다.
+# 2. 인코딩만 다른 같은 곡 (music/ 만): 길이가 비슷한 곡끼리 디코드한 오디오의 지문을 비교한다.
+#    지문은 프레임별 33개 대역 에너지의 시간/주파수 차분 부호(프레임당 32비트)이고, 비트 오류율로 비교한다.
+# 결과는 보고만 하거나, 완전히 같은 파일은 하드 링크로 바꾼다. 라이브러리 인덱스에는 duplicate_of 를 남겨
+# 플레이어 목록(songs_list)에 같은 곡이 두 번 나오지 않게 한다. 지문도 인덱스에 저장해 두고 다시 쓴다.
+# 표시는 실행할 때마다 새로 쓰므로, 지문이 잘못 묶은 곡은 fingerprints=False 로 다시 실행하거나
+# python dedupe.py clear 로 표시를 모두 지우면 목록에 다시 나온다.
+log = get_logger("dedupe")
+
+CHUNK = 1024 * 1024
+PARTIAL = 64 * 1024
+AUDIO_EXTENSIONS = (".mp3",)
+VIDEO_EXTENSIONS = (".mp4",)
+
+FINGERPRINT_RATE = 11025
+FINGERPRINT_SECONDS = 90  # 곡 앞부분만 디코드한다
+FRAME = 2048
+HOP = 1024
+BANDS = 33  # 300 ~ 2000 Hz 로그 간격 -> 프레임당 32비트
+DURATION_TOLERANCE_MS = 2000
+MAX_SHIFT = 3  # 인코더 지연 차이 허용 (프레임)
+MATCH_BER = 0.2  # 비트 오류율이 이보다 낮으면 같은 곡
+
+
+def list_files(folder, extensions):
+    # 하위 폴더까지: [(경로, os.stat_result)]
+    files = []
+    for root, _, names in os.walk(folder):
+        for name in names:
+            if name.lower().endswith(extensions):
+                path = os.path.join(root, name)
+                try:
+                    files.append((path, os.stat(path)))
+                except OSError:
+                    pass
+    return files
+
+
+def partial_hash(path, size):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        digest.update(f.read(PARTIAL))
+        if size > 2 * PARTIAL:
+            f.seek(size - PARTIAL)
+            digest.update(f.read(PARTIAL))
+    return digest.digest()
+
+
+def full_hash(path, buffer):
+    # buffer(bytearray) 하나를 계속 재사용해 큰 파일도 CHUNK 만큼만 메모리를 쓴다
+    digest = hashlib.sha1()
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            count = f.readinto(buffer)
+            if not count:
+                break
+            digest.update(view[:count])
+    return digest.digest()
+
+
+def exact_duplicates(files, stats):
+    # files: [(경로, stat)]. 같은 내용의 파일 묶음 목록을 돌려준다 (묶음 안은 경로 순서).
+    by_size = {}
+    for path, st in files:
+        if st.st_size > 0:
+            by_size.setdefault(st.st_size, []).append((path, st))
+    buffer = bytearray(CHUNK)
+    groups = []
+    for size, candidates in by_size.items():
+        if len(candidates) < 2:
+            continue
+        stats["size_matched"] += len(candidates)
+        inodes = {}
+        for path, st in candidates:
+            inodes.setdefault((st.st_dev, st.st_ino), []).append(path)
+        if len(inodes) == 1:
+            groups.append(sorted(next(iter(inodes.values()))))
+            continue
+        by_partial = {}
+        for paths in inodes.values():
+            by_partial.setdefault(partial_hash(paths[0], size), []).append(paths)
+            stats["partial_hashed"] += 1
+            stats["bytes_read"] += min(size, 2 * PARTIAL)
+        for same_partial in by_partial.values():
+            if len(same_partial) == 1:
+                if len(same_partial[0]) > 1:
+                    groups.append(sorted(same_partial[0]))
+                continue
+            by_full = {}
+            for paths in same_partial:
+                by_full.setdefault(full_hash(paths[0], buffer), []).extend(paths)
+                stats["full_hashed"] += 1
+                stats["bytes_read"] += size
+            groups += [sorted(paths) for paths in by_full.values() if len(paths) > 1]
+    return groups
+
+
+def fingerprint(path, ffmpeg):
+    # 프레임당 uint32 하나. 너무 짧으면 빈 배열.
+    data = subprocess.run([ffmpeg, "-v", "error", "-nostdin", "-t", str(FINGERPRINT_SECONDS), "-i", path,
+                           "-ac", "1", "-ar", str(FINGERPRINT_RATE), "-f", "f32le", "-"],
+                          check=True, capture_output=True).stdout
+    samples = np.frombuffer(data, np.float32)
+    if len(samples) < FRAME + 2 * HOP:
+        return np.zeros(0, np.uint32)
+    count = (len(samples) - FRAME) // HOP + 1
+    frames = np.lib.stride_tricks.as_strided(samples, (count, FRAME), (samples.strides[0] * HOP, samples.strides[0]))
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(FRAME).astype(np.float32), axis=1)) ** 2
+    edges = np.geomspace(300, 2000, BANDS + 1) * FRAME / FINGERPRINT_RATE
+    edges = np.round(edges).astype(int)
+    energy = np.add.reduceat(spectrum, edges[:-1], axis=1)[:, :BANDS]
+    diff = energy[:, :-1] - energy[:, 1:]
+    bits = (diff[1:] - diff[:-1]) > 0
+    return np.packbits(bits, axis=1, bitorder="little").view("<u4").ravel()
+
+
+def bit_error_rate(a, b, max_shift=MAX_SHIFT):
+    # 앞뒤로 max_shift 프레임까지 밀어 보며 가장 낮은 비트 오류율
+    best = 1.0
+    for shift in range(-max_shift, max_shift + 1):
+        x, y = (a[shift:], b) if shift >= 0 else (a, b[-shift:])
+        length = min(len(x), len(y))
+        if length < 16:
+            continue
+        errors = np.unpackbits(np.bitwise_xor(x[:length], y[:length]).view(np.uint8)).sum()
+        best = min(best, errors / (32 * length))
+    return best
+
+
+def similar_tracks(tracks, ffmpeg, load_fingerprint, stats):
+    # tracks: [(경로, 길이 ms)]. 길이가 비슷한 곡끼리만 지문을 비교해 같은 곡 묶음을 돌려준다.
+    tracks = sorted(tracks, key=lambda track: track[1])
+    pairs = []
+    for i, (path, duration) in enumerate(tracks):
+        for other, other_duration in tracks[i + 1:]:
+            if other_duration - duration > DURATION_TOLERANCE_MS:
+                break
+            pairs.append((path, other))
+    needed = sorted({path for pair in pairs for path in pair})
+    stats["fingerprinted"] += len(needed)
+    # 디코드는 ffmpeg 프로세스가 하므로 스레드로 충분하다
+    with ThreadPoolExecutor(max_workers=max(1, os.cpu_count() or 1)) as pool:
+        prints = dict(zip(needed, pool.map(lambda path: load_fingerprint(path, ffmpeg), needed)))
+
+    parent = {}
+
+    def root(path):
+        while parent.get(path, path) != path:
+            path = parent[path]
+        return path
+
+    for path, other in pairs:
+        a, b = prints[path], prints[other]
+        if len(a) and len(b) and bit_error_rate(a, b) < MATCH_BER:
+            parent[root(other)] = root(path)
+    groups = {}
+    for path in needed:
+        groups.setdefault(root(path), []).append(path)
+    return [sorted(group) for group in groups.values() if len(group) > 1]
+
+
+def choose_original(paths, durations):
+    # 남길 파일: 비트레이트(크기/길이)가 가장 높은 것, 같으면 먼저 받은 것, 그다음 이름이 짧은 것
+    # (다시 올라온 곡은 " (1)", "(Official Audio)" 처럼 제목이 길어진다. 하드 링크 뒤에는 수정시간도 같다.)
+    def key(path):
+        st = os.stat(path)
+        return -st.st_size / max(durations.get(path) or 1, 1), st.st_mtime_ns, len(os.path.basename(path)), path
+    return min(paths, key=key)
+
+
+def link_duplicate(original, path):
+    # 같은 내용이 확인된 파일만 부른다. 임시 링크를 만든 뒤 바꿔치기하므로 중간에 파일이 사라지지 않는다.
+    if os.path.samefile(original, path):
+        return 0
+    size = os.path.getsize(path)
+    temp_path = path + ".dedupe"
+    os.link(original, temp_path)
+    os.replace(temp_path, path)
+    return size
+
+
+def dedupe_library(music_dir="music", mv_dir="mv", db_path=DEFAULT_INDEX_PATH, link=False, fingerprints=True,
+                   ffmpeg=None):
+    start = time.perf_counter()
+    music_dir = os.path.normpath(music_dir)
+    stats = {"files": 0, "bytes": 0, "size_matched": 0, "partial_hashed": 0, "full_hashed": 0, "bytes_read": 0,
+             "fingerprinted": 0, "linked": 0, "saved_bytes": 0, "marked": 0}
+    music = list_files(music_dir, AUDIO_EXTENSIONS) if os.path.isdir(music_dir) else []
+    videos = list_files(mv_dir, VIDEO_EXTENSIONS) if mv_dir and os.path.isdir(mv_dir) else []
+    stats["files"] = len(music) + len(videos)
+    stats["bytes"] = sum(st.st_size for _, st in music + videos)
+    exact = exact_duplicates(music, stats) + exact_duplicates(videos, stats)
+    stats["hash_s"] = time.perf_counter() - start
+
+    index = LibraryIndex(db_path) if db_path and os.path.exists(db_path) else None
+    rows = index.load_rows() if index else {}
+
+    def row_for(path):
+        # 인덱스는 music 폴더 바로 아래 파일만 담는다
+        return rows.get(os.path.basename(path)) if os.path.dirname(path) == music_dir else None
+
+    durations = {}
+    for path, st in music:
+        # 스캔 뒤 바뀐 파일의 행은 길이가 맞지 않으므로 쓰지 않는다 (지문 단계에서 다시 잰다)
+        row = row_for(path)
+        fresh = row and row["size"] == st.st_size and row["mtime_ns"] == st.st_mtime_ns
+        durations[path] = row["duration"] if fresh else None
+
+    def choose(group):
+        # 길이를 모르는 파일은 헤더로 재서 비트레이트 비교가 묶음 안에서 같은 기준이 되게 한다
+        for path in group:
+            if durations.get(path) is None and path.lower().endswith(AUDIO_EXTENSIONS):
+                durations[path] = probe_duration_ms(path) or 0
+        return choose_original(group, durations)
+
+    original = {}  # 경로 -> 남길 파일
+    for group in exact:
+        keep = choose(group)
+        original.update((path, keep) for path in group if path != keep)
+
+    similar = []
+    ffmpeg = ffmpeg or shutil.which("ffmpeg")
+    if fingerprints and ffmpeg:
+        computed = []  # 새로 계산한 지문은 디코드 스레드가 아니라 여기서 인덱스에 쓴다 (SQLite 연결은 스레드 간 공유 불가)
+
+        def load_fingerprint(path, ffmpeg):
+            st = os.stat(path)
+            row = row_for(path)
+            if row and row["fingerprint"] and row["size"] == st.st_size and row["mtime_ns"] == st.st_mtime_ns:
+                return np.frombuffer(row["fingerprint"], "<u4")
+            try:
+                data = fingerprint(path, ffmpeg)
+            except Exception as e:
+                log.warning("지문 계산 실패: %s - %s", path, e)
+                return np.zeros(0, np.uint32)
+            if row:
+                computed.append((row["filename"], st.st_size, st.st_mtime_ns, data.tobytes()))
+            return data
+
+        fingerprint_start = time.perf_counter()
+        tracks = []
+        for path, _ in music:
+            if path in original:
+                continue
+            if durations[path] is None:
+                durations[path] = probe_duration_ms(path) or 0
+            tracks.append((path, durations[path]))
+        similar = similar_tracks(tracks, ffmpeg, load_fingerprint, stats)
+        for filename, size, mtime_ns, data in computed:
+            index.set_fingerprint(filename, size, mtime_ns, data)
+        for group in similar:
+            keep = choose(group)
+            for path in group:
+                if path != keep:
+                    original[path] = keep
+        # 완전 중복의 원본이 다른 인코딩의 사본이면 최종 원본을 가리키게 한다
+        for path, keep in list(original.items()):
+            while keep in original:
+                keep = original[keep]
+            original[path] = keep
+        stats["fingerprint_s"] = time.perf_counter() - fingerprint_start
+
+    relinked = []  # 하드 링크로 바꾼 music/ 파일 중 인덱스 행이 링크 전 파일과 맞던 것
+    if link:
+        for group in exact:
+            keep = choose(group)
+            for path in group:
+                if path == keep:
+                    continue
+                before = os.stat(path)
+                try:
+                    saved = link_duplicate(keep, path)
+                except OSError as e:
+                    log.warning("하드 링크 실패: %s - %s", path, e)
+                    continue
+                if saved:
+                    stats["linked"] += 1
+                    stats["saved_bytes"] += saved
+                    row = row_for(path)
+                    if row and row["size"] == before.st_size and row["mtime_ns"] == before.st_mtime_ns:
+                        st = os.stat(path)
+                        relinked.append((row["filename"], st.st_size, st.st_mtime_ns))
+
+    if index:
+        try:
+            marks = [(os.path.basename(path), os.path.basename(keep)) for path, keep in original.items()
+                     if os.path.dirname(path) == music_dir and os.path.dirname(keep) == music_dir]
+            index.set_duplicates(marks, relinked)
+            stats["marked"] = len(marks)
+        finally:
+            index.close()
+    stats["seconds"] = time.perf_counter() - start
+    return {"exact": exact, "similar": similar, "original": original, "stats": stats}
+
+
+def format_report(report):
+    stats = report["stats"]
+    lines = []
+    for label, groups in (("같은 파일", report["exact"]), ("같은 곡 (인코딩 다름)", report["similar"])):
+        for group in groups:
+            keep = report["original"].get(group[0], group[0])
+            lines.append(f"[{label}] 남김: {keep}")
+            lines += [f"    중복: {path}" for path in group if path != keep]
+    lines.append(f"{stats['files']}개 파일 ({stats['bytes'] / 1e6:.0f} MB): 같은 파일 {len(report['exact'])}묶음, "
+                 f"같은 곡 {len(report['similar'])}묶음, 하드 링크 {stats['linked']}개 "
+                 f"({stats['saved_bytes'] / 1e6:.1f} MB 절약), 인덱스 표시 {stats['marked']}개, {stats['seconds']:.1f} s")
+    return "\n".join(lines)
+
+
+def make_tree(root, count, rng):
+    # 벤치마크용 폴더 트리: 아티스트/앨범 폴더에 크기가 겹치는 파일, 앞부분만 같은 파일, 복사본, 하드 링크를 섞는다
+    shared_sizes = [rng.randrange(256, 2048) * 1024 for _ in range(40)]
+    paths = []
+    for i in range(count):
+        folder = os.path.join(root, f"artist{i % 50:02d}", f"album{i % 7}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"track{i:05d}.mp3")
+        kind = rng.random()
+        if paths and kind < 0.03:
+            shutil.copyfile(rng.choice(paths), path)  # 다시 받은 같은 파일
+        elif paths and kind < 0.05:
+            os.link(rng.choice(paths), path)  # 이미 하드 링크된 파일
+        elif paths and kind < 0.08:
+            # 앞부분(태그 + 첫 프레임)과 크기는 같고 뒤만 다른 파일
+            source = rng.choice(paths)
+            with open(source, "rb") as f:
+                data = bytearray(f.read())
+            data[len(data) // 2:len(data) // 2 + 16] = os.urandom(16)
+            with open(path, "wb") as f:
+                f.write(data)
+        else:
+            size = rng.choice(shared_sizes) if kind < 0.4 else rng.randrange(64, 2048) * 1024
+            with open(path, "wb") as f:
+                f.write(os.urandom(size))
+        paths.append(path)
+    return paths
+
+
+def naive_duplicates(files):
+    # 비교용: 모든 파일 전체 해시
+    buffer = bytearray(CHUNK)
+    by_hash = {}
+    for path, _ in files:
+        by_hash.setdefault(full_hash(path, buffer), []).append(path)
+    return [sorted(paths) for paths in by_hash.values() if len(paths) > 1]
+
+
+def make_songs(ffmpeg, folder, songs):
+    # 같은 곡을 여러 인코딩으로: 192k CBR, 128k CBR, V4 VBR (모노 다운믹스 포함) + 다른 곡들
+    def encode(source, path, *args):
+        subprocess.run([ffmpeg, "-v", "error", "-nostdin", "-y", "-f", "lavfi", "-i", source, "-c:a", "libmp3lame",
+                        *args, path], check=True)
+
+    for i in range(songs):
+        source = (f"anoisesrc=color=pink:duration={150 + i}:seed={i},lowpass=f={2000 + i * 300},"
+                  f"volume='0.6+0.4*sin(2*PI*t*{0.3 + i * 0.05})':eval=frame")
+        encode(source, os.path.join(folder, f"Artist{i}_Song {i}.mp3"), "-b:a", "192k")
+        if i % 2 == 0:
+            encode(source, os.path.join(folder, f"Artist{i}_Song {i} (Official Audio).mp3"), "-b:a", "128k")
+            encode(source, os.path.join(folder, f"Artist{i}_Song {i} (Lyrics).mp3"), "-q:a", "4", "-ac", "1")
+
+
+def _benchmark(count=5000, songs=6):
+    # 큰 합성 폴더 트리에서 크기 -> 부분 해시 -> 전체 해시 방식과 전체 해시 방식의 처리량을 비교하고,
+    # 여러 인코딩으로 만든 곡들로 오디오 지문 매칭을 확인한다
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as root:
+        tree = os.path.join(root, "tree")
+        start = time.perf_counter()
+        make_tree(tree, count, rng)
+        files = list_files(tree, AUDIO_EXTENSIONS)
+        total_mb = sum(st.st_size for _, st in files) / 1e6
+        print(f"{len(files)}개 파일, {total_mb:.0f} MB (만드는 데 {time.perf_counter() - start:.1f} s, 페이지 캐시에 있음)")
+
+        stats = {"size_matched": 0, "partial_hashed": 0, "full_hashed": 0, "bytes_read": 0}
+        start = time.perf_counter()
+        groups = exact_duplicates(files, stats)
+        elapsed = time.perf_counter() - start
+        print(f"크기 -> 부분 해시 -> 전체 해시: {elapsed:.2f} s, {len(files) / elapsed:,.0f} 파일/s, "
+              f"{total_mb / elapsed:,.0f} MB/s 상당 | 크기 겹침 {stats['size_matched']}, 부분 해시 {stats['partial_hashed']}, "
+              f"전체 해시 {stats['full_hashed']}, 읽은 양 {stats['bytes_read'] / 1e6:.0f} MB -> {len(groups)}묶음")
+
+        start = time.perf_counter()
+        baseline = naive_duplicates(files)
+        naive = time.perf_counter() - start
+        print(f"전체 해시만: {naive:.2f} s, {len(files) / naive:,.0f} 파일/s, {total_mb / naive:,.0f} MB/s "
+              f"-> {len(baseline)}묶음 (결과 일치: {sorted(groups) == sorted(baseline)}), 속도 향상 x{naive / elapsed:.1f}")
+
+        ffmpeg = shutil.which("ffmpeg")
+        if not ffmpeg:
+            print("ffmpeg 가 PATH 에 없어 오디오 지문 확인은 건너뜁니다.")
+            return
+        music_dir = os.path.join(root, "music")
+        os.makedirs(music_dir)
+        make_songs(ffmpeg, music_dir, songs)
+        source = os.path.join(music_dir, "Artist1_Song 1.mp3")
+        shutil.copyfile(source, source.replace(".mp3", " (1).mp3"))  # 같은 곡을 다시 받은 사본
+        report = dedupe_library(music_dir, None, db_path=None, link=True)
+        print(format_report(report))
+        stats = report["stats"]
+        print(f"지문: {stats['fingerprinted']}곡, {stats['fingerprint_s']:.1f} s "
+              f"({stats['fingerprinted'] / stats['fingerprint_s']:.1f} 곡/s)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        # python dedupe.py clear [인덱스 파일]: 중복 표시를 모두 지운다 (숨겨진 곡이 다시 목록에 나온다)
+        index = LibraryIndex(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_INDEX_PATH)
+        try:
+            index.set_duplicates([])
+        finally:
+            index.close()
+        print("중복 표시를 모두 지웠습니다.")
+    elif len(sys.argv) > 1 and sys.argv[1] in ("report", "link"):
+        # python dedupe.py report|link [music 폴더] [mv 폴더]
+        folders = sys.argv[2:4] + ["music", "mv"][len(sys.argv[2:4]):]
+        print(format_report(dedupe_library(folders[0], folders[1], link=sys.argv[1] == "link")))
+    else:
+        _benchmark(*(int(arg) for arg in sys.argv[1:3]))
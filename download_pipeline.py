@@ -0,0 +1,395 @@
+import copy
+import http.server
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import yt_dlp
+
+from app_log import get_logger
+
+# 플레이리스트 다운로드 파이프라인 (job01/job02 용).
+# 1) extract_flat 으로 플레이리스트 항목 목록만 한 번 받아 오고
+# 2) 항목별 다운로드를 download_workers 개의 스레드에 나눠 돌리고
+# 3) 다운로드가 끝난 항목의 FFmpeg 후처리(mp3 추출, mp4 변환, 썸네일 변환)는 별도 풀에서 돌린다.
+# 그래서 한 곡을 인코딩하는 동안 다음 곡들의 다운로드가 계속 진행된다.
+# YoutubeDL 객체는 스레드 사이에 공유하지 않고 스레드마다 하나씩 만든다.
+log = get_logger("download_pipeline")
+
+DEFAULT_DOWNLOAD_WORKERS = 4
+DEFAULT_POSTPROCESS_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+
+def playlist_entries(playlist_url, ydl_opts):
+    # 영상 정보는 받지 않고 항목(url, title)만 가져온다. 플레이리스트가 아니면 항목 하나.
+    # ignoreerrors 설정이면 yt-dlp 가 목록 추출 실패를 None 으로 돌려주므로 빈 목록과 구분해 예외로 올린다.
+    opts = dict(ydl_opts, extract_flat="in_playlist", quiet=True)
+    opts.pop("postprocessors", None)
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(playlist_url, download=False)
+    if info is None:
+        raise RuntimeError(f"플레이리스트 목록을 가져오지 못했습니다: {playlist_url}")
+    if info.get("_type") != "playlist":
+        return [info]
+    return [entry for entry in info.get("entries") or [] if entry]
+
+
+class DownloadStageYoutubeDL(yt_dlp.YoutubeDL):
+    # 다운로드 단계: 포맷 병합/보정(__postprocessors)까지만 하고 파일 이동(MoveFiles)은 후처리 단계로 미룬다.
+    # 여기서 옮겨 버리면 썸네일 출력 경로가 따로 있을 때 후처리기가 옮기기 전 경로를 찾게 된다.
+    def post_process(self, filename, info, files_to_move=None):
+        info["filepath"] = filename
+        info["__files_to_move"] = files_to_move or {}
+        info = self.run_all_pps("post_process", info, additional_pps=info.pop("__postprocessors", None))
+        # 병합은 끝났고 원본 조각은 지워졌으므로 후처리 단계에서 다시 돌지 않게 한다
+        info.pop("__files_to_merge", None)
+        info["__pending_moves"] = info.pop("__files_to_move")
+        return info
+
+
+class DownloadPipeline:
+    def __init__(self, ydl_opts, download_workers=DEFAULT_DOWNLOAD_WORKERS,
+                 postprocess_workers=DEFAULT_POSTPROCESS_WORKERS, after_postprocess=None):
+        self.ydl_opts = dict(ydl_opts)
+        # after_postprocess(info) -> 추가로 만든 파일 목록. 후처리 스레드에서 yt-dlp 후처리 다음에 호출된다.
+        self.after_postprocess = after_postprocess
+        self.download_workers = download_workers
+        self.postprocess_workers = postprocess_workers
+        # 다운로드 단계는 후처리기 없이, 후처리 단계는 원래 설정 그대로 쓴다
+        self.download_opts = dict(ydl_opts)
+        self.download_opts.pop("postprocessors", None)
+        if download_workers > 1:
+            self.download_opts["noprogress"] = True  # 여러 스레드의 진행 표시줄이 섞이지 않게
+        self.local = threading.local()
+        self.instances = []
+        self.lock = threading.Lock()
+        self.results = []
+
+    def ydl(self, stage):
+        ydl = getattr(self.local, stage, None)
+        if ydl is None:
+            ydl = (DownloadStageYoutubeDL(self.download_opts) if stage == "download"
+                   else yt_dlp.YoutubeDL(self.ydl_opts))
+            setattr(self.local, stage, ydl)
+            with self.lock:
+                self.instances.append(ydl)
+        return ydl
+
+    def run(self, playlist_url):
+        start = time.perf_counter()
+        entries = playlist_entries(playlist_url, self.ydl_opts)
+        extract_seconds = time.perf_counter() - start
+        log.info("플레이리스트 항목 %s개 (%.1f s)", len(entries), extract_seconds)
+        return self.run_entries(entries, extract_seconds, start)
+
+    def run_entries(self, entries, extract_seconds=0.0, start=None):
+        # 이미 받아 온 항목 목록으로 다운로드/후처리만 한다 (증분 동기화에서 새 항목만 넘긴다)
+        start = start or time.perf_counter()
+        self.results = []
+        try:
+            with ThreadPoolExecutor(self.postprocess_workers, thread_name_prefix="postprocess") as postprocess:
+                with ThreadPoolExecutor(self.download_workers, thread_name_prefix="download") as download:
+                    for entry in entries:
+                        download.submit(self.download, entry, postprocess)
+        finally:
+            for ydl in self.instances:
+                ydl.close()
+            self.instances = []
+        return summarize(self.results, extract_seconds, time.perf_counter() - start)
+
+    def download(self, entry, postprocess):
+        result = {"id": entry_key(entry), "title": entry.get("title") or entry.get("url"), "download_s": 0.0,
+                  "wait_s": 0.0, "postprocess_s": 0.0, "bytes": 0, "files": [], "error": None}
+        with self.lock:
+            self.results.append(result)
+        start = time.perf_counter()
+        try:
+            info = self.ydl("download").process_ie_result(copy.deepcopy(entry), download=True)
+            if not info:
+                raise RuntimeError("다운로드 실패")
+            downloads = info.get("requested_downloads") or [info]
+            path = downloads[0].get("filepath") or self.ydl("download").prepare_filename(info)
+            moves = downloads[0].pop("__pending_moves", None)
+            for key in ("__postprocessors", "__files_to_merge"):
+                info.pop(key, None)
+            result["bytes"] = os.path.getsize(path) if os.path.exists(path) else 0
+        except Exception as e:
+            result["error"] = f"다운로드: {e}"
+            log.warning("다운로드 실패: %s - %s", result['title'], e)
+            return
+        finally:
+            result["download_s"] = time.perf_counter() - start
+        postprocess.submit(self.postprocess, info, path, moves, result, time.perf_counter())
+
+    def postprocess(self, info, path, moves, result, queued):
+        start = time.perf_counter()
+        result["wait_s"] = start - queued
+        try:
+            info = self.ydl("postprocess").post_process(path, info, moves)
+            result["files"] = output_files(info)
+            if self.after_postprocess is not None:
+                result["files"] += self.after_postprocess(info)
+        except Exception as e:
+            result["error"] = f"후처리: {e}"
+            log.warning("후처리 실패: %s - %s", result['title'], e)
+        finally:
+            result["postprocess_s"] = time.perf_counter() - start
+
+
+def entry_key(entry):
+    # 항목 식별자: 유튜브는 영상 id, id 가 없는 추출기는 URL
+    return entry.get("id") or entry.get("url")
+
+
+def output_files(info):
+    # 후처리가 끝난 뒤 남아 있는 결과 파일 (본 파일 + 썸네일)
+    paths = [info.get("filepath")]
+    paths += [thumbnail.get("filepath") for thumbnail in info.get("thumbnails") or []]
+    return [path for path in paths if path and os.path.exists(path)]
+
+
+def summarize(results, extract_seconds, total_seconds):
+    done = [result for result in results if not result["error"]]
+    total_bytes = sum(result["bytes"] for result in done)
+    return {
+        "entries": len(results),
+        "done": len(done),
+        "failed": len(results) - len(done),
+        "extract_s": extract_seconds,
+        "download_s": sum(result["download_s"] for result in results),
+        "wait_s": sum(result["wait_s"] for result in results),
+        "postprocess_s": sum(result["postprocess_s"] for result in results),
+        "total_s": total_seconds,
+        "bytes": total_bytes,
+        "per_minute": len(done) * 60 / total_seconds if total_seconds else 0.0,
+        "results": results,
+    }
+
+
+def format_stats(stats):
+    return (f"{stats['done']}/{stats['entries']}개 완료 (실패 {stats['failed']}), 전체 {stats['total_s']:.1f} s, "
+            f"{stats['per_minute']:.1f} 개/분, {stats['bytes'] / max(stats['total_s'], 1e-9) / 1e6:.2f} MB/s | "
+            f"단계별 합계: 목록 {stats['extract_s']:.1f} s, 다운로드 {stats['download_s']:.1f} s, "
+            f"후처리 대기 {stats['wait_s']:.1f} s, 후처리 {stats['postprocess_s']:.1f} s")
+
+
+class ThrottledHandler(http.server.SimpleHTTPRequestHandler):
+    # 자체 시험용: 연결마다 초당 rate 바이트로 보내 네트워크 다운로드를 흉내 낸다. sent 는 보낸 바이트 합계.
+    rate = 256 * 1024
+    sent = 0
+    sent_lock = threading.Lock()
+
+    def copyfile(self, source, outputfile):
+        chunk = max(1, self.rate // 20)
+        while True:
+            data = source.read(chunk)
+            if not data:
+                break
+            try:
+                outputfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                return  # 형식 확인용으로 앞부분만 읽고 끊는 요청
+            with self.sent_lock:
+                ThrottledHandler.sent += len(data)
+            time.sleep(len(data) / self.rate)
+
+    def log_message(self, format, *args):
+        pass
+
+
+ITUNES_NS = "http://www.itunes.com/dtds/podcast-1.0.dtd"
+
+
+class FixturePlaylist:
+    # 인터넷 없이 시험하기 위한 로컬 플레이리스트: ffmpeg 로 만든 m4a 파일(video=True 면 mp4 + 썸네일)과
+    # 그 목록(RSS 피드)을 로컬 HTTP 서버로 내보낸다. yt-dlp 의 generic 추출기가 피드를 플레이리스트로 읽는다
+    # (guid 가 항목 id, itunes:image 가 썸네일).
+    # separate=True 면 (video=True 일 때) 영상만/음성만 파일을 따로 두고 DASH 목록(.mpd)으로 내보내
+    # bestvideo+bestaudio 병합 경로를 시험한다.
+    def __init__(self, root, count=8, seconds=60, rate_kb=512, video=False, separate=False):
+        self.served = os.path.join(root, "served")
+        os.makedirs(self.served, exist_ok=True)
+        self.count = count
+        self.seconds = seconds
+        self.rate_kb = rate_kb
+        self.video = video
+        self.separate = separate
+        self.items = []
+        self.media = []  # 실제로 받는 파일들 (크기 합계용)
+        self.server = None
+        self.base = None
+
+    def __enter__(self):
+        ffmpeg = shutil.which("ffmpeg")
+        for i in range(self.count):
+            self.add_item(ffmpeg, i)
+        ThrottledHandler.rate = self.rate_kb * 1024
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0),
+                                                      partial(ThrottledHandler, directory=self.served))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.write_feed(range(self.count))
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def add_item(self, ffmpeg, i):
+        audio = ["-f", "lavfi", "-i", f"sine=frequency={220 + i * 40}:duration={self.seconds}"]
+        if self.video and self.separate:
+            name = f"track{i:02d}.mpd"
+            video_name, audio_name = f"track{i:02d}_video.mp4", f"track{i:02d}_audio.m4a"
+            subprocess.run([ffmpeg, "-v", "error", "-y", "-f", "lavfi", "-i",
+                            f"testsrc2=size=640x360:rate=25:duration={self.seconds}", "-c:v", "libx264",
+                            "-preset", "ultrafast", "-b:v", "600k", "-an", os.path.join(self.served, video_name)],
+                           check=True)
+            subprocess.run([ffmpeg, "-v", "error", "-y", *audio, "-c:a", "aac", "-b:a", "128k", "-vn",
+                            os.path.join(self.served, audio_name)], check=True)
+            subprocess.run([ffmpeg, "-v", "error", "-y", "-f", "lavfi", "-i", "testsrc2=size=1280x720",
+                            "-frames:v", "1", os.path.join(self.served, f"track{i:02d}.jpg")], check=True)
+            with open(os.path.join(self.served, name), "w", encoding="utf-8") as f:
+                f.write(f"<?xml version=\"1.0\"?><MPD xmlns=\"urn:mpeg:dash:schema:mpd:2011\" type=\"static\" "
+                        f"mediaPresentationDuration=\"PT{self.seconds}S\" "
+                        f"profiles=\"urn:mpeg:dash:profile:isoff-on-demand:2011\"><Period>"
+                        f"<AdaptationSet mimeType=\"video/mp4\"><Representation id=\"video\" codecs=\"avc1.64001e\" "
+                        f"bandwidth=\"600000\" width=\"640\" height=\"360\"><BaseURL>{video_name}</BaseURL>"
+                        f"</Representation></AdaptationSet><AdaptationSet mimeType=\"audio/mp4\">"
+                        f"<Representation id=\"audio\" codecs=\"mp4a.40.2\" bandwidth=\"128000\">"
+                        f"<BaseURL>{audio_name}</BaseURL></Representation></AdaptationSet></Period></MPD>")
+            self.media += [video_name, audio_name]
+        elif self.video:
+            name = f"track{i:02d}.mp4"
+            subprocess.run([ffmpeg, "-v", "error", "-y", "-f", "lavfi", "-i",
+                            f"testsrc2=size=640x360:rate=25:duration={self.seconds}", *audio, "-c:v", "libx264",
+                            "-preset", "ultrafast", "-b:v", "600k", "-c:a", "aac", "-b:a", "128k", "-shortest",
+                            os.path.join(self.served, name)], check=True)
+            subprocess.run([ffmpeg, "-v", "error", "-y", "-f", "lavfi", "-i", "testsrc2=size=1280x720",
+                            "-frames:v", "1", os.path.join(self.served, f"track{i:02d}.jpg")], check=True)
+        else:
+            name = f"track{i:02d}.m4a"
+            subprocess.run([ffmpeg, "-v", "error", "-y", *audio, "-c:a", "aac", "-b:a", "128k",
+                            os.path.join(self.served, name)], check=True)
+        if not name.endswith(".mpd"):
+            self.media.append(name)
+        self.items.append(name)
+
+    def write_feed(self, indices):
+        # 플레이리스트 내용을 바꾼다 (추가/삭제 시험용)
+        def image(i):
+            if not self.video:
+                return ""
+            return f"<itunes:image href=\"{self.base}/{os.path.splitext(self.items[i])[0]}.jpg\"/>"
+
+        if self.video and self.separate:
+            kind = "application/dash+xml"
+        else:
+            kind = "video/mp4" if self.video else "audio/mp4"
+        feed = "".join(f"<item><title>Artist{i}_Song {i}</title><enclosure url=\"{self.base}/{self.items[i]}\" "
+                       f"type=\"{kind}\"/>{image(i)}<guid>song{i}</guid></item>"
+                       for i in indices)
+        with open(os.path.join(self.served, "playlist.xml"), "w", encoding="utf-8") as f:
+            f.write(f"<?xml version=\"1.0\"?><rss version=\"2.0\" xmlns:itunes=\"{ITUNES_NS}\">"
+                    f"<channel><title>test</title>{feed}</channel></rss>")
+
+    @property
+    def url(self):
+        return f"{self.base}/playlist.xml"
+
+    def total_mb(self):
+        return sum(os.path.getsize(os.path.join(self.served, name)) for name in self.media) / 1e6
+
+    @staticmethod
+    def audio_options(folder):
+        # job01 과 같은 설정 (bestaudio -> mp3 추출)
+        return {
+            "format": "bestaudio/best",
+            "outtmpl": f"{folder}/%(title)s.%(ext)s",
+            "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "0"}],
+            "quiet": True,
+            "noprogress": True,
+            "no_warnings": True,
+        }
+
+
+def _selftest(count=8, seconds=60, rate_kb=512, workers=DEFAULT_DOWNLOAD_WORKERS):
+    # 로컬 플레이리스트로 기존 방식(플레이리스트 통째로 download)과 파이프라인을 비교한다
+    if not shutil.which("ffmpeg"):
+        print("ffmpeg 가 PATH 에 없습니다.")
+        return
+    with tempfile.TemporaryDirectory() as root, FixturePlaylist(root, count, seconds, rate_kb) as fixture:
+        print(f"{count}개 항목 ({fixture.total_mb():.1f} MB, {seconds}초 곡), 연결당 {rate_kb} KB/s")
+        folder = os.path.join(root, "sequential")
+        start = time.perf_counter()
+        with yt_dlp.YoutubeDL(fixture.audio_options(folder)) as ydl:
+            ydl.download([fixture.url])
+        sequential = time.perf_counter() - start
+        made = len([name for name in os.listdir(folder) if name.endswith(".mp3")])
+        print(f"기존 방식 (순차): {made}/{count}개, {sequential:.1f} s, {made * 60 / sequential:.1f} 개/분")
+
+        folder = os.path.join(root, "pipeline")
+        stats = DownloadPipeline(fixture.audio_options(folder), download_workers=workers).run(fixture.url)
+        made = len([name for name in os.listdir(folder) if name.endswith(".mp3")])
+        print(f"파이프라인 (다운로드 {workers}, 후처리 {DEFAULT_POSTPROCESS_WORKERS}): mp3 {made}/{count}개")
+        print(format_stats(stats))
+        print(f"속도 향상 x{sequential / stats['total_s']:.2f}")
+    _merge_check(workers)
+
+
+class ErrorLog:
+    # yt-dlp logger: ignoreerrors 로 삼켜지는 오류도 모아 둔다
+    def __init__(self):
+        self.errors = []
+
+    def debug(self, message):
+        pass
+
+    info = warning = debug
+
+    def error(self, message):
+        self.errors.append(message)
+
+
+def _merge_check(workers=DEFAULT_DOWNLOAD_WORKERS, count=3, seconds=10):
+    # 영상/음성이 따로 있는 항목(bestvideo+bestaudio)을 job02 설정으로 받아 병합이 한 번만 도는지 확인한다
+    ffmpeg = shutil.which("ffmpeg")
+    with tempfile.TemporaryDirectory() as root, \
+            FixturePlaylist(root, count, seconds, 4096, video=True, separate=True) as fixture:
+        folder = os.path.join(root, "mv")
+        errors = ErrorLog()
+        options = {
+            "format": "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best",
+            "outtmpl": {"default": f"{folder}/%(title)s.%(ext)s",
+                        "thumbnail": f"{root}/thumbnail/%(title)s.%(ext)s"},
+            "writethumbnail": True,
+            "postprocessors": [{"key": "FFmpegVideoConvertor", "preferedformat": "mp4"},
+                               {"key": "FFmpegThumbnailsConvertor", "format": "webp"}],
+            "ignoreerrors": True,
+            "noprogress": True,
+            "logger": errors,
+        }
+        stats = DownloadPipeline(options, download_workers=workers).run(fixture.url)
+        merged = 0
+        for name in sorted(os.listdir(folder)):
+            probe = subprocess.run([ffmpeg, "-hide_banner", "-i", os.path.join(folder, name)],
+                                   capture_output=True, text=True).stderr
+            merged += name.endswith(".mp4") and "Video:" in probe and "Audio:" in probe
+        thumbnail_dir = os.path.join(root, "thumbnail")
+        thumbnails = len(os.listdir(thumbnail_dir)) if os.path.isdir(thumbnail_dir) else 0
+        print(f"영상/음성 분리 항목 {count}개: 병합된 mp4 {merged}개, 썸네일 {thumbnails}개, "
+              f"실패 {stats['failed']}, yt-dlp 오류 {len(errors.errors)}개")
+        for message in errors.errors:
+            print(f"  {message}")
+        assert merged == count and thumbnails == count and not stats["failed"] and not errors.errors
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "selftest":
+        _selftest(*(int(arg) for arg in sys.argv[2:6]))
+    else:
+        print("사용법: python download_pipeline.py selftest [항목 수] [곡 길이(초)] [KB/s] [다운로드 워커 수]")
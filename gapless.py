@@ -0,0 +1,338 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from PyQt5 import QtCore
+from PyQt5.QtMultimedia import QMediaContent, QMediaPlayer
+
+# 갭리스 재생: QMediaPlayer 두 개를 번갈아 쓰면서 재생 중에 다음 곡을 미리 열어 두고,
+# 현재 곡이 EndOfMedia 에 도달하는 즉시(또는 크로스페이드 구간에서) 준비된 플레이어로 넘긴다.
+# QMediaPlayer 는 샘플 단위 제어를 제공하지 않으므로 "미리 로드 + 즉시 전환" 까지가 한계다.
+FADE_STEP_MS = 30
+MAX_GAP_MS = 50  # _benchmark 합격 기준: 곡 사이 전환 간격 (위치 알림 간격 10 ms 포함)
+
+
+class GaplessPlayer(QtCore.QObject):
+    positionChanged = QtCore.pyqtSignal(int)
+    durationChanged = QtCore.pyqtSignal(int)
+    stateChanged = QtCore.pyqtSignal(int)
+    mediaStatusChanged = QtCore.pyqtSignal(int)
+    trackAdvanced = QtCore.pyqtSignal(str)  # 미리 준비한 다음 곡으로 넘어갔을 때 (곡 경로)
+
+    def __init__(self, crossfade_ms=0, parent=None):
+        super().__init__(parent)
+        self.crossfade_ms = crossfade_ms
+        self.players = [QMediaPlayer(), QMediaPlayer()]
+        self.active_index = 0
+        self.current_path = None
+        self.next_path = None
+        self.next_ready = False
+        self.volume = 100
+        self.track_gains = {}  # 곡 경로 -> 음량 보정 배율 (0~1, loudness 분석 결과)
+        self.muted = False
+        self.notify_interval = 1000
+        self.fading = False
+        self.fade_started = 0.0
+        self.fade_timer = QtCore.QTimer(self)
+        self.fade_timer.setInterval(FADE_STEP_MS)
+        self.fade_timer.timeout.connect(self.fade_step)
+        self.handover_times = []  # 이전 곡 종료 -> 다음 곡 재생 시작까지 걸린 시간 (ms)
+        self.handover_started = None
+        for player in self.players:
+            player.positionChanged.connect(lambda position, p=player: self.on_position(p, position))
+            player.durationChanged.connect(lambda duration, p=player: self.on_duration(p, duration))
+            player.stateChanged.connect(lambda state, p=player: self.on_state(p, state))
+            player.mediaStatusChanged.connect(lambda status, p=player: self.on_status(p, status))
+
+    @property
+    def player(self):
+        return self.players[self.active_index]
+
+    @property
+    def standby(self):
+        return self.players[1 - self.active_index]
+
+    # 현재 곡 제어 (QMediaPlayer 와 같은 이름)
+    def setNotifyInterval(self, interval):
+        self.notify_interval = interval
+        for player in self.players:
+            player.setNotifyInterval(interval)
+
+    def notifyInterval(self):
+        return self.notify_interval
+
+    def play(self):
+        self.player.play()
+
+    def pause(self):
+        # 크로스페이드 중이면 들어오던 다음 곡도 멈춘다 (finish_fade 로 넘기면 그 곡이 계속 재생된다)
+        self.cancel_fade()
+        self.player.pause()
+
+    def stop(self):
+        self.cancel_fade()
+        self.player.stop()
+
+    def position(self):
+        return self.player.position()
+
+    def setPosition(self, position):
+        self.player.setPosition(position)
+
+    def duration(self):
+        return self.player.duration()
+
+    def state(self):
+        return self.player.state()
+
+    def mediaStatus(self):
+        return self.player.mediaStatus()
+
+    def setPlaybackRate(self, rate):
+        self.player.setPlaybackRate(rate)
+
+    def setMuted(self, muted):
+        self.muted = muted
+        for player in self.players:
+            player.setMuted(muted)
+
+    def setVolume(self, volume):
+        self.volume = volume
+        if not self.fading:
+            self.player.setVolume(self.volume_for(self.current_path))
+            self.standby.setVolume(self.volume_for(self.next_path))
+
+    def volume_for(self, path):
+        return int(round(self.volume * self.track_gains.get(path, 1.0)))
+
+    def set_track_gain(self, path, factor):
+        # 재생 중이거나 미리 열어 둔 곡이면 바로 반영한다 (크로스페이드 중에는 fade_step 이 반영)
+        self.track_gains[path] = factor
+        if self.fading:
+            return
+        if path == self.current_path:
+            self.player.setVolume(self.volume_for(path))
+        if path == self.next_path:
+            self.standby.setVolume(self.volume_for(path))
+
+    def load(self, path):
+        # 곡을 직접 선택한 경우: 미리 준비된 곡이면 그대로 넘기고, 아니면 새로 연다
+        self.finish_fade()
+        if path == self.next_path and self.next_ready:
+            self.swap(play=False)
+            return
+        self.player.setMedia(QMediaContent(QtCore.QUrl.fromLocalFile(path)))
+        self.player.setVolume(self.volume_for(path))
+        self.current_path = path
+
+    def preload(self, path):
+        # 대기 중인 플레이어에 다음 곡을 열어 두고 디코더를 준비시킨다 (소리는 나지 않음)
+        if path == self.next_path:
+            return
+        self.next_path = path
+        self.next_ready = False
+        standby = self.standby
+        standby.stop()
+        if path:
+            standby.setMedia(QMediaContent(QtCore.QUrl.fromLocalFile(path)))
+            standby.setVolume(self.volume_for(path))
+        else:
+            standby.setMedia(QMediaContent())
+
+    def advance(self):
+        # 준비된 다음 곡으로 바로 넘어간다. 준비가 안 됐으면 False.
+        # 크로스페이드 중이면 이미 재생 중인 다음 곡으로 페이드를 마무리한다 (다시 swap 하면 한 곡을 건너뛴다).
+        if self.fading:
+            self.finish_fade()
+            return True
+        if not self.next_path or not self.next_ready:
+            return False
+        self.handover_started = time.perf_counter()
+        self.swap()
+        return True
+
+    def swap(self, play=True):
+        previous = self.player
+        self.active_index = 1 - self.active_index
+        self.current_path = self.next_path
+        self.next_path = None
+        self.next_ready = False
+        self.player.setVolume(self.volume_for(self.current_path))
+        if play:
+            self.player.play()
+        previous.stop()
+        self.trackAdvanced.emit(self.current_path)
+
+    # 크로스페이드
+    def start_fade(self):
+        self.fading = True
+        self.fade_started = time.perf_counter()
+        self.standby.setVolume(0)
+        self.standby.play()
+        self.fade_timer.start()
+
+    def fade_step(self):
+        progress = min(1.0, (time.perf_counter() - self.fade_started) * 1000 / max(self.crossfade_ms, 1))
+        self.player.setVolume(int(self.volume_for(self.current_path) * (1.0 - progress)))
+        self.standby.setVolume(int(self.volume_for(self.next_path) * progress))
+        if progress >= 1.0:
+            self.finish_fade()
+
+    def cancel_fade(self):
+        # 다음 곡은 처음으로 되돌려 준비 상태로 두고 현재 곡 음량을 되돌린다. 재개하면 on_position 이 다시 시작한다.
+        if not self.fading:
+            return
+        self.fading = False
+        self.fade_timer.stop()
+        self.standby.stop()
+        self.player.setVolume(self.volume_for(self.current_path))
+        self.standby.setVolume(self.volume_for(self.next_path))
+
+    def finish_fade(self):
+        if not self.fading:
+            return
+        self.fading = False
+        self.fade_timer.stop()
+        previous = self.player
+        self.active_index = 1 - self.active_index
+        self.current_path = self.next_path
+        self.next_path = None
+        self.next_ready = False
+        self.player.setVolume(self.volume_for(self.current_path))
+        previous.stop()
+        self.trackAdvanced.emit(self.current_path)
+
+    # 내부 플레이어 시그널 (현재 곡 플레이어 것만 밖으로 전달)
+    def on_position(self, player, position):
+        if player is not self.player:
+            return
+        if self.handover_started is not None and position > 0:
+            self.handover_times.append((time.perf_counter() - self.handover_started) * 1000)
+            self.handover_started = None
+        self.positionChanged.emit(position)
+        if (self.crossfade_ms > 0 and not self.fading and self.next_ready
+                and player.state() == QMediaPlayer.PlayingState):
+            duration = player.duration()
+            if duration > 0 and duration - position <= self.crossfade_ms:
+                self.start_fade()
+
+    def on_duration(self, player, duration):
+        if player is self.player:
+            self.durationChanged.emit(duration)
+
+    def on_state(self, player, state):
+        if player is self.player:
+            self.stateChanged.emit(state)
+
+    def on_status(self, player, status):
+        if player is not self.player:
+            if status in (QMediaPlayer.LoadedMedia, QMediaPlayer.BufferedMedia) and self.next_path:
+                self.next_ready = True
+            elif status == QMediaPlayer.InvalidMedia:
+                self.next_ready = False
+            return
+        if status == QMediaPlayer.EndOfMedia:
+            # 페이드는 위치 알림(250 ms) 때 시작하므로 곡 끝을 넘길 수 있다. 그때는 여기서 마무리하고
+            # EndOfMedia 는 넘기지 않는다 (UI 가 next_song 으로 한 번 더 넘기지 않게).
+            if self.fading:
+                self.finish_fade()
+                return
+            # 마지막 샘플까지 재생한 뒤 바로 다음 곡으로 (준비가 안 됐으면 UI 가 처리)
+            if self.advance():
+                return
+        self.mediaStatusChanged.emit(status)
+
+
+def make_sine_mp3(path, frequency, seconds, ffmpeg="ffmpeg"):
+    subprocess.run([ffmpeg, "-v", "error", "-y", "-f", "lavfi",
+                    "-i", f"sine=frequency={frequency}:sample_rate=44100:duration={seconds}",
+                    "-c:a", "libmp3lame", "-b:a", "128k", path], check=True)
+
+
+def _benchmark(tracks=4, seconds=3, crossfade_ms=0):
+    # 사인파 MP3 를 만들어 연속 재생하며 곡 사이 전환 간격(ms)을 잰다.
+    # 비교용으로 플레이어 하나에 setMedia 를 다시 하는 기존 방식도 잰다.
+    # 갭리스 엔진의 전환이 모두 MAX_GAP_MS 이내면 True (크로스페이드는 겹쳐 재생하므로 전환 횟수만 본다).
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        print("ffmpeg 가 PATH 에 없습니다.")
+        return False
+    app = QtCore.QCoreApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as root:
+        paths = []
+        for i in range(tracks):
+            path = os.path.join(root, f"sine{i}.mp3")
+            make_sine_mp3(path, 440 + i * 110, seconds, ffmpeg)
+            paths.append(path)
+
+        # 1) 갭리스 엔진
+        engine = GaplessPlayer(crossfade_ms=crossfade_ms)
+        engine.setNotifyInterval(10)
+        state = {"index": 0}
+
+        def on_advanced(path):
+            state["index"] += 1
+            if state["index"] + 1 < len(paths):
+                engine.preload(paths[state["index"] + 1])
+
+        def on_status(status):
+            if status == QMediaPlayer.EndOfMedia:
+                app.quit()
+
+        engine.trackAdvanced.connect(on_advanced)
+        engine.mediaStatusChanged.connect(on_status)
+        engine.load(paths[0])
+        engine.preload(paths[1])
+        engine.play()
+        QtCore.QTimer.singleShot((seconds * tracks + 10) * 1000, app.quit)
+        app.exec_()
+        report("갭리스 (미리 로드)", engine.handover_times)
+        gaps_ok = state["index"] == len(paths) - 1
+        if crossfade_ms == 0:
+            gaps = engine.handover_times
+            gaps_ok = gaps_ok and len(gaps) == len(paths) - 1 and max(gaps) <= MAX_GAP_MS
+
+        # 2) 기존 방식: EndOfMedia 후 같은 플레이어에 setMedia + play
+        player = QMediaPlayer()
+        player.setNotifyInterval(10)
+        gaps = []
+        state = {"index": 0, "ended": None}
+
+        def on_old_status(status):
+            if status == QMediaPlayer.EndOfMedia:
+                state["index"] += 1
+                if state["index"] >= len(paths):
+                    app.quit()
+                    return
+                state["ended"] = time.perf_counter()
+                player.setMedia(QMediaContent(QtCore.QUrl.fromLocalFile(paths[state["index"]])))
+                player.play()
+
+        def on_old_position(position):
+            if state["ended"] is not None and position > 0:
+                gaps.append((time.perf_counter() - state["ended"]) * 1000)
+                state["ended"] = None
+
+        player.mediaStatusChanged.connect(on_old_status)
+        player.positionChanged.connect(on_old_position)
+        player.setMedia(QMediaContent(QtCore.QUrl.fromLocalFile(paths[0])))
+        player.play()
+        QtCore.QTimer.singleShot((seconds * tracks + 10) * 1000, app.quit)
+        app.exec_()
+        report("기존 방식 (setMedia 재사용)", gaps)
+    print(f"갭리스 전환 {'통과' if gaps_ok else '실패'} (기준 {MAX_GAP_MS} ms, 전환 {len(paths) - 1}회)")
+    return gaps_ok
+
+
+def report(label, gaps):
+    if gaps:
+        print(f"{label}: 전환 {len(gaps)}회, 평균 {sum(gaps) / len(gaps):.1f} ms, 최대 {max(gaps):.1f} ms")
+    else:
+        print(f"{label}: 측정된 전환 없음")
+
+
+if __name__ == "__main__":
+    sys.exit(0 if _benchmark(crossfade_ms=int(sys.argv[1]) if len(sys.argv) > 1 else 0) else 1)
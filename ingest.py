@@ -0,0 +1,165 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from app_log import get_logger
+from download_pipeline import DEFAULT_DOWNLOAD_WORKERS, DownloadPipeline, FixturePlaylist, ThrottledHandler
+from playlist_sync import sync_playlist
+
+# 한 번 받아서 MP4 / MP3 / 썸네일을 모두 만드는 통합 수집 (job06_ingest.py).
+# 예전에는 job01 이 bestaudio 를, job02 가 bestvideo+bestaudio 를 또 받았고 job03 이 남은 파일을 옮기고 지웠다.
+# 여기서는 뮤직비디오(MP4)와 썸네일만 받고, MP3 는 받은 MP4 의 오디오 스트림을 로컬에서 인코딩한다.
+# 썸네일은 처음부터 thumbnail/ 에 .webp 로 저장되므로 따로 옮길 파일이 없다.
+log = get_logger("ingest")
+
+MUSIC_DIR = "music"
+MV_DIR = "mv"
+THUMBNAIL_DIR = "thumbnail"
+MP3_QUALITY = "0"  # LAME VBR V0 (job01 의 preferredquality 와 같음)
+
+
+def resolve_ffmpeg(location=None):
+    # yt-dlp 의 ffmpeg_location 과 같은 의미 (실행 파일 또는 폴더)
+    if location:
+        return os.path.join(location, "ffmpeg") if os.path.isdir(location) else location
+    return shutil.which("ffmpeg")
+
+
+def ingest_options(mv_dir=MV_DIR, thumbnail_dir=THUMBNAIL_DIR, ffmpeg_location=None):
+    options = {
+        'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
+        'merge_output_format': 'mp4',
+        'outtmpl': {
+            'default': f"{mv_dir}/%(title)s.%(ext)s",
+            'thumbnail': f"{thumbnail_dir}/%(title)s.%(ext)s",
+        },
+        'writethumbnail': True,
+        'postprocessors': [
+            {'key': 'FFmpegVideoConvertor', 'preferedformat': 'mp4'},
+            {'key': 'FFmpegThumbnailsConvertor', 'format': 'webp'},  # 플레이어는 thumbnail/*.webp 를 읽는다
+        ],
+        'noplaylist': False,
+        'concurrent_fragments': 4,
+        'ignoreerrors': True,
+        'quiet': True,
+        'no_warnings': True,
+    }
+    if ffmpeg_location:
+        options['ffmpeg_location'] = ffmpeg_location
+    return options
+
+
+class MP3Extractor:
+    # 후처리 단계에서 호출된다: 완성된 MP4 의 오디오를 music/<제목>.mp3 로 인코딩
+    def __init__(self, music_dir=MUSIC_DIR, ffmpeg=None, quality=MP3_QUALITY):
+        self.music_dir = music_dir
+        self.ffmpeg = ffmpeg or resolve_ffmpeg()
+        self.quality = quality
+
+    def __call__(self, info):
+        source = info.get("filepath")
+        if not source or not os.path.exists(source):
+            return []
+        os.makedirs(self.music_dir, exist_ok=True)
+        name = os.path.splitext(os.path.basename(source))[0]
+        target = os.path.join(self.music_dir, name + ".mp3")
+        temp_path = os.path.join(self.music_dir, name + ".part.mp3")
+        subprocess.run([self.ffmpeg, "-v", "error", "-nostdin", "-y", "-i", source, "-map", "0:a:0", "-vn",
+                        "-c:a", "libmp3lame", "-q:a", self.quality, temp_path], check=True)
+        os.replace(temp_path, target)
+        return [target]
+
+
+def ingest_playlist(playlist_url, music_dir=MUSIC_DIR, mv_dir=MV_DIR, thumbnail_dir=THUMBNAIL_DIR,
+                    incremental=True, prune=False, download_workers=DEFAULT_DOWNLOAD_WORKERS, ffmpeg_location=None,
+                    **sync_args):
+    options = ingest_options(mv_dir, thumbnail_dir, ffmpeg_location)
+    extract_mp3 = MP3Extractor(music_dir, resolve_ffmpeg(ffmpeg_location))
+    if incremental:
+        return sync_playlist(playlist_url, options, prune=prune, download_workers=download_workers,
+                             after_postprocess=extract_mp3, **sync_args)
+    return DownloadPipeline(options, download_workers=download_workers,
+                            after_postprocess=extract_mp3).run(playlist_url)
+
+
+def legacy_options(root):
+    # 비교용: 기존 job01 (음원) / job02 (뮤직비디오 + 썸네일) 설정
+    audio = {
+        'format': 'bestaudio/best',
+        'outtmpl': f"{root}/music/%(title)s.%(ext)s",
+        'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': MP3_QUALITY}],
+        'quiet': True,
+        'no_warnings': True,
+    }
+    video = {
+        'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
+        'outtmpl': {'default': f"{root}/mv/%(title)s.%(ext)s", 'thumbnail': f"{root}/mv/%(title)s.%(ext)s"},
+        'writethumbnail': True,
+        'postprocessors': [{'key': 'FFmpegVideoConvertor', 'preferedformat': 'mp4'}],
+        'ignoreerrors': True,
+        'quiet': True,
+        'no_warnings': True,
+    }
+    return audio, video
+
+
+def legacy_move(root):
+    # job03 과 같은 정리: mv/ 의 썸네일을 thumbnail/ 로 옮기고 .m4a 를 지운다
+    thumbnail_dir = os.path.join(root, "thumbnail")
+    os.makedirs(thumbnail_dir, exist_ok=True)
+    for filename in os.listdir(os.path.join(root, "mv")):
+        path = os.path.join(root, "mv", filename)
+        if filename.lower().endswith((".webp", ".jpg")):
+            shutil.move(path, os.path.join(thumbnail_dir, filename))
+        elif filename.lower().endswith(".m4a"):
+            os.remove(path)
+
+
+def count_files(folder, extension):
+    if not os.path.isdir(folder):
+        return 0
+    return len([name for name in os.listdir(folder) if name.lower().endswith(extension)])
+
+
+def _benchmark(count=6, seconds=60, rate_kb=1024, workers=DEFAULT_DOWNLOAD_WORKERS):
+    # 로컬 플레이리스트(MP4 + 썸네일)로 기존 job01 + job02 + job03 과 통합 수집의 전송량/시간을 비교한다
+    if not shutil.which("ffmpeg"):
+        print("ffmpeg 가 PATH 에 없습니다.")
+        return
+    with tempfile.TemporaryDirectory() as root, FixturePlaylist(root, count, seconds, rate_kb, video=True) as fixture:
+        print(f"{count}개 항목 (MP4 {fixture.total_mb():.1f} MB, {seconds}초), 연결당 {rate_kb} KB/s, 워커 {workers}")
+
+        legacy = os.path.join(root, "legacy")
+        audio, video = legacy_options(legacy)
+        sent = ThrottledHandler.sent
+        start = time.perf_counter()
+        DownloadPipeline(audio, download_workers=workers).run(fixture.url)
+        DownloadPipeline(video, download_workers=workers).run(fixture.url)
+        legacy_move(legacy)
+        legacy_seconds = time.perf_counter() - start
+        legacy_bytes = ThrottledHandler.sent - sent
+        print(f"기존 (job01 + job02 + job03): {legacy_seconds:.1f} s, 전송 {legacy_bytes / 1e6:.1f} MB -> "
+              f"mp3 {count_files(os.path.join(legacy, 'music'), '.mp3')}, "
+              f"mp4 {count_files(os.path.join(legacy, 'mv'), '.mp4')}, "
+              f"썸네일 {count_files(os.path.join(legacy, 'thumbnail'), '.jpg')}")
+
+        unified = os.path.join(root, "unified")
+        sent = ThrottledHandler.sent
+        start = time.perf_counter()
+        stats = ingest_playlist(fixture.url, *(os.path.join(unified, name) for name in ("music", "mv", "thumbnail")),
+                                incremental=False, download_workers=workers)
+        unified_seconds = time.perf_counter() - start
+        unified_bytes = ThrottledHandler.sent - sent
+        print(f"통합 수집: {unified_seconds:.1f} s, 전송 {unified_bytes / 1e6:.1f} MB -> "
+              f"mp3 {count_files(os.path.join(unified, 'music'), '.mp3')}, "
+              f"mp4 {count_files(os.path.join(unified, 'mv'), '.mp4')}, "
+              f"썸네일 {count_files(os.path.join(unified, 'thumbnail'), '.webp')} (실패 {stats['failed']})")
+        print(f"절약: 전송 {(legacy_bytes - unified_bytes) / 1e6:.1f} MB ({1 - unified_bytes / legacy_bytes:.0%}), "
+              f"시간 {legacy_seconds - unified_seconds:.1f} s ({1 - unified_seconds / legacy_seconds:.0%})")
+
+
+if __name__ == "__main__":
+    _benchmark(*(int(arg) for arg in sys.argv[1:5]))
@@ -1,12 +1,17 @@
 import yt_dlp
 import os
 import ffmpeg
+from download_pipeline import DownloadPipeline, format_stats
+from playlist_sync import format_sync_stats, sync_playlist, update_library
 
 playlist_url = "https://youtube.com/playlist?list=PLn_Pl3CGIaYGMJTra9H9p9clHJhSObMKD&si=zS13qlpRnURU8tGR"
 
 output_path = "music"  # 저장할 폴더
 audio_format = "mp3"   # 출력 형식
 audio_quality = "0"    # 최고 품질
+download_workers = 4   # 동시에 받는 항목 수 (후처리는 별도 스레드)
+incremental = True     # 이미 받은 항목은 건너뛴다 (cache/playlists 상태 파일)
+prune_removed = False  # 플레이리스트에서 빠진 항목의 파일 삭제
 
 if not os.path.exists(output_path):
     os.makedirs(output_path)
@@ -29,10 +34,16 @@ ydl_opts = {
     'no_warnings': True,  # 경고 메시지 비활성화
 }
 
-# 다운로드 실행
+# 다운로드 실행: 항목 목록을 먼저 받고 항목별로 병렬 다운로드, FFmpeg 후처리는 별도 단계에서 진행
 try:
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        ydl.download([playlist_url])
+    if incremental:
+        stats = sync_playlist(playlist_url, ydl_opts, prune=prune_removed, download_workers=download_workers)
+        print(format_sync_stats(stats))
+    else:
+        stats = DownloadPipeline(ydl_opts, download_workers=download_workers).run(playlist_url)
+    print(format_stats(stats))
+    # 플레이어 라이브러리 인덱스도 같이 갱신 (다음 실행 때 새 곡만 분석)
+    update_library()
     print("플레이리스트 음원 추출 완료!")
 except Exception as e:
     print(f"에러 발생: {e}")
@@ -35,4 +35,12 @@ for filename in os.listdir(mv_path):
         except Exception as e:
             print(f"삭제 실패: {filename} - {e}")
 
-print(f"총 {moved_count}개의 .webp 파일을 이동하고, {deleted_count}개의 .m4a 파일을 삭제했습니다.")
\ No newline at end of file
+print(f"총 {moved_count}개의 .webp 파일을 이동하고, {deleted_count}개의 .m4a 파일을 삭제했습니다.")
+
+# 이동한 썸네일의 축소본을 미리 만들어 둔다 (플레이어 첫 실행 시 디코딩 비용 절약)
+try:
+    from thumbnail_cache import ThumbnailDiskCache
+    generated = ThumbnailDiskCache().pregenerate(thumbnail_path)
+    print(f"썸네일 캐시 {generated}개 준비 완료")
+except Exception as e:
+    print(f"썸네일 캐시 생성 실패: {e}")
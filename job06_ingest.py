@@ -0,0 +1,35 @@
+import os
+from download_pipeline import format_stats
+from ingest import ingest_playlist
+from playlist_sync import format_sync_stats, update_library
+
+# 한 번만 받아서 뮤직비디오(MP4), 음원(MP3), 썸네일(WEBP)을 모두 만든다 (job01 + job02 + job03 대신)
+# MP3 는 받은 MP4 의 오디오를 로컬에서 인코딩하므로 같은 곡을 두 번 받지 않고, 옮기거나 지울 파일도 남지 않는다.
+
+# 설정
+playlist_url = "https://youtube.com/playlist?list=PLn_Pl3CGIaYGMJTra9H9p9clHJhSObMKD"
+music_path = "music"    # 음원 저장 폴더
+mv_path = "mv"          # 뮤직비디오 저장 폴더
+thumbnail_path = "thumbnail"  # 썸네일 저장 폴더
+ffmpeg_location = 'D:/utils/ffmpeg-2025-06-04-git-a4c1a5b084-full_build/bin'  # FFmpeg 폴더 (실제 경로로 변경)
+download_workers = 4   # 동시에 받는 항목 수 (후처리는 별도 스레드)
+incremental = True     # 이미 받은 항목은 건너뛴다 (cache/playlists 상태 파일)
+prune_removed = False  # 플레이리스트에서 빠진 항목의 파일 삭제
+
+# 출력 폴더 생성
+for path in (music_path, mv_path, thumbnail_path):
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+# 다운로드 실행
+try:
+    stats = ingest_playlist(playlist_url, music_path, mv_path, thumbnail_path, incremental=incremental,
+                            prune=prune_removed, download_workers=download_workers, ffmpeg_location=ffmpeg_location)
+    if incremental:
+        print(format_sync_stats(stats))
+    print(format_stats(stats))
+    # 플레이어 라이브러리 인덱스도 같이 갱신 (다음 실행 때 새 곡만 분석)
+    update_library(music_path, thumbnail_path, mv_path)
+    print("플레이리스트 뮤직비디오, 음원, 썸네일 다운로드 완료!")
+except Exception as e:
+    print(f"에러 발생: {e}")
@@ -0,0 +1,275 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# 라이브러리 인덱스: music 폴더의 곡 메타데이터를 SQLite 파일에 저장해 두고
+# 크기/수정시간이 바뀐 파일과 새 파일만 다시 분석한다.
+DEFAULT_INDEX_PATH = os.path.join("cache", "library.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    filename TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    artist TEXT,
+    title TEXT,
+    thumbnail TEXT,
+    mv TEXT,
+    cover TEXT,
+    cover_px INTEGER,
+    lufs REAL,
+    peak REAL,
+    gain REAL,
+    loudness_failed INTEGER,
+    fingerprint BLOB,
+    duplicate_of TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS seek_tables (
+    filename TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+"""
+
+COLUMNS = ("filename", "size", "mtime_ns", "duration", "artist", "title", "thumbnail", "mv", "cover", "cover_px",
+           "lufs", "peak", "gain", "loudness_failed", "fingerprint", "duplicate_of")
+
+
+class LibraryIndex:
+    def __init__(self, db_path=DEFAULT_INDEX_PATH):
+        self.db_path = db_path
+        self.conn = None
+        self.last_scan_stats = {}
+
+    def open(self):
+        if self.conn is None:
+            folder = os.path.dirname(self.db_path)
+            if folder and not os.path.isdir(folder):
+                os.makedirs(folder)
+            self.conn = sqlite3.connect(self.db_path)
+            self.conn.executescript(SCHEMA)
+            # 나중에 추가된 열이 없는 예전 인덱스 (NULL 이면 다음 스캔/분석에서 채운다)
+            existing = {row[1] for row in self.conn.execute("PRAGMA table_info(tracks)")}
+            for column, kind in (("cover", "TEXT"), ("cover_px", "INTEGER"),
+                                 ("lufs", "REAL"), ("peak", "REAL"), ("gain", "REAL"), ("loudness_failed", "INTEGER"),
+                                 ("fingerprint", "BLOB"), ("duplicate_of", "TEXT")):
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE tracks ADD COLUMN {column} {kind}")
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def get_meta(self, key, default=None):
+        row = self.open().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        self.open().execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def get_seek_table(self, filename, size, mtime_ns):
+        # 파일이 바뀌었으면 (크기/수정시간 불일치) None
+        row = self.open().execute("SELECT size, mtime_ns, data FROM seek_tables WHERE filename = ?",
+                                  (filename,)).fetchone()
+        if row and row[0] == size and row[1] == mtime_ns:
+            return row[2]
+        return None
+
+    def set_seek_table(self, filename, size, mtime_ns, data):
+        with self.open() as conn:
+            conn.execute("INSERT OR REPLACE INTO seek_tables (filename, size, mtime_ns, data) VALUES (?, ?, ?, ?)",
+                         (filename, size, mtime_ns, data))
+
+    def set_loudness(self, filename, size, mtime_ns, lufs, peak, gain):
+        # 분석하는 동안 파일이 바뀌었으면 (크기/수정시간 불일치) 쓰지 않는다
+        with self.open() as conn:
+            conn.execute("UPDATE tracks SET lufs = ?, peak = ?, gain = ?, loudness_failed = NULL "
+                         "WHERE filename = ? AND size = ? AND mtime_ns = ?",
+                         (lufs, peak, gain, filename, size, mtime_ns))
+
+    def set_loudness_failed(self, filename, size, mtime_ns):
+        # 분석할 수 없는 파일: 파일이 바뀔 때까지 (스캔이 표시를 지울 때까지) 다시 분석하지 않는다
+        with self.open() as conn:
+            conn.execute("UPDATE tracks SET loudness_failed = 1 WHERE filename = ? AND size = ? AND mtime_ns = ?",
+                         (filename, size, mtime_ns))
+
+    def set_fingerprint(self, filename, size, mtime_ns, data):
+        with self.open() as conn:
+            conn.execute("UPDATE tracks SET fingerprint = ? WHERE filename = ? AND size = ? AND mtime_ns = ?",
+                         (data, filename, size, mtime_ns))
+
+    def set_duplicates(self, marks, relinked=()):
+        # marks: [(filename, 원본 파일명)]. 이전 표시는 모두 지우고 새로 쓴다 (marks 가 비면 표시를 모두 지운다).
+        # relinked: [(filename, size, mtime_ns)] 방금 하드 링크로 바꾼 파일 중 행이 링크 전 파일과 맞던 것.
+        # 내용은 그대로라 다시 분석할 필요가 없으므로 크기/수정시간만 링크 뒤 값으로 맞춘다.
+        with self.open() as conn:
+            conn.execute("UPDATE tracks SET duplicate_of = NULL WHERE duplicate_of IS NOT NULL")
+            conn.executemany("UPDATE tracks SET duplicate_of = ? WHERE filename = ?",
+                             [(original, filename) for filename, original in marks])
+            conn.executemany("UPDATE tracks SET size = ?, mtime_ns = ? WHERE filename = ?",
+                             [(size, mtime_ns, filename) for filename, size, mtime_ns in relinked])
+
+    def load_rows(self):
+        rows = self.open().execute(f"SELECT {', '.join(COLUMNS)} FROM tracks").fetchall()
+        return {row[0]: dict(zip(COLUMNS, row)) for row in rows}
+
+    def scan(self, music_dir, probe, parse_info, match_thumbnail, match_music_video, assets_key="",
+             extract_cover=None):
+        entries = []
+        for batch in self.scan_batches(music_dir, probe, parse_info, match_thumbnail, match_music_video,
+                                       assets_key=assets_key, extract_cover=extract_cover):
+            entries.extend(batch)
+        return entries
+
+    def scan_batches(self, music_dir, probe, parse_info, match_thumbnail, match_music_video, assets_key="",
+                     extract_cover=None, batch_size=200, first_batch_size=20):
+        # probe(path) -> 길이(ms), parse_info(filename) -> (artist, title)
+        # match_*(title) -> 에셋 경로 또는 None
+        # extract_cover(path) -> (앨범아트 경로, 짧은 변 픽셀), 없으면 ("", 0). 바뀐 파일만 추출한다.
+        # assets_key 가 바뀌면 (썸네일/뮤직비디오 목록 변경) 모든 곡을 다시 매칭한다.
+        # duplicate_of 는 dedupe.py 가 채운다. 파일이 바뀌거나 원본이 사라지면 지운다.
+        # 파일명 순서대로 batch 단위로 yield 하므로 이어 붙이면 정렬된 목록이 된다.
+        start = time.perf_counter()
+        conn = self.open()
+        cached = self.load_rows()
+        rematch_all = self.get_meta("assets_key") != assets_key
+
+        files = []
+        with os.scandir(music_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.lower().endswith(".mp3"):
+                    st = entry.stat()
+                    files.append((entry.name, st.st_size, st.st_mtime_ns))
+        files.sort()
+        names = {filename for filename, _, _ in files}
+
+        batch = []
+        changed = []
+        probed = 0
+        updated = 0
+        limit = first_batch_size
+        for filename, size, mtime_ns in files:
+            row = cached.pop(filename, None)
+            if row is None or row["size"] != size or row["mtime_ns"] != mtime_ns:
+                duration = probe(os.path.join(music_dir, filename))
+                probed += 1
+                row = {"filename": filename, "size": size, "mtime_ns": mtime_ns, "duration": duration}
+                row["thumbnail"] = None
+                row["mv"] = None
+                row["cover"] = None
+                row["cover_px"] = 0
+                row["lufs"] = row["peak"] = row["gain"] = row["loudness_failed"] = None
+                row["fingerprint"] = row["duplicate_of"] = None
+                rematch = True
+            else:
+                rematch = rematch_all
+            if row["duplicate_of"] is not None and row["duplicate_of"] not in names:
+                row["duplicate_of"] = None
+                if not rematch:
+                    changed.append(row)
+            if extract_cover is not None and row["cover"] is None:
+                row["cover"], row["cover_px"] = extract_cover(os.path.join(music_dir, filename))
+                if not rematch:
+                    changed.append(row)
+            if rematch:
+                artist, title = parse_info(filename)
+                row["artist"] = artist
+                row["title"] = title
+                row["thumbnail"] = match_thumbnail(title)
+                row["mv"] = match_music_video(title)
+                changed.append(row)
+            batch.append(row)
+            if len(batch) >= limit:
+                updated += self._write_rows(changed)
+                changed = []
+                yield batch
+                batch = []
+                limit = batch_size
+
+        updated += self._write_rows(changed)
+        with conn:
+            if cached:
+                # 디스크에서 사라진 곡 정리
+                conn.executemany("DELETE FROM tracks WHERE filename = ?", [(name,) for name in cached])
+                conn.executemany("DELETE FROM seek_tables WHERE filename = ?", [(name,) for name in cached])
+            self.set_meta("assets_key", assets_key)
+
+        self.last_scan_stats = {
+            "files": len(files),
+            "probed": probed,
+            "updated": updated,
+            "removed": len(cached),
+            "seconds": time.perf_counter() - start,
+        }
+        if batch:
+            yield batch
+
+    def _write_rows(self, rows):
+        if rows:
+            with self.open() as conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO tracks ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                    [tuple(row[c] for c in COLUMNS) for row in rows])
+        return len(rows)
+
+
+def make_assets_key(*name_lists):
+    # 에셋 목록이 바뀌었는지 판별하기 위한 간단한 키
+    digest = hashlib.sha1()
+    for names in name_lists:
+        for name in names:
+            digest.update(name.encode("utf-8", "surrogatepass"))
+            digest.update(b"\0")
+        digest.update(b"\1")
+    return digest.hexdigest()
+
+
+def _benchmark(count=5000):
+    # 합성 라이브러리(5k 파일)로 콜드/웜 시작 시간을 비교한다.
+    try:
+        from mutagen.mp3 import MP3
+
+        def probe(path):
+            try:
+                return int(MP3(path).info.length * 1000)
+            except Exception:
+                return 0
+    except ImportError:
+        def probe(path):
+            with open(path, "rb") as f:
+                return len(f.read())
+
+    def parse_info(filename):
+        name = filename.replace(".mp3", "")
+        parts = name.split("_", 1)
+        return (parts[0], parts[1]) if len(parts) == 2 else ("Unknown Artist", name)
+
+    with tempfile.TemporaryDirectory() as root:
+        music_dir = os.path.join(root, "music")
+        os.makedirs(music_dir)
+        payload = b"\xff\xfb\x90\x00" + b"\x00" * 4096
+        for i in range(count):
+            with open(os.path.join(music_dir, f"Artist{i % 97}_Song {i:05d}.mp3"), "wb") as f:
+                f.write(payload)
+
+        index = LibraryIndex(os.path.join(root, "cache", "library.db"))
+        for label in ("cold", "warm"):
+            index.scan(music_dir, probe, parse_info, lambda t: None, lambda t: None)
+            stats = index.last_scan_stats
+            print(f"{label}: {stats['files']}개 파일, {stats['probed']}개 분석, {stats['seconds'] * 1000:.1f} ms")
+        index.close()
+
+
+if __name__ == "__main__":
+    _benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
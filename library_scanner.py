@@ -0,0 +1,55 @@
+import time
+
+from PyQt5 import QtCore
+
+from workers import worker_pool
+
+# 백그라운드 라이브러리 스캔: QThreadPool 워커에서 LibraryIndex 를 돌리고
+# 발견한 곡을 batch 단위로 시그널을 통해 UI 스레드에 전달한다.
+
+
+class ScanSignals(QtCore.QObject):
+    batch_ready = QtCore.pyqtSignal(list)
+    finished = QtCore.pyqtSignal(dict)
+    failed = QtCore.pyqtSignal(str)
+
+
+class LibraryScanTask(QtCore.QRunnable):
+    def __init__(self, index, music_dir, probe, parse_info, match_thumbnail, match_music_video, assets_key="",
+                 extract_cover=None):
+        super().__init__()
+        self.index = index
+        self.music_dir = music_dir
+        self.probe = probe
+        self.parse_info = parse_info
+        self.match_thumbnail = match_thumbnail
+        self.match_music_video = match_music_video
+        self.assets_key = assets_key
+        self.extract_cover = extract_cover
+        self.signals = ScanSignals()
+
+    def run(self):
+        start = time.perf_counter()
+        first_batch_ms = None
+        try:
+            for batch in self.index.scan_batches(self.music_dir, self.probe, self.parse_info,
+                                                 self.match_thumbnail, self.match_music_video,
+                                                 assets_key=self.assets_key, extract_cover=self.extract_cover):
+                if first_batch_ms is None:
+                    first_batch_ms = (time.perf_counter() - start) * 1000
+                self.signals.batch_ready.emit(batch)
+            stats = dict(self.index.last_scan_stats)
+            stats["first_batch_ms"] = first_batch_ms
+            stats["total_ms"] = (time.perf_counter() - start) * 1000
+            self.signals.finished.emit(stats)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        finally:
+            # SQLite 연결은 생성한 스레드에서만 쓸 수 있으므로 워커에서 닫는다
+            self.index.close()
+
+
+def start_scan(task, pool=None):
+    pool = pool or worker_pool()
+    pool.start(task)
+    return task
@@ -0,0 +1,279 @@
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from PyQt5 import QtCore
+
+from app_log import get_logger
+from library_index import LibraryIndex, DEFAULT_INDEX_PATH
+from workers import worker_pool
+
+# 곡별 음량 분석 (EBU R128 / ITU-R BS.1770 방식 통합 음량 + 샘플 피크).
+# ffmpeg 가 48 kHz 로 디코드하면서 K-weighting(고역 선반 + 고역 통과 biquad)을 걸고,
+# 원본/K-weighted 채널을 함께 float32 로 넘겨주면 100 ms 구간 에너지를 NumPy 로 모아
+# 400 ms 블록(75% 겹침), 절대(-70 LUFS)/상대(-10 LU) 게이트로 통합 음량을 계산한다.
+# 곡 전체를 메모리에 올리지 않고 5초씩 읽는다. 분석은 프로세스 풀에서 곡 단위로 돌린다.
+# ffmpeg 위치는 job 스크립트의 ffmpeg_location 처럼 실행 파일이나 bin 폴더로 줄 수 있다
+# (인자, 환경 변수 MP3PLAYER_FFMPEG, 없으면 PATH).
+log = get_logger("loudness")
+FFMPEG_ENV_VAR = "MP3PLAYER_FFMPEG"
+
+RATE = 48000
+SEGMENT = RATE // 10  # 100 ms
+CHUNK_SEGMENTS = 50  # 한 번에 읽는 양 (5초)
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+TARGET_LUFS = -14.0  # 스트리밍 서비스 기준 음량
+# BS.1770 K-weighting 계수 (48 kHz): 1단 고역 선반, 2단 고역 통과 (RLB)
+K_WEIGHTING = (
+    ((1.53512485958697, -2.69169618940638, 1.19839281085285), (1.0, -1.69065929318241, 0.73248077421585)),
+    ((1.0, -2.0, 1.0), (1.0, -1.99004745483398, 0.99007225036621)),
+)
+
+
+def find_ffmpeg(location=None):
+    location = location or os.environ.get(FFMPEG_ENV_VAR)
+    if location:
+        if os.path.isdir(location):
+            return shutil.which("ffmpeg", path=location)
+        return location if os.path.isfile(location) else None
+    return shutil.which("ffmpeg")
+
+
+def k_weighting_filter():
+    stages = []
+    for b, a in K_WEIGHTING:
+        stages.append("biquad=" + ":".join(f"{name}={value!r}" for name, value in
+                                           zip(("b0", "b1", "b2", "a0", "a1", "a2"), b + a)))
+    return ",".join(stages)
+
+
+def decode_command(ffmpeg, path, channels=2):
+    # 출력 채널: 원본 채널들 + K-weighted 채널들 (모노면 2개, 스테레오면 4개)
+    layout = "mono" if channels == 1 else "stereo"
+    graph = (f"[0:a]aresample={RATE},aformat=sample_fmts=dbl:channel_layouts={layout},asplit[raw][k];"
+             f"[k]{k_weighting_filter()}[weighted];[raw][weighted]amerge=inputs=2[out]")
+    return [ffmpeg, "-v", "error", "-nostdin", "-threads", "1", "-i", path, "-filter_complex", graph,
+            "-map", "[out]", "-f", "f32le", "-acodec", "pcm_f32le", "-"]
+
+
+def source_channels(path):
+    try:
+        from mutagen.mp3 import MP3
+        return min(2, MP3(path).info.channels)
+    except Exception:
+        return 2
+
+
+def segment_energies(stream, channels):
+    # (100 ms 구간 수, 채널) K-weighted 제곱합과 원본 샘플 피크
+    frame_bytes = 4 * 2 * channels
+    parts = []
+    peak = 0.0
+    while True:
+        data = stream.read(SEGMENT * CHUNK_SEGMENTS * frame_bytes)
+        if not data:
+            break
+        samples = np.frombuffer(data, np.float32)[:len(data) // frame_bytes * 2 * channels]
+        samples = samples.reshape(-1, 2 * channels)
+        if len(samples):
+            peak = max(peak, float(np.abs(samples[:, :channels]).max()))
+        whole = len(samples) // SEGMENT * SEGMENT  # 마지막 100 ms 미만은 버린다
+        weighted = samples[:whole, channels:].astype(np.float64)
+        parts.append(np.square(weighted).reshape(-1, SEGMENT, channels).sum(axis=1))
+    energies = np.concatenate(parts) if parts else np.zeros((0, channels))
+    return energies, peak
+
+
+def integrated_loudness(energies):
+    # energies: (구간 수, 채널) 100 ms 구간별 제곱합. 블록이 하나도 없으면 None.
+    if len(energies) < 4:
+        return None
+    summed = np.concatenate([np.zeros((1, energies.shape[1])), np.cumsum(energies, axis=0)])
+    power = ((summed[4:] - summed[:-4]) / (4 * SEGMENT)).sum(axis=1)  # L/R 가중치는 1
+    with np.errstate(divide="ignore"):
+        loudness = -0.691 + 10 * np.log10(power)
+    gated = power[loudness > ABSOLUTE_GATE]
+    if not gated.size:
+        return ABSOLUTE_GATE
+    threshold = -0.691 + 10 * np.log10(gated.mean()) + RELATIVE_GATE
+    gated = power[(loudness > ABSOLUTE_GATE) & (loudness > threshold)]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+def track_gain(lufs, peak, target=TARGET_LUFS):
+    # 목표 음량까지의 보정(dB). 올려서 피크가 0 dBFS 를 넘으면 그만큼 줄인다.
+    gain = target - lufs
+    if peak > 0:
+        gain = min(gain, -20 * np.log10(peak))
+    return round(float(gain), 2)
+
+
+def gain_to_volume_factor(gain_db):
+    # QMediaPlayer 볼륨은 선형이고 100 이 최대라 줄이기만 할 수 있다
+    return min(1.0, 10 ** (gain_db / 20))
+
+
+def analyze_file(path, ffmpeg=None):
+    # 프로세스 풀에서 실행된다. {"lufs", "peak", "gain"} 또는 예외.
+    ffmpeg = ffmpeg or find_ffmpeg()
+    channels = source_channels(path)
+    process = subprocess.Popen(decode_command(ffmpeg, path, channels),
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        energies, peak = segment_energies(process.stdout, channels)
+    finally:
+        process.stdout.close()
+        error = process.stderr.read().decode("utf-8", "replace").strip()
+        process.stderr.close()
+        process.wait()
+    if process.returncode != 0:
+        raise RuntimeError(error or f"ffmpeg 종료 코드 {process.returncode}")
+    lufs = integrated_loudness(energies)
+    if lufs is None:
+        raise ValueError("400 ms 보다 짧은 곡")
+    return {"lufs": round(lufs, 2), "peak": round(peak, 5), "gain": track_gain(lufs, peak)}
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def analyze_files(paths, workers=None, ffmpeg=None, on_result=None):
+    # 경로 목록을 프로세스 풀에서 분석한다. on_result(path, result 또는 None) 은 끝나는 순서대로 호출된다.
+    # None 은 그 파일 분석이 실패했다는 뜻이다. 풀이 깨져 분석하지 못한 파일은 on_result 를 부르지 않는다.
+    # Qt 스레드가 있는 프로세스에서 fork 하지 않도록 spawn 으로 띄운다.
+    ffmpeg = ffmpeg or find_ffmpeg()
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers or default_workers(), mp_context=context) as pool:
+        futures = {pool.submit(analyze_file, path, ffmpeg): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                log.warning("음량 분석 프로세스 오류: %s - %s", path, e)
+                results[path] = None
+                continue
+            except Exception as e:
+                log.warning("음량 분석 실패: %s - %s", path, e)
+                result = None
+            results[path] = result
+            if on_result is not None:
+                on_result(path, result)
+    return results
+
+
+class LoudnessSignals(QtCore.QObject):
+    analyzed = QtCore.pyqtSignal(str, dict)  # (파일명, {"lufs", "peak", "gain"})
+    finished = QtCore.pyqtSignal(dict)
+
+
+class LoudnessTask(QtCore.QRunnable):
+    # rows: [(filename, size, mtime_ns)] 분석할 곡. 결과는 워커 스레드에서 라이브러리 인덱스에 바로 쓴다.
+    # 분석에 실패한 곡은 loudness_failed 로 표시해 파일이 바뀌기 전까지 다시 분석하지 않는다.
+    def __init__(self, music_dir, rows, db_path=DEFAULT_INDEX_PATH, workers=None, ffmpeg=None):
+        super().__init__()
+        self.music_dir = music_dir
+        self.rows = rows
+        self.db_path = db_path
+        self.workers = workers
+        self.ffmpeg = ffmpeg
+        self.signals = LoudnessSignals()
+
+    def run(self):
+        start = time.perf_counter()
+        index = LibraryIndex(self.db_path)
+        stamps = {os.path.join(self.music_dir, filename): (filename, size, mtime_ns)
+                  for filename, size, mtime_ns in self.rows}
+        analyzed = 0
+
+        def store(path, result):
+            nonlocal analyzed
+            filename, size, mtime_ns = stamps[path]
+            if result is None:
+                index.set_loudness_failed(filename, size, mtime_ns)
+                return
+            index.set_loudness(filename, size, mtime_ns, result["lufs"], result["peak"], result["gain"])
+            analyzed += 1
+            self.signals.analyzed.emit(filename, result)
+
+        try:
+            analyze_files(list(stamps), self.workers, self.ffmpeg, on_result=store)
+        except Exception:
+            log.exception("음량 분석 오류")
+        finally:
+            index.close()
+        seconds = time.perf_counter() - start
+        self.signals.finished.emit({"tracks": analyzed, "failed": len(stamps) - analyzed, "seconds": seconds})
+
+
+def start_analysis(task, pool=None):
+    pool = pool or worker_pool()
+    pool.start(task)
+    return task
+
+
+def ebur128_reference(ffmpeg, path):
+    # 검증용: ffmpeg ebur128 필터가 계산한 통합 음량
+    output = subprocess.run([ffmpeg, "-nostdin", "-hide_banner", "-i", path, "-af", "ebur128", "-f", "null", "-"],
+                            capture_output=True, text=True).stderr
+    for line in reversed(output.splitlines()):
+        line = line.strip()
+        if line.startswith("I:") and "LUFS" in line:
+            return float(line.split()[1])
+    return None
+
+
+def _benchmark(count=12, seconds=60, max_workers=None):
+    # 음량이 다른 합성 곡들로 ffmpeg ebur128 과 값을 비교하고, 워커 수 1..N 에서의 처리량을 잰다
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        print("ffmpeg 가 PATH 에 없습니다.")
+        return
+    max_workers = max_workers or max(2, os.cpu_count() or 1)
+    with tempfile.TemporaryDirectory() as root:
+        paths = []
+        for i in range(count):
+            path = os.path.join(root, f"track{i:02d}.mp3")
+            volume = -30 + i * 25 / max(count - 1, 1)
+            layout = "mono" if i % 4 == 3 else "stereo"
+            source = (f"anoisesrc=color=pink:duration={seconds}:seed={i},volume={volume:.1f}dB,"
+                      f"aformat=channel_layouts={layout}")
+            subprocess.run([ffmpeg, "-v", "error", "-y", "-f", "lavfi", "-i", source, "-c:a", "libmp3lame",
+                            "-b:a", "192k", path], check=True)
+            paths.append(path)
+
+        results = analyze_files(paths, 1, ffmpeg)
+        errors = []
+        for path in paths[:4] + paths[-2:]:
+            reference = ebur128_reference(ffmpeg, path)
+            result = results[path]
+            errors.append(abs(result["lufs"] - reference))
+            print(f"{os.path.basename(path)}: {result['lufs']:6.2f} LUFS (ebur128 {reference:6.2f}), "
+                  f"피크 {result['peak']:.3f}, 보정 {result['gain']:+.2f} dB")
+        print(f"ebur128 과의 최대 차이 {max(errors):.2f} LU")
+
+        cores = os.cpu_count() or 1
+        baseline = None
+        for workers in range(1, max_workers + 1):
+            start = time.perf_counter()
+            analyze_files(paths, workers, ffmpeg)
+            elapsed = time.perf_counter() - start
+            per_minute = count * 60 / elapsed
+            baseline = baseline or per_minute
+            print(f"워커 {workers}개: {per_minute:6.1f} 곡/분 ({seconds}초 곡), "
+                  f"코어당 {per_minute / min(workers, cores):6.1f} 곡/분, 속도 향상 x{per_minute / baseline:.2f}")
+        print(f"CPU 코어 {cores}개")
+
+
+if __name__ == "__main__":
+    _benchmark(*(int(arg) for arg in sys.argv[1:4]))
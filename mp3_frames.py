@@ -0,0 +1,410 @@
+import mmap
+import os
+import random
+import statistics
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+from PyQt5 import QtCore
+
+from app_log import get_logger
+from library_index import DEFAULT_INDEX_PATH, LibraryIndex
+from workers import worker_pool
+
+# MP3 탐색 테이블: 파일의 프레임 헤더를 한 번 훑어 프레임마다 바이트 위치를 기록한다.
+# Xing/VBRI 목차가 없거나 부정확한 VBR 파일도 시간 <-> 바이트 위치를 프레임 단위(약 26 ms)로
+# 정확히 알 수 있다. 테이블은 라이브러리 인덱스(cache/library.db)에 곡별로 저장한다.
+log = get_logger("mp3_frames")
+
+# Layer III 비트레이트 (kbps): MPEG1 / MPEG2, 2.5
+BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+TABLE_HEADER = struct.Struct("<IIQI")  # 샘플레이트, 프레임당 샘플 수, 첫 프레임 위치, 프레임 수
+PROBE_BYTES = 16384  # 길이 확인에 읽는 양 (ID3v2 뒤 첫 프레임 주변)
+
+
+def parse_header(data, pos):
+    # Layer III 프레임 헤더 -> (프레임 길이, 샘플레이트, 프레임당 샘플 수, 비트레이트 bps) 또는 None
+    if data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+    b1 = data[pos + 1]
+    b2 = data[pos + 2]
+    version = (b1 >> 3) & 3
+    if version == 1 or (b1 >> 1) & 3 != 1:
+        return None
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 3
+    if bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    padding = (b2 >> 1) & 1
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    if version == 3:
+        bitrate = BITRATES[1][bitrate_index] * 1000
+        return 144 * bitrate // sample_rate + padding, sample_rate, 1152, bitrate
+    bitrate = BITRATES[2][bitrate_index] * 1000
+    return 72 * bitrate // sample_rate + padding, sample_rate, 576, bitrate
+
+
+def id3v2_size(data):
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        return 10 + size + (10 if data[5] & 0x10 else 0)
+    return 0
+
+
+def is_info_frame(data, pos, length):
+    # LAME/Xing "Xing"/"Info" 또는 "VBRI" 헤더만 담긴 첫 프레임은 소리가 없으므로 뺀다
+    head = data[pos:pos + min(length, 64)]
+    return b"Xing" in head or b"Info" in head or b"VBRI" in head
+
+
+def find_first_frame(data, pos=0):
+    # 다음 프레임 헤더까지 맞아야 프레임으로 인정한다 (태그 안의 우연한 0xFF 방지)
+    while True:
+        pos = data.find(b"\xff", pos)
+        if pos < 0 or pos + 4 > len(data):
+            return None, None
+        header = parse_header(data, pos)
+        if header is not None:
+            following = pos + header[0]
+            if following + 4 > len(data):
+                return pos, header
+            second = parse_header(data, following)
+            if second is not None and second[1] == header[1]:
+                return pos, header
+        pos += 1
+
+
+def probe_duration_ms(path):
+    # 헤더만 읽어 곡 길이(ms)를 구한다: ID3v2 는 크기만 보고 건너뛰고, 첫 프레임의
+    # Xing/Info(+LAME 지연/패딩) 또는 VBRI 프레임 수를 쓰고, 없으면 CBR 로 보고 파일 크기에서 계산.
+    # 프레임을 못 찾으면 None (호출한 쪽이 mutagen 으로 대신한다).
+    with open(path, "rb") as f:
+        start = id3v2_size(f.read(10))
+        f.seek(start)
+        data = f.read(PROBE_BYTES)
+        pos, header = find_first_frame(data)
+        if pos is None:
+            return None
+        length, sample_rate, samples_per_frame, bitrate = header
+        mono = data[pos + 3] >> 6 == 3
+        if samples_per_frame == 1152:
+            xing = pos + (21 if mono else 36)
+        else:
+            xing = pos + (13 if mono else 21)
+        tag = data[xing:xing + 4]
+        if tag in (b"Xing", b"Info") and len(data) >= xing + 8:
+            flags = int.from_bytes(data[xing + 4:xing + 8], "big")
+            cursor = xing + 8
+            if flags & 1:
+                samples = int.from_bytes(data[cursor:cursor + 4], "big") * samples_per_frame
+                cursor += 4
+                cursor += 4 if flags & 2 else 0
+                cursor += 100 if flags & 4 else 0
+                cursor += 4 if flags & 8 else 0
+                if data[cursor:cursor + 4] == b"LAME" and len(data) >= cursor + 24:
+                    # LAME 태그 21~23 바이트: 인코더 지연(12비트) + 끝 패딩(12비트)
+                    delay = (data[cursor + 21] << 4) | (data[cursor + 22] >> 4)
+                    padding = ((data[cursor + 22] & 0x0F) << 8) | data[cursor + 23]
+                    samples -= delay + padding
+                return max(samples, 0) * 1000 // sample_rate
+        vbri = pos + 36
+        if data[vbri:vbri + 4] == b"VBRI" and len(data) >= vbri + 18:
+            frames = int.from_bytes(data[vbri + 14:vbri + 18], "big")
+            return frames * samples_per_frame * 1000 // sample_rate
+        end = os.fstat(f.fileno()).st_size
+        if end >= 128:
+            f.seek(end - 128)
+            if f.read(3) == b"TAG":
+                end -= 128
+        return max(end - start - pos, 0) * 8000 // bitrate
+
+
+class SeekTable:
+    def __init__(self, sample_rate, samples_per_frame, first_offset, frame_lengths):
+        self.sample_rate = sample_rate
+        self.samples_per_frame = samples_per_frame
+        self.frame_lengths = frame_lengths
+        self.offsets = array("Q", accumulate(frame_lengths, initial=first_offset))  # 마지막 값은 끝 위치
+
+    @property
+    def frames(self):
+        return len(self.frame_lengths)
+
+    @property
+    def duration_ms(self):
+        return self.frames * self.samples_per_frame * 1000 // self.sample_rate
+
+    def frame_index(self, ms):
+        index = int(ms * self.sample_rate / (self.samples_per_frame * 1000))
+        return min(max(index, 0), max(self.frames - 1, 0))
+
+    def frame_time(self, index):
+        return index * self.samples_per_frame * 1000 // self.sample_rate
+
+    def snap(self, ms):
+        # ms 가 들어 있는 프레임의 시작 시각
+        return self.frame_time(self.frame_index(ms))
+
+    def byte_offset(self, ms):
+        return self.offsets[self.frame_index(ms)]
+
+    def time_at_offset(self, offset):
+        return self.frame_time(max(bisect_right(self.offsets, offset) - 1, 0))
+
+    def to_bytes(self):
+        lengths = array("I", self.frame_lengths)
+        if sys.byteorder == "big":
+            lengths.byteswap()
+        return TABLE_HEADER.pack(self.sample_rate, self.samples_per_frame, self.offsets[0],
+                                 self.frames) + zlib.compress(lengths.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data):
+        sample_rate, samples_per_frame, first_offset, frames = TABLE_HEADER.unpack_from(data)
+        lengths = array("I")
+        lengths.frombytes(zlib.decompress(data[TABLE_HEADER.size:]))
+        if sys.byteorder == "big":
+            lengths.byteswap()
+        if len(lengths) != frames:
+            raise ValueError("탐색 테이블 손상")
+        return cls(sample_rate, samples_per_frame, first_offset, lengths)
+
+
+def build_seek_table(path):
+    # 프레임 헤더만 따라가며 길이를 모은다. 깨진 구간은 다음 동기 신호(0xFF)까지 건너뛴다.
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            end = len(data)
+            if end >= 128 and data[end - 128:end - 125] == b"TAG":
+                end -= 128
+            pos = id3v2_size(data)
+            lengths = array("I")
+            first_offset = None
+            expected = None  # 앞 프레임이 끝나는 위치
+            sample_rate = samples_per_frame = None
+            while pos + 4 <= end:
+                header = parse_header(data, pos)
+                if header is None or (sample_rate is not None and header[1] != sample_rate):
+                    pos = data.find(b"\xff", pos + 1, end)
+                    if pos < 0:
+                        break
+                    continue
+                length = header[0]
+                if pos + length > end:
+                    break
+                if sample_rate is None:
+                    sample_rate, samples_per_frame = header[1], header[2]
+                    if is_info_frame(data, pos, length):
+                        pos += length
+                        continue
+                if first_offset is None:
+                    first_offset = pos
+                elif pos != expected:
+                    # 건너뛴 구간은 앞 프레임 길이에 붙여 뒤쪽 바이트 위치가 어긋나지 않게 한다
+                    lengths[-1] += pos - expected
+                lengths.append(length)
+                pos += length
+                expected = pos
+    if first_offset is None:
+        return None
+    return SeekTable(sample_rate, samples_per_frame, first_offset, lengths)
+
+
+class SeekTableSignals(QtCore.QObject):
+    ready = QtCore.pyqtSignal(str, object)
+
+
+class SeekTableTask(QtCore.QRunnable):
+    def __init__(self, path, db_path, signals):
+        super().__init__()
+        self.path = path
+        self.db_path = db_path
+        self.signals = signals
+
+    def run(self):
+        # SQLite 연결은 스레드마다 따로 쓴다
+        index = LibraryIndex(self.db_path)
+        try:
+            st = os.stat(self.path)
+            filename = os.path.basename(self.path)
+            data = index.get_seek_table(filename, st.st_size, st.st_mtime_ns)
+            table = SeekTable.from_bytes(data) if data else None
+            if table is None:
+                table = build_seek_table(self.path)
+                if table is not None:
+                    index.set_seek_table(filename, st.st_size, st.st_mtime_ns, table.to_bytes())
+            self.signals.ready.emit(self.path, table)
+        except Exception:
+            log.exception("탐색 테이블 오류: %s", self.path)
+            self.signals.ready.emit(self.path, None)  # 대기 목록에서 빼도록 알린다
+        finally:
+            index.close()
+
+
+class SeekTableCache:
+    # 재생 중인 곡 주변의 탐색 테이블을 메모리에 두고, 없으면 워커에서 읽거나 만든다
+    def __init__(self, db_path=DEFAULT_INDEX_PATH, max_entries=8, pool=None):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.pool = pool or worker_pool()
+        self.signals = SeekTableSignals()
+        self.signals.ready.connect(self.store)
+        self.tables = {}
+        self.pending = set()
+        self.listeners = []
+
+    def get(self, path):
+        table = self.tables.pop(path, None)
+        if table is not None:
+            self.tables[path] = table
+        return table
+
+    def request(self, path):
+        if not path or path in self.tables or path in self.pending:
+            return
+        self.pending.add(path)
+        self.pool.start(SeekTableTask(path, self.db_path, self.signals))
+
+    def store(self, path, table):
+        self.pending.discard(path)
+        if table is None:
+            return
+        self.tables[path] = table
+        while len(self.tables) > self.max_entries:
+            self.tables.pop(next(iter(self.tables)))
+        for listener in self.listeners:
+            listener(path)
+
+
+def write_vbr_mp3(path, frames, rng, id3_size=2048):
+    # 합성 VBR 파일: MPEG1 Layer III 44.1 kHz, 프레임마다 비트레이트가 바뀌고 Xing 목차는 없다
+    # rng 가 None 이면 128 kbps CBR
+    with open(path, "wb") as f:
+        f.write(b"ID3\x03\x00\x00" + bytes([(id3_size >> 21) & 0x7F, (id3_size >> 14) & 0x7F,
+                                           (id3_size >> 7) & 0x7F, id3_size & 0x7F]) + b"\0" * id3_size)
+        # 조용한 구간(낮은 비트레이트)과 복잡한 구간(높은 비트레이트)이 번갈아 나오게 한다
+        level = 9
+        for _ in range(frames):
+            if rng is not None:
+                level = min(14, max(1, level + rng.choice((-1, 0, 0, 1))))
+            header = bytes((0xFF, 0xFB, (level << 4), 0x00))
+            length = 144 * BITRATES[1][level] * 1000 // 44100
+            f.write(header + b"\0" * (length - 4))
+
+
+def _benchmark(files=3, frames=9000, targets=1000):
+    # 합성 VBR 파일로 목표 시각 -> 바이트 위치 변환의 정확도(그 위치가 실제로 속한 프레임의 시각과
+    # 목표 시각의 차이)와 조회 지연을 잰다. 재생 백엔드(QMediaPlayer)가 실제로 어디에 도착하는지는 재지 않는다.
+    # 비교: 첫 프레임 비트레이트로 CBR 가정 / 평균 비트레이트로 비례 계산 (목차 없는 백엔드의 추정)
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as root:
+        index = LibraryIndex(os.path.join(root, "library.db"))
+        errors = {"테이블": [], "CBR 가정": [], "평균 비트레이트": []}
+        build_ms, load_ms, lookup_us, sizes = [], [], [], []
+        misses = 0  # 도착한 프레임이 목표 시각이 들어 있는 프레임이 아닌 경우
+        for i in range(files):
+            path = os.path.join(root, f"vbr{i}.mp3")
+            write_vbr_mp3(path, frames, rng)
+            start = time.perf_counter()
+            table = build_seek_table(path)
+            build_ms.append((time.perf_counter() - start) * 1000)
+            data = table.to_bytes()
+            sizes.append(len(data))
+            st = os.stat(path)
+            index.set_seek_table(os.path.basename(path), st.st_size, st.st_mtime_ns, data)
+            start = time.perf_counter()
+            table = SeekTable.from_bytes(index.get_seek_table(os.path.basename(path), st.st_size, st.st_mtime_ns))
+            load_ms.append((time.perf_counter() - start) * 1000)
+
+            first = table.offsets[0]
+            first_bitrate = table.frame_lengths[0] * 44100 / 144  # bps
+            average = (table.offsets[-1] - first) / table.duration_ms  # bytes/ms
+            for _ in range(targets):
+                ms = rng.uniform(0, table.duration_ms)
+                start = time.perf_counter()
+                offset = table.byte_offset(ms)
+                lookup_us.append((time.perf_counter() - start) * 1e6)
+                landed = table.time_at_offset(offset)
+                misses += landed != table.snap(ms)
+                errors["테이블"].append(abs(landed - ms))
+                errors["CBR 가정"].append(abs(table.time_at_offset(first + ms * first_bitrate / 8000) - ms))
+                errors["평균 비트레이트"].append(abs(table.time_at_offset(first + ms * average) - ms))
+        index.close()
+    print(f"합성 VBR {files}개 x {frames}프레임 ({table.duration_ms / 1000:.0f}초)")
+    print(f"테이블 생성 {statistics.mean(build_ms):.1f} ms/곡, DB 에서 읽기 {statistics.mean(load_ms):.2f} ms/곡, "
+          f"크기 {statistics.mean(sizes) / 1024:.1f} KB/곡, 조회 {statistics.mean(lookup_us):.2f} us")
+    for label, values in errors.items():
+        ordered = sorted(values)
+        print(f"{label}: 오차 평균 {statistics.mean(ordered):.0f} ms, "
+              f"p95 {ordered[int(len(ordered) * 0.95)]:.0f} ms, 최대 {ordered[-1]:.0f} ms")
+    # 테이블 탐색은 목표 시각이 든 프레임의 시작에 도착해야 하므로 오차는 한 프레임(+ 정수 ms 내림 1 ms) 이내
+    limit_ms = table.samples_per_frame * 1000 / table.sample_rate + 1
+    ok = misses == 0 and max(errors["테이블"]) <= limit_ms
+    print(f"탐색 테이블 변환 {'통과' if ok else '실패'} (기준 {limit_ms:.1f} ms, 다른 프레임 도착 {misses}회)")
+    return ok
+
+
+def _benchmark_probe(count=300):
+    # 합성 코퍼스(앨범아트가 든 CBR, 목차 없는 VBR, ffmpeg 가 있으면 LAME VBR/CBR)로
+    # 헤더 프로브와 mutagen 의 길이 비교 + 초당 처리 파일 수
+    import shutil
+    import subprocess
+    from mutagen.id3 import APIC, ID3
+    from mutagen.mp3 import MP3
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as root:
+        kinds = []
+        path = os.path.join(root, "cbr_art.mp3")
+        write_vbr_mp3(path, 4000, None)
+        tags = ID3()
+        tags.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="cover", data=os.urandom(300 * 1024)))
+        tags.save(path)
+        kinds.append(path)
+        path = os.path.join(root, "vbr_notoc.mp3")
+        write_vbr_mp3(path, 4000, rng)
+        kinds.append(path)
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg:
+            for name, options in (("lame_vbr.mp3", ["-q:a", "2"]), ("lame_cbr.mp3", ["-b:a", "192k"]),
+                                  ("lame_mono22k.mp3", ["-ac", "1", "-ar", "22050", "-b:a", "64k"])):
+                path = os.path.join(root, name)
+                subprocess.run([ffmpeg, "-v", "error", "-y", "-f", "lavfi", "-i", "anoisesrc=d=20:a=0.3",
+                                "-c:a", "libmp3lame", *options, path], check=True)
+                kinds.append(path)
+        corpus = []
+        for i in range(count):
+            path = os.path.join(root, f"song{i:04d}_{os.path.basename(kinds[i % len(kinds)])}")
+            shutil.copyfile(kinds[i % len(kinds)], path)
+            corpus.append(path)
+
+        for path in kinds:
+            fast = probe_duration_ms(path)
+            reference = int(MP3(path).info.length * 1000)
+            print(f"{os.path.basename(path)}: 프로브 {fast} ms, mutagen {reference} ms, 차이 {abs(fast - reference)} ms")
+
+        for label, probe in (("mutagen", lambda p: MP3(p).info.length), ("헤더 프로브", probe_duration_ms)):
+            start = time.perf_counter()
+            for path in corpus:
+                probe(path)
+            elapsed = time.perf_counter() - start
+            print(f"{label}: {len(corpus) / elapsed:.0f} 파일/s ({elapsed * 1000 / len(corpus):.3f} ms/파일)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "probe":
+        _benchmark_probe(int(sys.argv[2]) if len(sys.argv) > 2 else 300)
+    else:
+        sys.exit(0 if _benchmark() else 1)
@@ -0,0 +1,93 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from mutagen.mp3 import MP3
+from mutagen.mp4 import MP4
+
+from app_log import get_logger
+
+# 단일 디코더 뮤직비디오 모드: MV 의 오디오 트랙 길이가 MP3 와 거의 같으면
+# MP3 플레이어를 멈추고 MP4 하나만 (자체 오디오 포함) 재생한다.
+# 진행 표시/탐색은 MP3 타임라인 기준이므로 두 길이의 비율로 위치를 변환한다.
+log = get_logger("mv_audio")
+
+DURATION_TOLERANCE_MS = 1500
+
+
+def probe_mv_duration(path):
+    # MP4 헤더만 읽어 첫 오디오 트랙 길이(ms)를 구한다. 실패하면 0.
+    try:
+        return int(MP4(path).info.length * 1000)
+    except Exception as e:
+        log.warning("뮤직비디오 길이 가져오기 오류: %s - %s", path, e)
+        return 0
+
+
+def durations_match(mp3_ms, mv_ms, tolerance_ms=DURATION_TOLERANCE_MS):
+    return mp3_ms > 0 and mv_ms > 0 and abs(mp3_ms - mv_ms) <= tolerance_ms
+
+
+class TimelineMap:
+    # MP3 타임라인 <-> MV 타임라인 선형 변환
+    def __init__(self, mp3_ms, mv_ms):
+        self.mp3_ms = mp3_ms
+        self.mv_ms = mv_ms
+
+    def to_mp3(self, mv_position):
+        return min(self.mp3_ms, int(mv_position * self.mp3_ms / self.mv_ms))
+
+    def to_mv(self, mp3_position):
+        return min(self.mv_ms, int(mp3_position * self.mv_ms / self.mp3_ms))
+
+
+def decode_cpu_seconds(ffmpeg, args):
+    # ffmpeg 로 끝까지 디코드(-f null)하고 자식 프로세스 CPU 시간(user+sys)을 돌려준다.
+    # resource 는 POSIX 전용이라 벤치마크에서만 가져온다 (플레이어는 Windows 에서도 이 모듈을 읽는다).
+    import resource
+
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    subprocess.run([ffmpeg, "-v", "error", "-threads", "1", *args, "-f", "null", "-"], check=True)
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+
+
+def _benchmark(mp3_path=None, mv_path=None, seconds=60):
+    # 두 플레이어 방식(MP3 디코드 + 음소거된 MP4 의 영상/음성 디코드)과
+    # 단일 디코더 방식(MP4 영상/음성만)의 디코드 CPU 시간을 비교한다.
+    # 경로를 주지 않으면 ffmpeg 로 테스트용 MP3/MP4 를 만든다.
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        print("ffmpeg 가 PATH 에 없습니다.")
+        return
+    with tempfile.TemporaryDirectory() as root:
+        if not (mp3_path and mv_path):
+            mp3_path = os.path.join(root, "song.mp3")
+            mv_path = os.path.join(root, "song.mp4")
+            subprocess.run([ffmpeg, "-v", "error", "-y", "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+                            "-c:a", "libmp3lame", "-b:a", "192k", mp3_path], check=True)
+            subprocess.run([ffmpeg, "-v", "error", "-y",
+                            "-f", "lavfi", "-i", f"testsrc2=size=1280x720:rate=30:duration={seconds}",
+                            "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+                            "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-shortest", mv_path],
+                           check=True)
+        mp3_ms = int(MP3(mp3_path).info.length * 1000)
+        mv_ms = probe_mv_duration(mv_path)
+        print(f"MP3 {mp3_ms} ms, MV 오디오 {mv_ms} ms, 단일 디코더 사용 가능: {durations_match(mp3_ms, mv_ms)}")
+
+        start = time.perf_counter()
+        dual = decode_cpu_seconds(ffmpeg, ["-i", mp3_path]) + decode_cpu_seconds(ffmpeg, ["-i", mv_path])
+        dual_wall = time.perf_counter() - start
+        start = time.perf_counter()
+        single = decode_cpu_seconds(ffmpeg, ["-i", mv_path])
+        single_wall = time.perf_counter() - start
+        print(f"두 플레이어 (MP3 + MP4): CPU {dual:.2f} s ({dual_wall:.2f} s)")
+        print(f"단일 디코더 (MP4 만):    CPU {single:.2f} s ({single_wall:.2f} s), "
+              f"절감 {(1 - single / dual) if dual else 0:.0%}")
+
+
+if __name__ == "__main__":
+    _benchmark(*sys.argv[1:3])
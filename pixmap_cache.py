@@ -0,0 +1,115 @@
+import os
+from collections import OrderedDict
+
+from PyQt5 import QtCore, QtGui
+
+# 디코딩/스케일링이 끝난 QPixmap 을 메모리에 보관하는 LRU 캐시.
+# 키는 (경로, 수정시간, 종류, 가로, 세로) 이고 전체 크기는 바이트 예산으로 제한한다.
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+
+
+class PixmapCache:
+    def __init__(self, max_bytes=DEFAULT_BUDGET_BYTES, disk_cache=None):
+        self.max_bytes = max_bytes
+        self.disk_cache = disk_cache
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prefetched = set()
+        self.prefetch_hits = 0
+
+    def make_key(self, path, kind, width, height):
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        return (path, mtime_ns, kind, width, height)
+
+    def get(self, path, kind="source", width=0, height=0):
+        # kind: "source" (원본), "scaled" (비율 유지 축소), "rounded" (둥근 모서리 앨범아트),
+        #       "background" (화면을 꽉 채우도록 확대/축소)
+        key = self.make_key(path, kind, width, height) if path else None
+        if key is None:
+            return QtGui.QPixmap()
+        pixmap = self.entries.get(key)
+        if pixmap is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            if key in self.prefetched:
+                self.prefetched.discard(key)
+                self.prefetch_hits += 1
+            return pixmap
+        self.misses += 1
+        pixmap = self.build(path, kind, width, height)
+        if not pixmap.isNull():
+            self.insert(key, pixmap)
+        return pixmap
+
+    def contains(self, path, kind="source", width=0, height=0):
+        key = self.make_key(path, kind, width, height) if path else None
+        return key in self.entries
+
+    def insert_prefetched(self, path, kind, width, height, pixmap):
+        # 선읽기로 만든 pixmap 을 넣는다 (적중률 집계를 위해 따로 표시)
+        key = self.make_key(path, kind, width, height)
+        if key is None or pixmap.isNull() or key in self.entries:
+            return
+        self.insert(key, pixmap)
+        self.prefetched.add(key)
+
+    def build(self, path, kind, width, height):
+        if kind != "source" and self.disk_cache is not None:
+            # 디스크 캐시에 미리 줄여 둔 파일이 있으면 원본 대신 사용
+            path = self.disk_cache.get(path, width, height) or path
+        source = QtGui.QPixmap(path)
+        if source.isNull() or kind == "source":
+            return source
+        if kind == "background":
+            return source.scaled(width, height, QtCore.Qt.KeepAspectRatioByExpanding, QtCore.Qt.SmoothTransformation)
+        scaled = source.scaled(width, height, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        if kind == "scaled":
+            return scaled
+        rounded = QtGui.QPixmap(width, height)
+        rounded.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(rounded)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setBrush(QtGui.QBrush(scaled))
+        painter.setPen(QtCore.Qt.NoPen)
+        painter.drawRoundedRect(0, 0, width, height, 8, 8)
+        painter.end()
+        return rounded
+
+    def insert(self, key, pixmap):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= pixmap_bytes(old)
+        self.entries[key] = pixmap
+        self.total_bytes += pixmap_bytes(pixmap)
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            evicted_key, evicted = self.entries.popitem(last=False)
+            self.prefetched.discard(evicted_key)
+            self.total_bytes -= pixmap_bytes(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.prefetched.clear()
+        self.total_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "prefetch_hits": self.prefetch_hits,
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+        }
+
+
+def pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
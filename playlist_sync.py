@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from app_log import get_logger
+from cover_art import extract_cover
+from dedupe import dedupe_library
+from download_pipeline import (DEFAULT_DOWNLOAD_WORKERS, DownloadPipeline, FixturePlaylist, entry_key,
+                               playlist_entries, summarize)
+from library_index import DEFAULT_INDEX_PATH, LibraryIndex, make_assets_key
+from mp3_frames import probe_duration_ms
+from title_index import TitleIndex
+
+# 증분 플레이리스트 동기화 (job01/job02 다시 실행할 때).
+# 플레이리스트별 상태 파일(cache/playlists/<해시>.json)에 항목 id -> 결과 파일(경로, 크기, sha1)을 남겨 두고,
+# 다음 실행에서는 항목 목록(extract_flat)만 받아 새 항목과 파일이 사라지거나 바뀐 항목만 다시 받는다.
+# 플레이리스트에서 빠진 항목은 알려 주기만 하고, prune=True 면 파일까지 지운다.
+# 받은 목록이 비었거나 알고 있는 항목의 대부분이 한꺼번에 빠지면 목록 쪽 문제로 보고 지우지 않는다.
+log = get_logger("playlist_sync")
+STATE_DIR = os.path.join("cache", "playlists")
+STATE_VERSION = 1
+MAX_PRUNE_FRACTION = 0.5  # 한 번에 지울 수 있는 항목 비율 (알고 있는 항목 기준)
+
+
+def state_path(playlist_url, ydl_opts, state_dir=STATE_DIR):
+    # 같은 플레이리스트라도 job01(음원)과 job02(뮤직비디오)는 결과가 다르므로 출력 경로 템플릿까지 키에 넣는다
+    key = f"{playlist_url}\0{ydl_opts.get('outtmpl')!r}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(state_dir, f"{digest}.json")
+
+
+def load_state(path, playlist_url):
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION and state.get("playlist_url") == playlist_url:
+            return state
+    except (OSError, ValueError) as e:
+        if os.path.exists(path):
+            log.warning("동기화 상태 파일을 읽지 못해 새로 만듭니다: %s - %s", path, e)
+    return {"version": STATE_VERSION, "playlist_url": playlist_url, "entries": {}}
+
+
+def save_state(path, state):
+    folder = os.path.dirname(path)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    os.replace(temp_path, path)
+
+
+def file_checksum(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_record(path):
+    return {"path": path, "size": os.path.getsize(path), "sha1": file_checksum(path)}
+
+
+def entry_intact(record, verify=False):
+    # 결과 파일이 모두 그대로 있는지. 기본은 크기만 보고, verify=True 면 sha1 까지 비교한다.
+    if not record.get("files"):
+        return False
+    for item in record["files"]:
+        try:
+            if os.path.getsize(item["path"]) != item["size"]:
+                return False
+        except OSError:
+            return False
+        if verify and file_checksum(item["path"]) != item["sha1"]:
+            return False
+    return True
+
+
+def sync_playlist(playlist_url, ydl_opts, prune=False, verify=False, download_workers=DEFAULT_DOWNLOAD_WORKERS,
+                  state_dir=STATE_DIR, after_postprocess=None, max_prune_fraction=MAX_PRUNE_FRACTION):
+    start = time.perf_counter()
+    path = state_path(playlist_url, ydl_opts, state_dir)
+    state = load_state(path, playlist_url)
+    entries = playlist_entries(playlist_url, ydl_opts)  # 목록 추출 실패는 예외 (상태 파일은 그대로)
+    extract_seconds = time.perf_counter() - start
+
+    known = state["entries"]
+    current = {entry_key(entry): entry for entry in entries}
+    if not current and known:
+        raise RuntimeError(f"플레이리스트 항목이 0개라 동기화하지 않습니다 (알고 있는 항목 {len(known)}개)")
+    pending = [entry for key, entry in current.items() if key not in known or not entry_intact(known[key], verify)]
+    removed = [key for key in known if key not in current]
+    prune_limit = len(known) * max_prune_fraction
+    log.info("플레이리스트 항목 %s개: 새로 받을 항목 %s개, 빠진 항목 %s개", len(current), len(pending), len(removed))
+
+    if pending:
+        stats = DownloadPipeline(ydl_opts, download_workers=download_workers,
+                                 after_postprocess=after_postprocess).run_entries(pending, extract_seconds, start)
+    else:
+        stats = summarize([], extract_seconds, time.perf_counter() - start)
+    for result in stats["results"]:
+        if not result["error"] and result["files"]:
+            known[result["id"]] = {"title": result["title"], "files": [file_record(p) for p in result["files"]],
+                                   "synced_at": int(time.time())}
+
+    pruned = 0
+    if prune and len(removed) > prune_limit:
+        log.warning("빠진 항목이 너무 많아 삭제하지 않습니다: %d개 (한 번에 %d개까지, max_prune_fraction=%s)",
+                    len(removed), prune_limit, max_prune_fraction)
+    elif prune:
+        for key in removed:
+            for item in known.pop(key)["files"]:
+                try:
+                    os.remove(item["path"])
+                except OSError:
+                    pass
+            pruned += 1
+    elif removed:
+        log.info("플레이리스트에서 빠진 항목: " + ", ".join(known[key].get("title") or key for key in removed))
+    save_state(path, state)
+
+    stats.update(skipped=len(current) - len(pending), removed=len(removed), pruned=pruned,
+                 total_s=time.perf_counter() - start)
+    return stats
+
+
+def format_sync_stats(stats):
+    return (f"받음 {stats['done']}개 (실패 {stats['failed']}), 건너뜀 {stats['skipped']}개, "
+            f"빠진 항목 {stats['removed']}개 (삭제 {stats['pruned']}), 전체 {stats['total_s']:.1f} s")
+
+
+def parse_song_info(filename):
+    # temp9 MP3PlayerUI.parse_song_info 와 같은 규칙 ("가수_제목.mp3")
+    name_without_ext = filename.replace(".mp3", "")
+    parts = name_without_ext.split("_", 1)
+    if len(parts) >= 2:
+        return parts[0].strip(), parts[1].strip()
+    return "Unknown Artist", parts[0].strip()
+
+
+def update_library(music_dir="music", thumbnail_dir="thumbnail", mv_dir="mv", db_path=DEFAULT_INDEX_PATH,
+                   dedupe=True, fingerprints=False):
+    # 플레이어와 같은 방식으로 라이브러리 인덱스를 갱신해 두면 다음 실행 때 바뀐 곡을 다시 분석하지 않는다
+    # dedupe=True 면 중복 곡을 찾아 인덱스에 표시한다 (파일은 건드리지 않음, 플레이어 목록에서만 숨김).
+    # 기본은 완전히 같은 파일만 숨긴다. fingerprints=True 면 인코딩만 다른 같은 곡(오디오 지문 일치)도 숨기는데,
+    # 지문은 드물게 다른 곡을 묶을 수 있다. 표시는 실행할 때마다 새로 쓰므로 기본값으로 다시 실행하면 풀린다.
+    def listing(folder, extension):
+        if not os.path.isdir(folder):
+            return []
+        return sorted(f for f in os.listdir(folder) if f.lower().endswith(extension))
+
+    if not os.path.isdir(music_dir):
+        return {}
+    thumbnails = listing(thumbnail_dir, ".webp")
+    videos = listing(mv_dir, ".mp4")
+    thumbnail_index = TitleIndex(thumbnails, thumbnail_dir, ".webp")
+    mv_index = TitleIndex(videos, mv_dir, ".mp4")
+    index = LibraryIndex(db_path)
+    try:
+        index.scan(music_dir, lambda path: probe_duration_ms(path) or 0, parse_song_info,
+                   thumbnail_index.lookup, mv_index.lookup, assets_key=make_assets_key(thumbnails, videos),
+                   extract_cover=extract_cover)
+        stats = dict(index.last_scan_stats)
+    finally:
+        index.close()
+    if dedupe:
+        stats["duplicates"] = dedupe_library(music_dir, mv_dir, db_path, fingerprints=fingerprints)["stats"]["marked"]
+    return stats
+
+
+def _benchmark(count=8, seconds=60, rate_kb=512):
+    # 로컬 플레이리스트로 전체 실행과 변경 없는 재동기화, 항목 추가/삭제 후 동기화 시간을 비교한다
+    if not shutil.which("ffmpeg"):
+        print("ffmpeg 가 PATH 에 없습니다.")
+        return
+    with tempfile.TemporaryDirectory() as root, FixturePlaylist(root, count, seconds, rate_kb) as fixture:
+        music_dir = os.path.join(root, "music")
+        state_dir = os.path.join(root, "state")
+        db_path = os.path.join(root, "library.db")
+        options = fixture.audio_options(music_dir)
+        print(f"{count}개 항목 ({fixture.total_mb():.1f} MB, {seconds}초 곡), 연결당 {rate_kb} KB/s")
+
+        def run(label, **kwargs):
+            start = time.perf_counter()
+            stats = sync_playlist(fixture.url, options, state_dir=state_dir, **kwargs)
+            library = update_library(music_dir, db_path=db_path)
+            elapsed = time.perf_counter() - start
+            print(f"{label}: {format_sync_stats(stats)}, 라이브러리 {library['files']}곡 "
+                  f"(분석 {library['probed']}, 삭제 {library['removed']}) -> {elapsed:.2f} s")
+            return elapsed
+
+        full = run("전체 실행")
+        resync = run("변경 없음")
+        print(f"변경 없는 재동기화 속도 향상 x{full / resync:.1f}")
+
+        os.remove(os.path.join(music_dir, "Artist1_Song 1.mp3"))
+        run("파일 1개 삭제됨")
+        fixture.add_item(shutil.which("ffmpeg"), count)
+        fixture.write_feed(range(1, count + 1))
+        run("항목 1개 추가, 1개 제외 (prune)", prune=True)
+        run("변경 없음 (sha1 확인)", verify=True)
+
+
+if __name__ == "__main__":
+    _benchmark(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,90 @@
+from PyQt5 import QtCore, QtGui
+
+from app_log import get_logger
+
+# 캐러셀 썸네일 선읽기: 현재 위치 주변 ±radius 칸의 썸네일을 전용 스레드에서 읽고 줄여
+# 시그널로 UI 스레드에 넘긴다. 스크롤 방향이 바뀌면 아직 시작하지 않은 요청은 버린다.
+log = get_logger("prefetch")
+DEFAULT_RADIUS = 4
+
+
+class PrefetchSignals(QtCore.QObject):
+    loaded = QtCore.pyqtSignal(str, int, int, QtGui.QImage)
+
+
+class PrefetchTask(QtCore.QRunnable):
+    def __init__(self, prefetcher, generation, path, width, height):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self.generation = generation
+        self.path = path
+        self.width = width
+        self.height = height
+
+    def run(self):
+        prefetcher = self.prefetcher
+        if self.generation != prefetcher.generation:
+            return
+        try:
+            disk_cache = prefetcher.disk_cache
+            resized = disk_cache.get(self.path, self.width, self.height) if disk_cache else None
+            image = QtGui.QImage(resized or self.path)
+            if image.isNull():
+                prefetcher.signals.loaded.emit(self.path, self.width, self.height, image)  # 대기 목록에서 빼도록 알린다
+                return
+            if image.width() > self.width or image.height() > self.height:
+                image = image.scaled(self.width, self.height, QtCore.Qt.KeepAspectRatio,
+                                     QtCore.Qt.SmoothTransformation)
+            prefetcher.signals.loaded.emit(self.path, self.width, self.height, image)
+        except Exception:
+            log.exception("썸네일 선읽기 오류: %s", self.path)
+            prefetcher.signals.loaded.emit(self.path, self.width, self.height, QtGui.QImage())
+
+
+class ThumbnailPrefetcher:
+    def __init__(self, pixmap_cache, disk_cache=None, radius=DEFAULT_RADIUS, width=116, height=116):
+        self.pixmap_cache = pixmap_cache
+        self.disk_cache = disk_cache
+        self.radius = radius
+        self.width = width
+        self.height = height
+        # 방향이 바뀌면 대기 중인 작업을 pool.clear() 로 지우므로 다른 작업과 풀을 같이 쓰지 않는다
+        self.pool = QtCore.QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.signals = PrefetchSignals()
+        self.signals.loaded.connect(self.store)
+        self.generation = 0
+        self.direction = 0
+        self.pending = set()
+        self.requested = 0
+        self.cancelled = 0
+
+    def request(self, paths, direction=0):
+        # paths: 가까운 순서대로 정렬된 썸네일 경로 목록
+        if direction and self.direction and direction != self.direction:
+            self.cancel()
+        if direction:
+            self.direction = direction
+        for path in paths:
+            if not path or path in self.pending:
+                continue
+            if self.pixmap_cache.contains(path, "scaled", self.width, self.height):
+                continue
+            self.pending.add(path)
+            self.requested += 1
+            self.pool.start(PrefetchTask(self, self.generation, path, self.width, self.height))
+
+    def cancel(self):
+        self.generation += 1
+        self.pool.clear()
+        self.cancelled += len(self.pending)
+        self.pending.clear()
+
+    def store(self, path, width, height, image):
+        self.pending.discard(path)
+        if image.isNull():
+            return
+        self.pixmap_cache.insert_prefetched(path, "scaled", width, height, QtGui.QPixmap.fromImage(image))
+
+    def stats(self):
+        return {"requested": self.requested, "cancelled": self.cancelled, "pending": len(self.pending)}
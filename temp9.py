@@ -1,11 +1,72 @@
+import argparse
 import sys
 import os
+import time
 from PyQt5 import QtWidgets, QtGui, QtCore
-from PyQt5.QtWidgets import QGraphicsOpacityEffect, QLabel, QTextEdit, QGraphicsBlurEffect
+from PyQt5.QtWidgets import QGraphicsOpacityEffect, QLabel, QTextEdit
 from PyQt5.QtMultimediaWidgets import QVideoWidget
 from PyQt5.QtCore import QTimer, QPoint, QPropertyAnimation, QEasingCurve, QRect
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+from PyQt5.QtMultimedia import QMediaPlayer
 from mutagen.mp3 import MP3
+from library_index import LibraryIndex, make_assets_key
+from library_scanner import LibraryScanTask, start_scan
+from pixmap_cache import PixmapCache
+from thumbnail_cache import ThumbnailDiskCache
+from blur import BlurredBackgroundCache
+from title_index import TitleIndex
+from prefetch import ThumbnailPrefetcher, DEFAULT_RADIUS as DEFAULT_PREFETCH_RADIUS
+from gapless import GaplessPlayer
+from av_sync import AVSyncController
+from mv_audio import TimelineMap, durations_match, probe_mv_duration
+from video_preroll import VideoPreroll, DEFAULT_MEMORY_CAP_MB
+from mp3_frames import SeekTableCache, probe_duration_ms
+from cover_art import choose_thumbnail, extract_cover
+from loudness import LoudnessTask, find_ffmpeg, gain_to_volume_factor, start_analysis
+from app_log import get_logger, setup_logging
+
+log = get_logger("temp9")
+
+# 캐러셀 타일 단계별 모양: (크기, 테두리 색, 테두리 두께) - 가운데 / 이웃 / 바깥
+TILE_TIERS = (
+    (int(120 * 1.1), "#FFD700", 3),
+    (int(120 * 0.95), "#87CEEB", 2),
+    (int(120 * 0.8), "#ddd", 1),
+)
+TILE_STYLES = tuple(f"""
+    border: {border_width}px solid {border_color};
+    background-color: white;
+    border-radius: 8px;
+    color: #999;
+""" for _, border_color, border_width in TILE_TIERS)
+
+# 캐러셀 애니메이션 상수 (속도 단위 px/s)
+FRAME_INTERVAL_MS = 16
+MAX_FRAME_SECONDS = 0.05
+INERTIA_MIN_SPEED = 300.0
+INERTIA_STOP_SPEED = 30.0
+INERTIA_DECAY_PER_SECOND = 0.92 ** (1 / 0.03)  # 예전 30ms 마다 0.92 배와 같은 감속
+SNAP_REMAINING_PER_SECOND = 0.85 ** (1 / 0.016)  # 예전 16ms 마다 남은 거리의 15% 이동과 같은 속도
+RELEASE_IDLE_SECONDS = 0.1
+
+# 재생 진행 표시: 위치 알림 간격 (ms). 창이 안 보일 때는 곡 전환 판단용으로만 드물게 받는다.
+PROGRESS_INTERVAL_MS = 250
+HIDDEN_PROGRESS_INTERVAL_MS = 1000
+
+def tile_state(index, x, offset, center_position, last_index):
+    # 캐러셀 타일 위치로 (단계, 불투명도) 를 계산한다
+    distance_from_center = abs(x + 60 - center_position)
+    if distance_from_center < 65:
+        opacity = 1.0
+        tier = 0
+    elif distance_from_center <= 130:  # 멈춰 있을 때 바로 옆 타일은 중심에서 정확히 130px 떨어져 있다
+        opacity = 0.8
+        tier = 1
+    else:
+        opacity = max(0.4, 1.0 - (distance_from_center / 300))
+        tier = 2
+    if (index == 0 and offset > 0) or (index == last_index and offset < 0):
+        opacity = max(0.2, 1.0 - abs(offset) / 130)
+    return tier, opacity
 
 class ThumbnailLabel(QLabel):
     def __init__(self, parent=None):
@@ -13,6 +74,28 @@ class ThumbnailLabel(QLabel):
         self.setMouseTracking(True)
         self.top_widget = None
         self.is_hovered = False
+        # 드래그 중 재사용하는 상태 (효과 객체는 한 번만 만든다)
+        self.song_file = None
+        self.tier = None
+        self.opacity = None
+        self.opacity_effect = QGraphicsOpacityEffect(self)
+        self.opacity_effect.setEnabled(False)
+        self.setGraphicsEffect(self.opacity_effect)
+
+    def apply_tier(self, tier):
+        # 단계가 바뀔 때만 스타일시트/크기를 다시 설정한다
+        if tier != self.tier:
+            self.tier = tier
+            size = TILE_TIERS[tier][0]
+            self.setFixedSize(size, size)
+            self.setStyleSheet(TILE_STYLES[tier])
+
+    def apply_opacity(self, opacity):
+        opacity = round(opacity, 2)
+        if opacity != self.opacity:
+            self.opacity = opacity
+            self.opacity_effect.setOpacity(opacity)
+            self.opacity_effect.setEnabled(opacity < 1.0)
 
     def set_info_text(self, artist, song):
         self.setProperty("artist", artist)
@@ -44,18 +127,24 @@ class ThumbnailWidget(QtWidgets.QWidget):
         super().__init__(parent)
         self.dragging = False
         self.last_pos = None
-        self.velocity = 0.0
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.apply_inertia)
+        self.last_move_time = 0.0
+        self.velocity = 0.0  # px/s
+        self.pending_delta = 0
         self.offset = 0
         self.target_offset = 0
+        self.animation = None  # None(정지), "drag", "inertia", "snap"
         self.setStyleSheet("background-color: transparent;")
         self.setFixedSize(600, 200)
         self.setAttribute(QtCore.Qt.WA_StyledBackground, True)
 
-        self.smooth_timer = QTimer()
-        self.smooth_timer.timeout.connect(self.smooth_animation_step)
-        self.animation_speed = 0.15
+        # 프레임 시계: 움직일 게 있을 때만 돌고, 정지 상태에서는 타이머가 완전히 멈춘다.
+        # 매 프레임 실제 경과 시간(monotonic)만큼 진행하므로 이벤트 빈도나 타이머 지터와 무관하다.
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.frame_timer.setInterval(FRAME_INTERVAL_MS)
+        self.frame_timer.timeout.connect(self.on_frame)
+        self.last_frame_time = 0.0
+        self.frame_count = 0
 
         self.info_label = QLabel(self)
         self.info_label.setFixedSize(250, 60)
@@ -108,101 +197,224 @@ class ThumbnailWidget(QtWidgets.QWidget):
         if event.button() == QtCore.Qt.LeftButton and self.parent().songs_list:
             self.dragging = True
             self.last_pos = event.pos().x()
+            self.last_move_time = time.monotonic()
             self.velocity = 0.0
-            self.timer.stop()
-            self.smooth_timer.stop()
+            self.pending_delta = 0
+            self.stop_animation()
 
     def mouseMoveEvent(self, event):
         if not self.dragging or not self.parent().songs_list:
             return
         try:
+            # 이동량은 모아 두었다가 다음 프레임에서 한 번에 반영한다
+            now = time.monotonic()
             current_pos = event.pos().x()
             delta = current_pos - self.last_pos
-            self.offset += delta
+            dt = max(now - self.last_move_time, 0.001)
             self.last_pos = current_pos
-            self.velocity = delta / 0.05
-
-            while self.offset >= 130:
-                self.offset -= 130
-                self.parent().current_display_index = (self.parent().current_display_index - 1) % len(
-                    self.parent().songs_list)
-                self.parent().update_thumbnails()
-            while self.offset <= -130:
-                self.offset += 130
-                self.parent().current_display_index = (self.parent().current_display_index + 1) % len(
-                    self.parent().songs_list)
-                self.parent().update_thumbnails()
-
-            self.parent().update_thumbnails_with_offset(self.offset)
-        except Exception as e:
-            print(f"mouseMoveEvent 오류: {e}")
+            self.last_move_time = now
+            self.pending_delta += delta
+            self.velocity = 0.8 * (delta / dt) + 0.2 * self.velocity
+            self.start_animation("drag")
+        except Exception:
+            log.exception("mouseMoveEvent 오류")
 
     def mouseReleaseEvent(self, event):
-        if event.button() == QtCore.Qt.LeftButton:
+        if event.button() == QtCore.Qt.LeftButton and self.dragging:
             self.dragging = False
             try:
-                if abs(self.velocity) > 15:
-                    self.timer.start(30)
+                self.apply_pending_delta()
+                if time.monotonic() - self.last_move_time > RELEASE_IDLE_SECONDS:
+                    self.velocity = 0.0  # 멈춘 뒤 손을 뗀 경우
+                if abs(self.velocity) > INERTIA_MIN_SPEED:
+                    self.start_animation("inertia")
                 else:
                     self.snap_to_grid()
-            except Exception as e:
-                print(f"mouseReleaseEvent 오류: {e}")
-
-    def apply_inertia(self):
-        if not self.parent().songs_list:
-            self.timer.stop()
-            return
-        try:
-            if abs(self.velocity) < 3:
-                self.timer.stop()
-                self.snap_to_grid()
-                return
+            except Exception:
+                log.exception("mouseReleaseEvent 오류")
 
-            self.offset += self.velocity * 0.03
-            self.velocity *= 0.92
+    def start_animation(self, mode):
+        self.animation = mode
+        if not self.frame_timer.isActive():
+            self.last_frame_time = time.monotonic()
+            self.frame_timer.start()
 
-            while self.offset >= 130:
-                self.offset -= 130
-                self.parent().current_display_index = (self.parent().current_display_index - 1) % len(
-                    self.parent().songs_list)
-                self.parent().update_thumbnails()
-            while self.offset <= -130:
-                self.offset += 130
-                self.parent().current_display_index = (self.parent().current_display_index + 1) % len(
-                    self.parent().songs_list)
-                self.parent().update_thumbnails()
+    def stop_animation(self):
+        self.animation = None
+        self.frame_timer.stop()
 
+    def on_frame(self):
+        try:
+            now = time.monotonic()
+            dt = min(now - self.last_frame_time, MAX_FRAME_SECONDS)
+            self.last_frame_time = now
+            if self.animation == "drag":
+                moved = self.apply_pending_delta()
+                if not moved:
+                    self.stop_animation()  # 누른 채 멈춰 있으면 쉬게 한다
+                    return
+            elif self.animation == "inertia":
+                self.apply_inertia(dt)
+            elif self.animation == "snap":
+                self.smooth_animation_step(dt)
+            else:
+                self.stop_animation()
+                return
+            self.frame_count += 1
             self.parent().update_thumbnails_with_offset(self.offset)
-        except Exception as e:
-            print(f"apply_inertia 오류: {e}")
+        except Exception:
+            self.stop_animation()
+            log.exception("on_frame 오류")
+
+    def apply_pending_delta(self):
+        if not self.pending_delta:
+            return False
+        self.offset += self.pending_delta
+        self.pending_delta = 0
+        self.wrap_offset()
+        return True
+
+    def wrap_offset(self):
+        # 한 칸(130px) 이상 밀리면 표시 시작 인덱스를 옮기고 오프셋을 되돌린다
+        parent = self.parent()
+        count = len(parent.songs_list)
+        shifted = False
+        while self.offset >= 130:
+            self.offset -= 130
+            parent.current_display_index = (parent.current_display_index - 1) % count
+            shifted = True
+        while self.offset <= -130:
+            self.offset += 130
+            parent.current_display_index = (parent.current_display_index + 1) % count
+            shifted = True
+        if shifted:
+            parent.update_thumbnails()
+
+    def apply_inertia(self, dt):
+        if not self.parent().songs_list:
+            self.stop_animation()
+            return
+        if abs(self.velocity) < INERTIA_STOP_SPEED:
+            self.snap_to_grid()
+            return
+        self.offset += self.velocity * dt
+        self.velocity *= INERTIA_DECAY_PER_SECOND ** dt
+        self.wrap_offset()
 
     def snap_to_grid(self):
         try:
+            # 가장 가까운 칸으로 표시 인덱스를 먼저 옮기고 남은 오프셋만 0 으로 애니메이션한다
             steps = round(self.offset / 130)
             self.target_offset = 0
             if steps != 0:
-                self.parent().current_display_index = (self.parent().current_display_index - steps) % len(
-                    self.parent().songs_list)
-            if abs(self.offset) > 5:
-                self.smooth_timer.start(16)
+                parent = self.parent()
+                self.offset -= steps * 130
+                parent.current_display_index = (parent.current_display_index - steps) % len(parent.songs_list)
+                parent.update_thumbnails()
+            if abs(self.offset) > 0.5:
+                self.start_animation("snap")
             else:
                 self.offset = 0
-                self.parent().update_thumbnails()
-        except Exception as e:
-            print(f"snap_to_grid 오류: {e}")
+                self.stop_animation()
+                self.parent().update_thumbnails_with_offset(self.offset)
+        except Exception:
+            log.exception("snap_to_grid 오류")
+
+    def smooth_animation_step(self, dt):
+        diff = self.target_offset - self.offset
+        if abs(diff) < 0.5:
+            self.offset = self.target_offset
+            self.stop_animation()
+            return
+        self.offset += diff * (1.0 - SNAP_REMAINING_PER_SECOND ** dt)
 
-    def smooth_animation_step(self):
-        try:
-            if abs(self.offset - self.target_offset) < 1:
-                self.smooth_timer.stop()
-                self.offset = self.target_offset
-                self.parent().update_thumbnails()
-                return
-            diff = self.target_offset - self.offset
-            self.offset += diff * self.animation_speed
-            self.parent().update_thumbnails_with_offset(self.offset)
-        except Exception as e:
-            print(f"smooth_animation_step 오류: {e}")
+class CarouselCanvas(ThumbnailWidget):
+    # 라벨 위젯 없이 paintEvent 한 번으로 캐러셀 전체를 그리는 렌더러.
+    # 관성/스냅/드래그 처리는 ThumbnailWidget 것을 그대로 쓴다.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMouseTracking(True)
+        self.tiles = []  # (song_index, pixmap 또는 None, artist, song_name)
+        self.positions = []
+        self.center_position = 0
+        self.hovered_tile = None
+        self.tile_font = QtGui.QFont()
+        self.tile_font.setPixelSize(12)
+        self.tier_pens = []
+        for _, border_color, border_width in TILE_TIERS:
+            pen = QtGui.QPen(QtGui.QColor(border_color))
+            pen.setWidth(border_width)
+            self.tier_pens.append(pen)
+
+    def set_tiles(self, tiles, positions, center_tile):
+        self.tiles = tiles
+        self.positions = positions
+        self.center_position = positions[center_tile] + 60
+        self.update()
+
+    def tile_rect(self, index):
+        x = int(self.positions[index] + self.offset)
+        tier, _ = tile_state(index, x, self.offset, self.center_position, len(self.tiles) - 1)
+        size = TILE_TIERS[tier][0]
+        return QRect(x, 15, size, size)
+
+    def tile_at(self, pos):
+        for index in range(len(self.tiles)):
+            if self.tile_rect(index).contains(pos):
+                return index
+        return None
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+        painter.setFont(self.tile_font)
+        last = len(self.tiles) - 1
+        for index, (song_index, pixmap, artist, song_name) in enumerate(self.tiles):
+            x = int(self.positions[index] + self.offset)
+            tier, opacity = tile_state(index, x, self.offset, self.center_position, last)
+            size = TILE_TIERS[tier][0]
+            rect = QRect(x, 15, size, size)
+            if not rect.intersects(event.rect()):
+                continue
+            painter.setOpacity(opacity)
+            painter.setPen(self.tier_pens[tier])
+            painter.setBrush(QtCore.Qt.white)
+            painter.drawRoundedRect(rect.adjusted(1, 1, -1, -1), 8, 8)
+            if pixmap is not None and not pixmap.isNull():
+                target = pixmap.rect()
+                target.setSize(target.size().scaled(size - 4, size - 4, QtCore.Qt.KeepAspectRatio))
+                target.moveCenter(rect.center())
+                painter.drawPixmap(target, pixmap)
+            else:
+                painter.setPen(QtGui.QColor("#999"))
+                painter.drawText(rect, QtCore.Qt.AlignCenter, "No Image")
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        if not self.dragging:
+            index = self.tile_at(event.pos())
+            if index != self.hovered_tile:
+                self.hovered_tile = index
+                if index is None:
+                    self.hide_info_label()
+                else:
+                    _, _, artist, song_name = self.tiles[index]
+                    self.show_info_label(artist, song_name, self.tile_rect(index))
+            return
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        if self.hovered_tile is not None:
+            self.hovered_tile = None
+            self.hide_info_label()
+        super().leaveEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        if event.button() == QtCore.Qt.LeftButton:
+            index = self.tile_at(event.pos())
+            if index is not None:
+                self.parent().thumbnail_clicked(index)
 
 class CurtainWidget(QtWidgets.QWidget):
     def __init__(self, parent=None):
@@ -245,14 +457,21 @@ class CurtainWidget(QtWidgets.QWidget):
         animation.start()
 
 class MP3PlayerUI(QtWidgets.QWidget):
-    def __init__(self):
+    def __init__(self, visible_tiles=5, carousel_mode="widgets", prefetch_radius=DEFAULT_PREFETCH_RADIUS,
+                 crossfade_ms=0, mv_audio=True, video_preroll=True, preroll_memory_mb=DEFAULT_MEMORY_CAP_MB,
+                 replaygain=True, loudness_workers=None, ffmpeg_location=None):
         super().__init__()
+        self.visible_tiles = visible_tiles
+        self.carousel_mode = carousel_mode  # "widgets" (라벨) 또는 "painter" (paintEvent)
+        self.center_tile = visible_tiles // 2
         self.current_song_index = -1
         self.songs_list = []
         self.thumbnail_list = []
         self.music_video_list = []
+        self.thumbnail_index = TitleIndex([], "thumbnail", ".webp")
+        self.mv_index = TitleIndex([], "mv", ".mp4")
         self.current_display_index = 0
-        self.thumbnail_positions = [0, 130, 260, 390, 520]
+        self.thumbnail_positions = [i * 130 for i in range(visible_tiles)]
         self.top_widget = None
         self.background_label = None
         self.video_widget = None
@@ -261,16 +480,53 @@ class MP3PlayerUI(QtWidgets.QWidget):
         self.is_playing = False
         self.is_muted = False
         self.current_mode = "lyrics"  # 초기 모드: 가사
-        self.audio_player = QMediaPlayer()
-        self.audio_player.setNotifyInterval(100)
+        # 다음 곡을 미리 열어 두는 플레이어 두 개짜리 오디오 엔진 (곡 사이 끊김 최소화)
+        self.audio_player = GaplessPlayer(crossfade_ms=crossfade_ms, parent=self)
+        self.audio_player.setNotifyInterval(PROGRESS_INTERVAL_MS)
         self.audio_player.positionChanged.connect(self.update_progress)
+        self.audio_player.durationChanged.connect(self.handle_audio_duration)
         self.audio_player.stateChanged.connect(self.handle_audio_state)
         self.audio_player.mediaStatusChanged.connect(self.handle_audio_status)
+        self.audio_player.trackAdvanced.connect(self.handle_track_advanced)
         self.video_player = QMediaPlayer()
-        self.video_player.positionChanged.connect(self.sync_video_audio)
+        self.video_player.setNotifyInterval(PROGRESS_INTERVAL_MS)
+        self.video_player.positionChanged.connect(self.handle_video_position)
+        self.video_player.mediaStatusChanged.connect(self.handle_video_status)
+        self.av_sync = AVSyncController(self.audio_player, self.video_player, parent=self)
+        # 단일 디코더 모드: MV 오디오 길이가 MP3 와 맞으면 MP4 하나만 소리까지 재생한다.
+        # mv_timeline 이 None 이면 기존 두 플레이어 방식.
+        self.mv_audio = mv_audio
+        self.mv_timeline = None
+        self.mv_durations = {}
+        self.video_start_position = 0
+        # 가사 모드에서 다음에 볼 MV 를 미리 열어 두어 비디오 모드 전환을 바로 한다
+        self.preroll_enabled = video_preroll
+        self.video_preroll = VideoPreroll(self.video_player, preroll_memory_mb, parent=self)
+        self.mode_switch_started = None  # (시작 시각, 미리 열림 여부)
+        self.mode_switch_times = []  # (지연 ms, 미리 열림 여부)
+        # 곡별 음량 보정: 스캔이 끝나면 분석 안 된 곡을 프로세스 풀에서 분석하고 결과를 인덱스에 저장한다
+        self.replaygain = replaygain
+        self.loudness_workers = loudness_workers
+        self.ffmpeg_location = ffmpeg_location  # ffmpeg 실행 파일 또는 bin 폴더 (None 이면 MP3PLAYER_FFMPEG, PATH)
+        self.loudness_task = None
         self.song_durations = {}
-        self.position_timer = QTimer(self)
-        self.position_timer.timeout.connect(self.manual_position_update)
+        self.library_index = LibraryIndex()
+        self.library_entries = {}
+        self.scan_task = None
+        self.thumbnail_disk_cache = ThumbnailDiskCache()
+        self.pixmap_cache = PixmapCache(disk_cache=self.thumbnail_disk_cache)
+        self.background_cache = BlurredBackgroundCache(disk_cache=self.thumbnail_disk_cache)
+        self.background_cache.listeners.append(self.handle_background_ready)
+        # 곡별 MP3 프레임 탐색 테이블 (정확한 길이, 프레임 단위 탐색 위치)
+        self.seek_tables = SeekTableCache()
+        self.seek_tables.listeners.append(self.handle_seek_table_ready)
+        self.prefetcher = ThumbnailPrefetcher(self.pixmap_cache, self.thumbnail_disk_cache, radius=prefetch_radius)
+        self.last_display_index = 0
+        self.current_duration = 0
+        self.progress_state = None  # 마지막으로 그린 (초, 진행 막대 픽셀, 길이)
+        self.progress_visible = True
+        self.progress_updates = 0
+        self.progress_repaints = 0
         self.init_ui()
         self.load_files()
 
@@ -339,12 +595,17 @@ class MP3PlayerUI(QtWidgets.QWidget):
         self.button_video.clicked.connect(self.show_video_mode)
 
         # 썸네일 위젯
-        self.thumbnail_widget = ThumbnailWidget(self)
+        if self.carousel_mode == "painter":
+            self.thumbnail_widget = CarouselCanvas(self)
+        else:
+            self.thumbnail_widget = ThumbnailWidget(self)
+        self.thumbnail_widget.setFixedSize(max(600, 130 * self.visible_tiles - 50), 200)
         self.thumbnail_layout = QtWidgets.QHBoxLayout()
         self.thumbnail_widget.setLayout(self.thumbnail_layout)
         self.thumbnail_widget.hide()
 
-        self.thumbnail_labels = [ThumbnailLabel(self.thumbnail_widget) for _ in range(5)]
+        label_count = 0 if self.carousel_mode == "painter" else self.visible_tiles
+        self.thumbnail_labels = [ThumbnailLabel(self.thumbnail_widget) for _ in range(label_count)]
         for i, label in enumerate(self.thumbnail_labels):
             label.setFixedSize(120, 120)
             label.setAlignment(QtCore.Qt.AlignCenter)
@@ -360,7 +621,7 @@ class MP3PlayerUI(QtWidgets.QWidget):
         progress_layout = QtWidgets.QHBoxLayout()
         self.progress_bar = QtWidgets.QProgressBar()
         self.progress_bar.setMinimum(0)
-        self.progress_bar.setMaximum(100)
+        self.progress_bar.setMaximum(100)  # 곡이 정해지면 곡 길이(ms)로 바뀐다
         self.progress_bar.setValue(0)
         self.progress_bar.setTextVisible(False)
         self.progress_bar.setFixedHeight(20)
@@ -411,8 +672,6 @@ class MP3PlayerUI(QtWidgets.QWidget):
         self.main_layout.addLayout(button_layout_bottom)
         self.setLayout(self.main_layout)
 
-        QTimer.singleShot(100, self.show_initial_song)
-
         self.button_rewind.clicked.connect(self.rewind_10_seconds)
         self.button_play_pause.clicked.connect(self.toggle_play_pause)
         self.button_fastforward.clicked.connect(self.forward_10_seconds)
@@ -420,245 +679,427 @@ class MP3PlayerUI(QtWidgets.QWidget):
 
     def get_song_duration(self, song_path):
         try:
+            # 헤더만 읽는 빠른 길이 확인, 프레임을 못 찾을 때만 mutagen 으로 전체 분석
+            duration_ms = probe_duration_ms(song_path)
+            if duration_ms:
+                return duration_ms
             audio = MP3(song_path)
             duration_ms = int(audio.info.length * 1000)
             return duration_ms
-        except Exception as e:
-            print(f"mutagen 길이 가져오기 오류: {e}")
+        except Exception:
+            log.exception("mutagen 길이 가져오기 오류")
             return 0
 
     def show_initial_song(self):
         if self.songs_list:
             self.current_song_index = 0
-            self.thumbnail_clicked(2)
+            self.thumbnail_clicked(self.center_tile)
             self.curtain_widget.animate_curtain(0)
 
     def rewind_10_seconds(self):
         if not self.songs_list:
             return
         try:
-            current_pos = self.audio_player.position()
-            song_path = os.path.join("music", self.songs_list[self.current_song_index])
-            duration = self.song_durations.get(song_path, 0)
+            current_pos = self.playback_position()
+            duration = self.current_duration
             new_pos = current_pos - 10000
-            print(f"Rewind: 현재={self.format_time(current_pos)}, 목표={self.format_time(new_pos)}, 길이={self.format_time(duration)}")
+            log.info("Rewind: 현재=%s, 목표=%s, 길이=%s",
+                     self.format_time(current_pos), self.format_time(new_pos), self.format_time(duration))
             if new_pos <= 0:
                 self.previous_song()
             else:
-                self.audio_player.setPosition(new_pos)
-                self.video_player.setPosition(new_pos)
-        except Exception as e:
-            print(f"rewind_10_seconds 오류: {e}")
+                self.set_playback_position(new_pos)
+        except Exception:
+            log.exception("rewind_10_seconds 오류")
 
     def forward_10_seconds(self):
         if not self.songs_list:
             return
         try:
-            current_pos = self.audio_player.position()
-            song_path = os.path.join("music", self.songs_list[self.current_song_index])
-            duration = self.song_durations.get(song_path, 0)
+            current_pos = self.playback_position()
+            duration = self.current_duration
             new_pos = current_pos + 10000
-            print(f"Fast Forward: 현재={self.format_time(current_pos)}, 목표={self.format_time(new_pos)}, 길이={self.format_time(duration)}")
+            log.info("Fast Forward: 현재=%s, 목표=%s, 길이=%s",
+                     self.format_time(current_pos), self.format_time(new_pos), self.format_time(duration))
             if new_pos >= duration and duration > 0:
                 self.next_song()
             else:
-                self.audio_player.setPosition(new_pos)
-                self.video_player.setPosition(new_pos)
-        except Exception as e:
-            print(f"forward_10_seconds 오류: {e}")
+                self.set_playback_position(new_pos)
+        except Exception:
+            log.exception("forward_10_seconds 오류")
 
     def previous_song(self):
         if self.songs_list:
-            self.audio_player.pause()
-            self.video_player.pause()
-            self.position_timer.stop()
-            self.current_song_index = (self.current_song_index - 1) % len(self.songs_list)
-            self.current_display_index = (self.current_song_index - 2) % len(self.songs_list)
-            self.thumbnail_clicked(2)
+            self.play_song((self.current_song_index - 1) % len(self.songs_list))
 
     def next_song(self):
         if self.songs_list:
-            self.audio_player.pause()
-            self.video_player.pause()
-            self.position_timer.stop()
-            self.current_song_index = (self.current_song_index + 1) % len(self.songs_list)
-            self.current_display_index = (self.current_song_index - 2) % len(self.songs_list)
-            self.thumbnail_clicked(2)
+            next_index = (self.current_song_index + 1) % len(self.songs_list)
+            # 미리 열어 둔 다음 곡이면 플레이어만 넘기고 UI 는 trackAdvanced 에서 갱신
+            # (단일 디코더 모드에서는 MP3 플레이어가 멈춰 있으므로 play_song 으로 연다)
+            if (self.mv_timeline is None and self.audio_player.next_path == self.song_path(next_index)
+                    and self.audio_player.advance()):
+                return
+            self.play_song(next_index)
+
+    def song_path(self, song_index):
+        return os.path.join("music", self.songs_list[song_index])
+
+    def preload_next_song(self):
+        if len(self.songs_list) > 1:
+            next_path = self.song_path((self.current_song_index + 1) % len(self.songs_list))
+            self.audio_player.preload(next_path)
+            self.seek_tables.request(next_path)
+
+    def handle_seek_table_ready(self, path):
+        # 프레임을 다 센 길이가 태그/추정 길이와 다르면 (목차 없는 VBR 등) 그쪽을 쓴다
+        table = self.seek_tables.get(path)
+        if table is None or abs(table.duration_ms - self.song_durations.get(path, 0)) <= 50:
+            return
+        log.debug("탐색 테이블 길이로 보정: %s %d -> %d ms", path, self.song_durations.get(path, 0), table.duration_ms)
+        self.song_durations[path] = table.duration_ms
+        if self.songs_list and path == self.song_path(self.current_song_index):
+            self.set_current_duration(table.duration_ms)
+
+    def set_current_duration(self, duration):
+        self.current_duration = duration
+        self.progress_bar.setMaximum(max(duration, 1))  # 밀리초 단위 진행/탐색
+        self.progress_state = None
+
+    def handle_track_advanced(self, path):
+        try:
+            # play_song 에서 이미 선택한 곡이면 다음 곡만 준비
+            if 0 <= self.current_song_index < len(self.songs_list) and path == self.song_path(self.current_song_index):
+                self.preload_next_song()
+                return
+            next_index = (self.current_song_index + 1) % len(self.songs_list)
+            if path != self.song_path(next_index):
+                next_index = self.songs_list.index(os.path.basename(path))
+            self.is_playing = True
+            self.button_play_pause.setIcon(QtGui.QIcon("images/pause.png"))
+            self.show_song(next_index)
+            self.preload_next_song()
+            log.info("다음 곡으로 바로 전환: song_index=%s", next_index)
+        except Exception:
+            log.exception("handle_track_advanced 오류")
+
+    def playback_position(self):
+        # MP3 타임라인 기준 현재 위치 (단일 디코더 모드면 MV 위치를 변환)
+        if self.mv_timeline is not None:
+            return self.mv_timeline.to_mp3(self.video_player.position())
+        return self.audio_player.position()
+
+    def set_playback_position(self, position):
+        if self.current_duration > 0:
+            position = min(max(position, 0), self.current_duration)
+        table = self.seek_tables.get(self.song_path(self.current_song_index)) if self.songs_list else None
+        if table is not None:
+            # 요청 위치를 그 시각이 든 MP3 프레임의 시작 시각으로 내린다 (진행 표시와 프레임 경계를 맞춤).
+            # setPosition 은 여전히 ms 단위 탐색이고, 실제로 어느 프레임부터 디코드할지는 백엔드가 정한다.
+            position = table.snap(position)
+        if self.mv_timeline is not None:
+            self.video_player.setPosition(self.mv_timeline.to_mv(position))
+        else:
+            self.audio_player.setPosition(position)
+            self.video_player.setPosition(position)
+
+    def resume_playback(self):
+        if self.mv_timeline is not None:
+            self.video_player.play()
+            return
+        self.audio_player.play()
+        if self.current_mode == "video":
+            self.video_player.setPosition(self.audio_player.position())
+            self.video_player.play()
+
+    def leave_single_decoder(self, position):
+        # MV 오디오 재생을 멈추고 MP3 플레이어를 같은 위치에서 이어 간다
+        if self.mv_timeline is None:
+            return
+        self.mv_timeline = None
+        self.video_player.setMuted(True)
+        self.audio_player.setPosition(position)
+        if self.is_playing:
+            self.audio_player.play()
+        log.debug("단일 디코더 모드 해제: %d ms", position)
 
     def toggle_play_pause(self):
         self.is_playing = not self.is_playing
         if self.is_playing:
-            self.audio_player.play()
-            if self.current_mode == "video":
-                self.video_player.setPosition(self.audio_player.position())
-                self.video_player.play()
+            self.resume_playback()
             self.button_play_pause.setIcon(QtGui.QIcon("images/pause.png"))
-            self.position_timer.start(100)
-            print("재생 시작")
+            log.info("재생 시작")
         else:
             self.audio_player.pause()
             self.video_player.pause()
             self.button_play_pause.setIcon(QtGui.QIcon("images/play.png"))
-            self.position_timer.stop()
-            print("재생 일시정지")
+            log.info("재생 일시정지")
 
     def toggle_volume(self):
         self.is_muted = not self.is_muted
         self.audio_player.setMuted(self.is_muted)
-        self.video_player.setMuted(True)  # 비디오 오디오는 항상 음소거
+        # 두 플레이어 방식에서는 비디오 오디오는 항상 음소거, 단일 디코더 모드에서는 MV 오디오가 곡 소리
+        self.video_player.setMuted(self.mv_timeline is None or self.is_muted)
         if self.is_muted:
             self.button_volume.setIcon(QtGui.QIcon("images/mute.png"))
-            print("음소거")
+            log.info("음소거")
         else:
             self.button_volume.setIcon(QtGui.QIcon("images/volume.png"))
-            print("음소거 해제")
+            log.info("음소거 해제")
 
     def seek_position(self, event):
         try:
             if event.button() == QtCore.Qt.LeftButton:
-                song_path = os.path.join("music", self.songs_list[self.current_song_index])
-                duration = self.song_durations.get(song_path, 0)
+                duration = self.current_duration
                 if duration > 0:
                     width = self.progress_bar.width()
                     click_x = event.pos().x()
                     seek_percentage = click_x / width
                     seek_time = int(seek_percentage * duration)
-                    self.audio_player.setPosition(seek_time)
-                    self.video_player.setPosition(seek_time)
-                    print(f"탐색 위치: {self.format_time(seek_time)}")
-        except Exception as e:
-            print(f"seek_position 오류: {e}")
+                    self.set_playback_position(seek_time)
+                    log.info("탐색 위치: %s", self.format_time(seek_time))
+        except Exception:
+            log.exception("seek_position 오류")
 
     def update_progress(self, position):
+        # 위치 알림 한 곳에서만 호출된다. 보이는 초나 진행 막대 픽셀이 바뀔 때만 다시 그린다.
+        self.progress_updates += 1
+        if not self.progress_visible:
+            return
         try:
-            song_path = os.path.join("music", self.songs_list[self.current_song_index])
-            duration = self.song_durations.get(song_path, 0)
-            print(f"update_progress 호출: position={self.format_time(position)}, duration={self.format_time(duration)}")
+            duration = self.current_duration
             if duration > 0:
-                progress = (position / duration) * 100
-                self.progress_bar.setValue(int(progress))
+                position = min(max(position, 0), duration)
+                state = (position // 1000, position * self.progress_bar.width() // duration, duration)
+            else:
+                state = (0, 0, 0)
+            if state == self.progress_state:
+                return
+            self.progress_state = state
+            self.progress_repaints += 1
+            log.debug("진행 표시: %d / %d ms", position, duration)
+            if duration > 0:
+                self.progress_bar.setValue(position)
                 self.label_progress.setText(
                     f"{self.format_time(position)} / {self.format_time(duration)}"
                 )
-                if position >= duration - 1000 and self.is_playing:
-                    print("노래 종료, 다음 곡으로 전환")
-                    self.next_song()
             else:
                 self.progress_bar.setValue(0)
                 self.label_progress.setText("00:00 / 00:00")
-        except Exception as e:
-            print(f"update_progress 오류: {e}")
-
-    def manual_position_update(self):
-        try:
-            if self.is_playing and self.current_song_index >= 0:
-                position = self.audio_player.position()
-                self.update_progress(position)
-        except Exception as e:
-            print(f"manual_position_update 오류: {e}")
+        except Exception:
+            log.exception("update_progress 오류")
+
+    def handle_audio_duration(self, duration):
+        # mutagen 으로 길이를 못 구한 곡은 플레이어가 알려 주는 길이를 쓴다
+        if self.current_duration <= 0 and duration > 0:
+            self.set_current_duration(duration)
+
+    def update_progress_rate(self):
+        # 창이 가려지거나 최소화되면 위치 알림을 줄이고 그리기를 멈춘다
+        visible = self.isVisible() and not self.isMinimized()
+        if visible == self.progress_visible:
+            return
+        self.progress_visible = visible
+        interval = PROGRESS_INTERVAL_MS if visible else HIDDEN_PROGRESS_INTERVAL_MS
+        self.audio_player.setNotifyInterval(interval)
+        self.video_player.setNotifyInterval(interval)
+        if visible:
+            self.progress_state = None
+            self.update_progress(self.playback_position())
+
+    def handle_video_position(self, position):
+        if self.mode_switch_started is not None and self.video_player.state() == QMediaPlayer.PlayingState:
+            # 비디오 모드 버튼부터 영상이 실제로 재생되기 시작할 때까지
+            started, warm = self.mode_switch_started
+            self.mode_switch_started = None
+            self.video_player.setNotifyInterval(PROGRESS_INTERVAL_MS if self.progress_visible
+                                                else HIDDEN_PROGRESS_INTERVAL_MS)
+            latency = (time.perf_counter() - started) * 1000
+            self.mode_switch_times.append((latency, warm))
+            log.info("비디오 모드 전환: %.0f ms (%s)", latency, "미리 열림" if warm else "새로 열기")
+        # 단일 디코더 모드에서는 MP3 플레이어가 멈춰 있으므로 MV 위치로 진행 표시
+        if self.mv_timeline is not None:
+            self.update_progress(self.mv_timeline.to_mp3(position))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_progress_rate()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_progress_rate()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QtCore.QEvent.WindowStateChange:
+            self.update_progress_rate()
 
     def handle_audio_status(self, status):
         try:
-            if status == QMediaPlayer.LoadedMedia:
-                song_path = os.path.join("music", self.songs_list[self.current_song_index])
-                duration = self.song_durations.get(song_path, 0)
+            if status == QMediaPlayer.EndOfMedia and self.is_playing:
+                # 다음 곡이 미리 준비되지 않았을 때만 여기로 온다
+                log.info("노래 종료, 다음 곡으로 전환")
+                self.next_song()
+            elif status == QMediaPlayer.LoadedMedia:
+                duration = self.current_duration
                 if duration > 0:
                     self.label_progress.setText(
                         f"00:00 / {self.format_time(duration)}"
                     )
-                    print(f"오디오 미디어 로드 완료, mutagen 길이: {self.format_time(duration)}")
+                    log.debug("오디오 미디어 로드 완료, mutagen 길이: %s", self.format_time(duration))
                 else:
                     self.label_progress.setText("00:00 / 00:00")
-                    print("오디오 미디어 로드 완료, 유효한 길이 없음")
+                    log.debug("오디오 미디어 로드 완료, 유효한 길이 없음")
                 if self.is_playing:
-                    self.audio_player.play()
-                    if self.current_mode == "video":
-                        self.video_player.setPosition(self.audio_player.position())
-                        self.video_player.play()
-        except Exception as e:
-            print(f"handle_audio_status 오류: {e}")
+                    self.resume_playback()
+        except Exception:
+            log.exception("handle_audio_status 오류")
 
     def handle_audio_state(self, state):
         try:
+            # 곡 종료는 handle_audio_status 의 EndOfMedia 에서 처리한다
             if state == QMediaPlayer.StoppedState and self.is_playing:
-                song_path = os.path.join("music", self.songs_list[self.current_song_index])
-                duration = self.song_durations.get(song_path, 0)
-                if self.audio_player.position() >= duration - 1000:
-                    print("오디오 플레이어 정지, 다음 곡으로 전환")
-                    self.next_song()
-        except Exception as e:
-            print(f"handle_audio_state 오류: {e}")
-
-    def sync_video_audio(self, position):
-        try:
-            audio_pos = self.audio_player.position()
-            if abs(position - audio_pos) > 500:
-                self.video_player.setPosition(audio_pos)
-                print(f"비디오 동기화: 오디오={self.format_time(audio_pos)}, 비디오={self.format_time(position)}")
-        except Exception as e:
-            print(f"sync_video_audio 오류: {e}")
+                log.debug("오디오 플레이어 정지")
+        except Exception:
+            log.exception("handle_audio_state 오류")
 
     def load_files(self):
         try:
             if not os.path.isdir("music"):
-                print("music 디렉토리가 없습니다.")
+                log.warning("music 디렉토리가 없습니다.")
                 return
-            self.songs_list = [f for f in os.listdir("music") if f.lower().endswith(".mp3")]
-            self.songs_list.sort()
-            print(f"로드된 .mp3 파일: {self.songs_list}")
-
-            for song in self.songs_list:
-                song_path = os.path.join("music", song)
-                duration = self.get_song_duration(song_path)
-                self.song_durations[song_path] = duration
-                print(f"{song} 길이: {self.format_time(duration)}")
 
             if not os.path.isdir("thumbnail"):
-                print("thumbnail 디렉토리가 없습니다.")
+                log.warning("thumbnail 디렉토리가 없습니다.")
             else:
                 self.thumbnail_list = [f for f in os.listdir("thumbnail") if f.lower().endswith(".webp")]
                 self.thumbnail_list.sort()
-                print(f"로드된 .webp 파일: {self.thumbnail_list}")
+                log.info("로드된 .webp 파일: %s개", len(self.thumbnail_list))
 
             if not os.path.isdir("mv"):
-                print("mv 디렉토리가 없습니다.")
+                log.warning("mv 디렉토리가 없습니다.")
             else:
                 self.music_video_list = [f for f in os.listdir("mv") if f.lower().endswith(".mp4")]
                 self.music_video_list.sort()
-                print(f"로드된 .mp4 파일: {self.music_video_list}")
-
-            if self.songs_list:
+                log.info("로드된 .mp4 파일: %s개", len(self.music_video_list))
+
+            # 정규화된 제목 인덱스 (썸네일/뮤직비디오 매칭은 이 인덱스로만 한다)
+            self.thumbnail_index = TitleIndex(self.thumbnail_list, "thumbnail", ".webp")
+            self.mv_index = TitleIndex(self.music_video_list, "mv", ".mp4")
+
+            # 새로 스캔하므로 캐러셀 라벨이 재사용하던 내용은 버린다
+            for label in self.thumbnail_labels:
+                label.song_file = None
+
+            # 라이브러리 인덱스: 변경된 파일만 mutagen 으로 다시 분석 (백그라운드 스레드)
+            self.scan_started_at = time.perf_counter()
+            self.first_playable_ms = None
+            self.scan_task = LibraryScanTask(
+                self.library_index, "music", self.get_song_duration, self.parse_song_info,
+                self.match_thumbnail, self.match_music_video,
+                assets_key=make_assets_key(self.thumbnail_list, self.music_video_list),
+                extract_cover=extract_cover)
+            self.scan_task.signals.batch_ready.connect(self.handle_scan_batch)
+            self.scan_task.signals.finished.connect(self.handle_scan_finished)
+            self.scan_task.signals.failed.connect(self.handle_scan_failed)
+            start_scan(self.scan_task)
+        except Exception:
+            log.exception("load_files 오류")
+
+    def handle_scan_batch(self, entries):
+        try:
+            # 스캔은 파일명 순서로 진행되므로 뒤에 이어 붙이면 정렬이 유지된다
+            for entry in entries:
+                if entry["duplicate_of"]:
+                    continue  # dedupe.py 가 같은 곡으로 표시한 파일은 목록에 한 번만 보인다
+                self.songs_list.append(entry["filename"])
+                self.library_entries[entry["filename"]] = entry
+                self.song_durations[os.path.join("music", entry["filename"])] = entry["duration"]
+                self.apply_track_gain(entry["filename"], entry["gain"])
+
+            if self.first_playable_ms is None and self.songs_list:
+                self.first_playable_ms = (time.perf_counter() - self.scan_started_at) * 1000
+                log.info("첫 곡 재생 가능: %.0f ms (%s곡)", self.first_playable_ms, len(self.songs_list))
+                self.update_thumbnails()
+                if self.current_song_index < 0:
+                    self.show_initial_song()
+            elif self.thumbnail_widget.isVisible():
                 self.update_thumbnails()
-        except Exception as e:
-            print(f"load_files 오류: {e}")
+        except Exception:
+            log.exception("handle_scan_batch 오류")
+
+    def handle_scan_finished(self, stats):
+        total_ms = (time.perf_counter() - self.scan_started_at) * 1000
+        log.info("라이브러리 스캔 완료: %s곡 (분석 %s개), 전체 %.0f ms, 첫 곡까지 %.0f ms",
+                 stats['files'], stats['probed'], total_ms, self.first_playable_ms or 0)
+        self.start_loudness_analysis()
+
+    def handle_scan_failed(self, message):
+        log.error("라이브러리 스캔 오류: %s", message)
+
+    def start_loudness_analysis(self):
+        try:
+            if not self.replaygain or self.loudness_task is not None:
+                return
+            rows = [(entry["filename"], entry["size"], entry["mtime_ns"])
+                    for entry in self.library_entries.values() if entry["gain"] is None and not entry["loudness_failed"]]
+            if not rows:
+                return
+            ffmpeg = find_ffmpeg(self.ffmpeg_location)
+            if not ffmpeg:
+                log.warning("ffmpeg 를 찾지 못해 음량 분석을 건너뜁니다 (--ffmpeg 또는 MP3PLAYER_FFMPEG 로 위치 지정)")
+                return
+            log.info("음량 분석 시작: %s곡", len(rows))
+            self.loudness_task = LoudnessTask("music", rows, self.library_index.db_path, self.loudness_workers, ffmpeg)
+            self.loudness_task.signals.analyzed.connect(self.handle_loudness_ready)
+            self.loudness_task.signals.finished.connect(self.handle_loudness_finished)
+            start_analysis(self.loudness_task)
+        except Exception:
+            log.exception("start_loudness_analysis 오류")
+
+    def handle_loudness_ready(self, filename, result):
+        entry = self.library_entries.get(filename)
+        if entry is not None:
+            entry.update(result)
+        self.apply_track_gain(filename, result["gain"])
+
+    def handle_loudness_finished(self, stats):
+        self.loudness_task = None
+        if stats["seconds"] > 0:
+            log.info("음량 분석 완료: %s곡 (실패 %s개), %.1f s, %.0f 곡/분",
+                     stats['tracks'], stats['failed'], stats['seconds'], stats['tracks'] * 60 / stats['seconds'])
+
+    def apply_track_gain(self, filename, gain):
+        if self.replaygain and gain is not None:
+            self.audio_player.set_track_gain(os.path.join("music", filename), gain_to_volume_factor(gain))
 
     def match_thumbnail(self, song_name):
         try:
-            song_name = song_name.lower().replace(".mp3", "")
-            for thumbnail in self.thumbnail_list:
-                if song_name in thumbnail.lower():
-                    thumbnail_path = os.path.join("thumbnail", thumbnail)
-                    return thumbnail_path
+            return self.thumbnail_index.lookup(song_name)
+        except Exception:
+            log.exception("match_thumbnail 오류")
             return None
-        except Exception as e:
-            print(f"match_thumbnail 오류: {e}")
+
+    def song_thumbnail(self, song_file):
+        # 스캔 때 꺼낸 앨범아트와 제목으로 매칭한 .webp 중 우선순위(cover_art.choose_thumbnail)대로 고른다
+        try:
+            entry = self.library_entries.get(song_file)
+            if entry is None:
+                artist, song_name = self.parse_song_info(song_file)
+                return self.match_thumbnail(song_name)
+            return choose_thumbnail(entry["cover"], entry["cover_px"] or 0, entry["thumbnail"])
+        except Exception:
+            log.exception("song_thumbnail 오류")
             return None
 
     def match_music_video(self, song_name):
         try:
-            song_name = song_name.lower().replace(".mp3", "").strip()
-            print(f"뮤직비디오 매칭 시도: song_name='{song_name}'")
-            for mv in self.music_video_list:
-                mv_lower = mv.lower().replace(".mp4", "").strip()
-                print(f"  - 비교 대상: mv='{mv_lower}'")
-                if song_name in mv_lower or mv_lower in song_name:
-                    mv_path = os.path.join("mv", mv)
-                    print(f"뮤직비디오 찾음: {mv_path}")
-                    return mv_path
-            print(f"뮤직비디오 매칭 실패: {song_name}")
-            return None
-        except Exception as e:
-            print(f"match_music_video 오류: {e}")
+            mv_path = self.mv_index.lookup(song_name)
+            if mv_path is None:
+                log.debug("뮤직비디오 매칭 실패: %s", song_name)
+            return mv_path
+        except Exception:
+            log.exception("match_music_video 오류")
             return None
 
     def parse_song_info(self, filename):
@@ -672,110 +1113,150 @@ class MP3PlayerUI(QtWidgets.QWidget):
                 artist = "Unknown Artist"
                 song_name = parts[0].strip()
             return artist, song_name
-        except Exception as e:
-            print(f"parse_song_info 오류: {e}")
+        except Exception:
+            log.exception("parse_song_info 오류")
             return "Unknown Artist", filename.replace(".mp3", "")
 
     def update_thumbnails(self):
         if not self.songs_list:
             return
         try:
-            print(f"update_thumbnails 호출: current_display_index={self.current_display_index}")
-            for i, label in enumerate(self.thumbnail_labels):
-                song_index = (self.current_display_index + i) % len(self.songs_list)
-                artist, song_name = self.parse_song_info(self.songs_list[song_index])
-                thumbnail_path = self.match_thumbnail(song_name)
-
-                label.setProperty("song_index", song_index)
-                label.set_info_text(artist, song_name)
-
-                if thumbnail_path and os.path.exists(thumbnail_path):
-                    pixmap = QtGui.QPixmap(thumbnail_path)
-                    if not pixmap.isNull():
-                        pixmap = pixmap.scaled(116, 116, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
-                        label.setPixmap(pixmap)
-                    else:
-                        label.clear()
-                        label.setText("No Image")
-                        label.setStyleSheet(label.styleSheet() + "color: #999;")
-                else:
-                    label.clear()
-                    label.setText("No Image")
-                    label.setStyleSheet(label.styleSheet() + "color: #999;")
-
-                print(f"라벨 {i}: song_index={song_index}, song={self.songs_list[song_index]}")
-        except Exception as e:
-            print(f"update_thumbnails 오류: {e}")
+            if self.carousel_mode == "painter":
+                self.update_canvas_tiles()
+            else:
+                self.update_thumbnail_labels()
+            self.prefetch_thumbnails()
+        except Exception:
+            log.exception("update_thumbnails 오류")
+
+    def update_thumbnail_labels(self):
+        # 화면에 보이는 타일만 유지하고, 이미 같은 곡을 보여주는 라벨은 그대로 재사용한다.
+        # 한 칸 이동하면 밖으로 나간 라벨 하나만 새 곡으로 채워진다.
+        count = len(self.songs_list)
+        wanted = [(self.current_display_index + i) % count for i in range(len(self.thumbnail_labels))]
+        reusable = {}
+        for label in self.thumbnail_labels:
+            reusable.setdefault(label.song_file, []).append(label)
+        slots = [None] * len(wanted)
+        for i, song_index in enumerate(wanted):
+            candidates = reusable.get(self.songs_list[song_index])
+            if candidates:
+                slots[i] = candidates.pop(0)
+        spare = [label for labels in reusable.values() for label in labels]
+        for i, song_index in enumerate(wanted):
+            label = slots[i]
+            if label is None:
+                label = slots[i] = spare.pop(0)
+                self.fill_thumbnail_label(label, song_index)
+            label.setProperty("index", i)
+            label.setProperty("song_index", song_index)
+        self.thumbnail_labels = slots
+        self.update_thumbnails_with_offset(self.thumbnail_widget.offset)
+
+    def prefetch_thumbnails(self):
+        # 스크롤 방향 앞쪽부터 ±N 칸, 그다음 재생 중인 곡 주변 썸네일을 백그라운드에서 미리 읽는다
+        count = len(self.songs_list)
+        step = (self.current_display_index - self.last_display_index) % count
+        direction = 0 if step == 0 else (1 if step <= count // 2 else -1)
+        self.last_display_index = self.current_display_index
+        first = self.current_display_index
+        last = first + self.visible_tiles - 1
+        indices = []
+        for distance in range(1, self.prefetcher.radius + 1):
+            if direction >= 0:
+                indices += [last + distance, first - distance]
+            else:
+                indices += [first - distance, last + distance]
+        if self.current_song_index >= 0:
+            indices += [self.current_song_index + distance
+                        for distance in range(-self.prefetcher.radius, self.prefetcher.radius + 1)]
+        paths = []
+        for index in indices:
+            paths.append(self.song_thumbnail(self.songs_list[index % count]))
+        self.prefetcher.request(paths, direction)
+
+    def update_canvas_tiles(self):
+        tiles = []
+        count = len(self.songs_list)
+        for i in range(self.visible_tiles):
+            song_index = (self.current_display_index + i) % count
+            artist, song_name = self.parse_song_info(self.songs_list[song_index])
+            thumbnail_path = self.song_thumbnail(self.songs_list[song_index])
+            pixmap = self.pixmap_cache.get(thumbnail_path, "scaled", 116, 116) if thumbnail_path else None
+            tiles.append((song_index, pixmap, artist, song_name))
+        self.thumbnail_widget.set_tiles(tiles, self.thumbnail_positions, self.center_tile)
+
+    def tile_song_index(self, tile_index):
+        if self.carousel_mode == "painter":
+            if not self.songs_list:
+                return None
+            return (self.current_display_index + tile_index) % len(self.songs_list)
+        return self.thumbnail_labels[tile_index].property("song_index")
+
+    def fill_thumbnail_label(self, label, song_index):
+        song_file = self.songs_list[song_index]
+        artist, song_name = self.parse_song_info(song_file)
+        thumbnail_path = self.song_thumbnail(song_file)
+        label.song_file = song_file
+        label.set_info_text(artist, song_name)
+        log.debug("타일 채움: song_index=%d, 썸네일=%s", song_index, thumbnail_path)
+        pixmap = self.pixmap_cache.get(thumbnail_path, "scaled", 116, 116) if thumbnail_path else None
+        if pixmap is not None and not pixmap.isNull():
+            label.setPixmap(pixmap)
+        else:
+            label.clear()
+            label.setText("No Image")
 
     def update_thumbnails_with_offset(self, offset):
         try:
-            center_position = 260
+            if self.carousel_mode == "painter":
+                self.thumbnail_widget.update()  # paintEvent 에서 한 번에 그린다
+                return
+            center_position = self.thumbnail_positions[self.center_tile] + 60
+            last = len(self.thumbnail_labels) - 1
             for i, label in enumerate(self.thumbnail_labels):
-                current_x = self.thumbnail_positions[i] + offset
-                label.move(current_x, 15)
-                distance_from_center = abs(current_x + 60 - center_position)
-                if distance_from_center < 65:
-                    opacity = 1.0
-                    scale_factor = 1.1
-                    border_color = "#FFD700"
-                    border_width = 3
-                elif distance_from_center < 130:
-                    opacity = 0.8
-                    scale_factor = 0.95
-                    border_color = "#87CEEB"
-                    border_width = 2
-                else:
-                    opacity = max(0.4, 1.0 - (distance_from_center / 300))
-                    scale_factor = 0.8
-                    border_color = "#ddd"
-                    border_width = 1
-                if (i == 0 and offset > 0) or (i == 4 and offset < 0):
-                    opacity = max(0.2, 1.0 - abs(offset) / 130)
-                opacity_effect = QGraphicsOpacityEffect()
-                label.setGraphicsEffect(opacity_effect)
-                opacity_effect.setOpacity(opacity)
-                size = int(120 * scale_factor)
-                label.setFixedSize(size, size)
-                label.setStyleSheet(f"""
-                    border: {border_width}px solid {border_color};
-                    background-color: white;
-                    border-radius: 8px;
-                """)
-        except Exception as e:
-            print(f"update_thumbnails_with_offset 오류: {e}")
-
-    def create_blurred_background(self, pixmap):
+                current_x = int(self.thumbnail_positions[i] + offset)
+                if label.x() != current_x or label.y() != 15:
+                    label.move(current_x, 15)
+                tier, opacity = tile_state(i, current_x, offset, center_position, last)
+                label.apply_tier(tier)
+                label.apply_opacity(opacity)
+        except Exception:
+            log.exception("update_thumbnails_with_offset 오류")
+
+    def set_background(self, pixmap):
+        if not self.background_label:
+            self.background_label = QLabel(self)
+        self.background_label.setPixmap(pixmap)
+        self.background_label.setGeometry(0, 0, 800, 600)
+        self.background_label.lower()
+        self.background_label.show()
+        log.debug("배경 이미지 표시")
+
+    def handle_background_ready(self, thumbnail_path):
         try:
-            scaled_pixmap = pixmap.scaled(800, 600, QtCore.Qt.KeepAspectRatioByExpanding,
-                                          QtCore.Qt.SmoothTransformation)
-            temp_label = QLabel()
-            temp_label.setPixmap(scaled_pixmap)
-            temp_label.setFixedSize(800, 600)
-            blur_effect = QGraphicsBlurEffect()
-            blur_effect.setBlurRadius(15)
-            temp_label.setGraphicsEffect(blur_effect)
-            blurred_pixmap = temp_label.grab()
-            overlay = QtGui.QPixmap(800, 600)
-            overlay.fill(QtGui.QColor(0, 0, 0, 100))
-            painter = QtGui.QPainter(blurred_pixmap)
-            painter.drawPixmap(0, 0, overlay)
-            painter.end()
-            return blurred_pixmap
-        except Exception as e:
-            print(f"create_blurred_background 오류: {e}")
-            fallback = QtGui.QPixmap(800, 600)
-            fallback.fill(QtGui.QColor(240, 240, 240))
-            return fallback
+            if self.current_mode != "lyrics" or not self.songs_list:
+                return
+            if self.song_thumbnail(self.songs_list[self.current_song_index]) == thumbnail_path:
+                self.set_background(self.background_cache.get(thumbnail_path))
+        except Exception:
+            log.exception("handle_background_ready 오류")
+
+    def prefetch_backgrounds(self):
+        # 이전/다음 곡 배경을 미리 흐리게 만들어 두면 곡 전환 시 바로 표시된다
+        for step in (1, -1):
+            song_index = (self.current_song_index + step) % len(self.songs_list)
+            self.background_cache.request(self.song_thumbnail(self.songs_list[song_index]))
 
     def create_top_widget(self, song_index):
         try:
-            print(f"create_top_widget 호출: song_index={song_index}")
+            log.debug("create_top_widget 호출: song_index=%s", song_index)
             artist, song_name = self.parse_song_info(self.songs_list[song_index])
-            thumbnail_path = self.match_thumbnail(song_name)
+            thumbnail_path = self.song_thumbnail(self.songs_list[song_index])
 
             # 기존 top_widget 제거
             if self.top_widget:
-                print("기존 top_widget 제거")
+                log.debug("기존 top_widget 제거")
                 self.main_layout.removeWidget(self.top_widget)
                 self.top_widget.deleteLater()
                 self.top_widget = None
@@ -806,23 +1287,14 @@ class MP3PlayerUI(QtWidgets.QWidget):
             thumbnail_label.move(2, 2)
             thumbnail_label.setAlignment(QtCore.Qt.AlignCenter)
             thumbnail_label.setStyleSheet("border: none; background-color: transparent; border-radius: 8px;")
-            if thumbnail_path and os.path.exists(thumbnail_path):
-                pixmap = QtGui.QPixmap(thumbnail_path)
-                if not pixmap.isNull():
-                    pixmap = pixmap.scaled(216, 216, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
-                    rounded_pixmap = QtGui.QPixmap(216, 216)
-                    rounded_pixmap.fill(QtCore.Qt.transparent)
-                    painter = QtGui.QPainter(rounded_pixmap)
-                    painter.setRenderHint(QtGui.QPainter.Antialiasing)
-                    painter.setBrush(QtGui.QBrush(pixmap))
-                    painter.setPen(QtCore.Qt.NoPen)
-                    painter.drawRoundedRect(0, 0, 216, 216, 8, 8)
-                    painter.end()
+            if thumbnail_path:
+                rounded_pixmap = self.pixmap_cache.get(thumbnail_path, "rounded", 216, 216)
+                if not rounded_pixmap.isNull():
                     thumbnail_label.setPixmap(rounded_pixmap)
                 else:
-                    print(f"썸네일 이미지 로드 실패: {thumbnail_path}")
+                    log.warning("썸네일 이미지 로드 실패: %s", thumbnail_path)
             else:
-                print(f"썸네일 경로 없음: {song_name}")
+                log.debug("썸네일 경로 없음: %s", song_name)
 
             # 정보 컨테이너 (오른쪽)
             info_container = QtWidgets.QWidget()
@@ -877,72 +1349,94 @@ class MP3PlayerUI(QtWidgets.QWidget):
             self.top_widget.setLayout(main_layout)
             self.main_layout.insertWidget(1, self.top_widget, alignment=QtCore.Qt.AlignCenter)
             self.top_widget.show()  # 명시적 표시
-            print(f"top_widget 생성 완료: visible={self.top_widget.isVisible()}, size={self.top_widget.size()}")
-        except Exception as e:
-            print(f"create_top_widget 오류: {e}")
+            log.debug("top_widget 생성 완료: visible=%s, size=%s", self.top_widget.isVisible(), self.top_widget.size())
+        except Exception:
+            log.exception("create_top_widget 오류")
 
     def show_lyrics_mode(self):
         try:
-            print(
-                f"show_lyrics_mode 호출: current_song_index={self.current_song_index}, current_mode={self.current_mode}")
+            log.debug("show_lyrics_mode 호출: current_song_index=%s, current_mode=%s",
+                      self.current_song_index, self.current_mode)
+            position = self.playback_position()
             self.current_mode = "lyrics"
             self.video_widget.hide()
             self.video_player.pause()
+            self.av_sync.stop()
+            self.leave_single_decoder(position)
+            self.mode_switch_started = None
             if self.return_button:
                 self.return_button.hide()
-                print("return_button 숨김")
+                log.debug("return_button 숨김")
 
-            # 썸네일 흐린 배경 표시
+            # 썸네일 흐린 배경 표시 (백그라운드에서 미리 계산된 배경 사용)
             artist, song_name = self.parse_song_info(self.songs_list[self.current_song_index])
-            thumbnail_path = self.match_thumbnail(song_name)
-            if thumbnail_path and os.path.exists(thumbnail_path):
-                original_pixmap = QtGui.QPixmap(thumbnail_path)
-                if not original_pixmap.isNull():
-                    blurred_bg = self.create_blurred_background(original_pixmap)
-                    if not self.background_label:
-                        self.background_label = QLabel(self)
-                    self.background_label.setPixmap(blurred_bg)
-                    self.background_label.setGeometry(0, 0, 800, 600)
-                    self.background_label.lower()
-                    self.background_label.show()
-                    print("배경 이미지 표시")
+            mv_path = self.match_music_video(song_name)
+            if self.preroll_enabled:
+                self.video_preroll.prepare(mv_path if mv_path and os.path.exists(mv_path) else None)
+            elif self.video_preroll.loaded_path != mv_path:
+                self.video_preroll.release()  # 다른 곡의 MV 는 들고 있지 않는다
+            thumbnail_path = self.song_thumbnail(self.songs_list[self.current_song_index])
+            if thumbnail_path:
+                blurred_bg = self.background_cache.get(thumbnail_path)
+                if blurred_bg is not None:
+                    self.set_background(blurred_bg)
                 else:
-                    print(f"배경 이미지 로드 실패: {thumbnail_path}")
+                    log.debug("배경 블러 생성 대기: %s", thumbnail_path)
+                    self.background_cache.request(thumbnail_path)
             else:
-                print(f"배경 썸네일 경로 없음: {song_name}")
+                log.debug("배경 썸네일 경로 없음: %s", song_name)
+            self.prefetch_backgrounds()
 
             self.create_top_widget(self.current_song_index)
             self.update()  # UI 갱신 강제
-            print(f"가사 모드 활성화 완료: top_widget visible={self.top_widget.isVisible() if self.top_widget else False}")
-        except Exception as e:
-            print(f"show_lyrics_mode 오류: {e}")
+            log.info("가사 모드 활성화 완료: top_widget visible=%s", self.top_widget.isVisible() if self.top_widget else False)
+        except Exception:
+            log.exception("show_lyrics_mode 오류")
 
     def show_video_mode(self):
         try:
-            print(f"show_video_mode 호출: current_song_index={self.current_song_index}")
+            log.debug("show_video_mode 호출: current_song_index=%s", self.current_song_index)
+            position = self.playback_position()
             self.current_mode = "video"
             if self.top_widget:
-                print("top_widget 제거")
+                log.debug("top_widget 제거")
                 self.main_layout.removeWidget(self.top_widget)
                 self.top_widget.deleteLater()
                 self.top_widget = None
             if self.background_label:
                 self.background_label.hide()
-                print("background_label 숨김")
+                log.debug("background_label 숨김")
 
             artist, song_name = self.parse_song_info(self.songs_list[self.current_song_index])
             mv_path = self.match_music_video(song_name)
             if mv_path and os.path.exists(mv_path):
-                print(f"비디오 파일 로드 시도: {mv_path}")
-                self.video_player.setMedia(QMediaContent(QtCore.QUrl.fromLocalFile(mv_path)))
+                log.debug("비디오 파일 로드 시도: %s", mv_path)
+                warm = self.video_preroll.open(mv_path)
+                self.mode_switch_started = (time.perf_counter(), warm)
+                self.video_player.setNotifyInterval(20)  # 전환 지연 측정 동안만 촘촘하게
+                if mv_path not in self.mv_durations:
+                    self.mv_durations[mv_path] = probe_mv_duration(mv_path)
+                mv_duration = self.mv_durations[mv_path]
+                if self.mv_audio and durations_match(self.current_duration, mv_duration):
+                    # MV 소리로 재생: MP3 디코더는 멈추고 동기화도 필요 없다
+                    self.audio_player.pause()
+                    self.av_sync.stop()
+                    self.mv_timeline = TimelineMap(self.current_duration, mv_duration)
+                    self.video_player.setMuted(self.is_muted)
+                    self.video_start_position = self.mv_timeline.to_mv(position)
+                    log.info("단일 디코더 모드: MP3 %s ms, MV %s ms", self.current_duration, mv_duration)
+                else:
+                    self.leave_single_decoder(position)
+                    self.video_player.setMuted(True)
+                    self.av_sync.start(os.path.basename(mv_path))
+                    self.video_start_position = position
                 self.video_widget.show()
                 self.video_widget.setGeometry(0, 0, 800, 600)
                 self.video_widget.lower()
                 self.video_widget.raise_()  # 비디오 위젯 계층 조정
                 if self.is_playing:
-                    current_pos = self.audio_player.position()
-                    print(f"비디오 위치 설정: {self.format_time(current_pos)}")
-                    self.video_player.setPosition(current_pos)
+                    log.debug("비디오 위치 설정: %s", self.format_time(self.video_start_position))
+                    self.video_player.setPosition(self.video_start_position)
                     self.video_player.play()
 
                 # 복귀 버튼
@@ -969,54 +1463,71 @@ class MP3PlayerUI(QtWidgets.QWidget):
                 self.return_button.move(20, 20)
                 self.return_button.show()
                 self.return_button.raise_()
-                print(f"return_button 표시: visible={self.return_button.isVisible()}")
+                log.debug("return_button 표시: visible=%s", self.return_button.isVisible())
 
-                print(f"뮤직비디오 모드 활성화: {mv_path}")
+                log.info("뮤직비디오 모드 활성화: %s", mv_path)
             else:
-                print(f"뮤직비디오 없음: {song_name}")
+                log.info("뮤직비디오 없음: %s", song_name)
+                self.leave_single_decoder(position)
                 self.video_widget.hide()
-                self.video_player.setMedia(QMediaContent())
+                self.video_preroll.release()
                 self.show_lyrics_mode()
             self.update()
-        except Exception as e:
-            print(f"show_video_mode 오류: {e}")
+        except Exception:
+            log.exception("show_video_mode 오류")
             self.show_lyrics_mode()  # 오류 시 가사 모드로 대체
 
     def thumbnail_clicked(self, label_index):
         try:
-            song_index = self.thumbnail_labels[label_index].property("song_index")
+            song_index = self.tile_song_index(label_index)
             if song_index is None:
                 song_index = self.current_song_index
             if song_index is not None:
-                self.audio_player.pause()
-                self.video_player.pause()
-                self.position_timer.stop()
-                self.current_song_index = song_index
-                self.current_display_index = (song_index - 2) % len(self.songs_list)
-                self.thumbnail_widget.hide()
-                self.is_playing = False
-                self.button_play_pause.setIcon(QtGui.QIcon("images/play.png"))
-                self.progress_bar.setValue(0)
-                self.label_progress.setText("00:00 / 00:00")
-
-                song_path = os.path.join("music", self.songs_list[song_index])
-                self.audio_player.setMedia(QMediaContent(QtCore.QUrl.fromLocalFile(song_path)))
+                self.play_song(song_index)
+        except Exception:
+            log.exception("thumbnail_clicked 오류")
+
+    def show_song(self, song_index):
+        # 곡 선택에 따른 UI 갱신 (미디어는 건드리지 않음)
+        self.video_player.pause()
+        self.current_song_index = song_index
+        self.current_display_index = (song_index - self.center_tile) % len(self.songs_list)
+        self.set_current_duration(self.song_durations.get(self.song_path(song_index), 0))
+        self.seek_tables.request(self.song_path(song_index))
+        if self.mv_timeline is not None:
+            # 새 곡은 처음부터. 단일 디코더 여부는 show_video_mode 에서 다시 정한다.
+            self.mv_timeline = None
+            self.video_player.setMuted(True)
+        self.thumbnail_widget.hide()
+        self.progress_bar.setValue(0)
+        self.label_progress.setText("00:00 / 00:00")
 
-                # 현재 모드에 따라 UI 업데이트
-                if self.current_mode == "lyrics":
-                    self.show_lyrics_mode()
-                else:
-                    self.show_video_mode()
+        # 현재 모드에 따라 UI 업데이트
+        if self.current_mode == "lyrics":
+            self.show_lyrics_mode()
+        else:
+            self.show_video_mode()
 
-                # 오디오 재생 시작
-                self.audio_player.play()
-                self.is_playing = True
-                self.button_play_pause.setIcon(QtGui.QIcon("images/pause.png"))
-                self.position_timer.start(100)
+    def play_song(self, song_index):
+        try:
+            self.audio_player.pause()
+            self.is_playing = False
+            self.button_play_pause.setIcon(QtGui.QIcon("images/play.png"))
+            # 곡 번호를 먼저 바꿔 두면 load 의 trackAdvanced 는 다음 곡 준비만 한다
+            self.current_song_index = song_index
+            self.audio_player.load(self.song_path(song_index))
+            self.show_song(song_index)
+
+            # 재생 시작 (단일 디코더 모드면 MV 만, 아니면 오디오 + 비디오)
+            # 미리 열어 둔 곡은 LoadedMedia 가 다시 오지 않으므로 여기서 바로 시작한다
+            self.is_playing = True
+            self.button_play_pause.setIcon(QtGui.QIcon("images/pause.png"))
+            self.resume_playback()
+            self.preload_next_song()
 
-                print(f"썸네일 클릭: song_index={song_index}, 모드={self.current_mode}")
-        except Exception as e:
-            print(f"thumbnail_clicked 오류: {e}")
+            log.info("곡 재생: song_index=%s, 모드=%s", song_index, self.current_mode)
+        except Exception:
+            log.exception("play_song 오류")
 
     def toggle_thumbnails(self):
         try:
@@ -1031,8 +1542,11 @@ class MP3PlayerUI(QtWidgets.QWidget):
                 if self.original_spacing is not None:
                     self.main_layout.setSpacing(self.original_spacing)
                 self.thumbnail_widget.hide()
-        except Exception as e:
-            print(f"toggle_thumbnails 오류: {e}")
+            stats = self.pixmap_cache.stats()
+            log.debug("썸네일 캐시: hit=%d, miss=%d, 적중률=%.0f%%, %d개, %d KB",
+                      stats['hits'], stats['misses'], stats['hit_rate'] * 100, stats['entries'], stats['bytes'] // 1024)
+        except Exception:
+            log.exception("toggle_thumbnails 오류")
 
     def handle_video_status(self, status):
         try:
@@ -1046,38 +1560,74 @@ class MP3PlayerUI(QtWidgets.QWidget):
                 QMediaPlayer.InvalidMedia: "InvalidMedia",
                 QMediaPlayer.UnknownMediaStatus: "UnknownMediaStatus"
             }
-            print(f"비디오 미디어 상태: {status_map.get(status, 'Unknown')}")
+            log.debug("비디오 미디어 상태: %s", status_map.get(status, 'Unknown'))
             if status == QMediaPlayer.LoadedMedia:
                 if self.is_playing and self.current_mode == "video":
-                    current_pos = self.audio_player.position()
+                    if self.mv_timeline is None:
+                        current_pos = self.audio_player.position()
+                    else:
+                        current_pos = self.video_start_position
                     self.video_player.setPosition(current_pos)
                     self.video_player.play()
-                    print(f"비디오 로드 완료, 재생 시작: {self.format_time(current_pos)}")
+                    log.debug("비디오 로드 완료, 재생 시작: %s", self.format_time(current_pos))
             elif status == QMediaPlayer.InvalidMedia:
-                print("비디오 파일 유효하지 않음")
-                self.show_lyrics_mode()
-            elif status == QMediaPlayer.EndOfMedia:
-                print("비디오 종료, 다음 곡으로 전환")
+                log.warning("비디오 파일 유효하지 않음: %s", self.video_preroll.loaded_path)
+                self.video_preroll.mark_failed(self.video_preroll.loaded_path)
+                if self.current_mode == "video":
+                    self.show_lyrics_mode()
+            elif status == QMediaPlayer.EndOfMedia and self.mv_timeline is not None:
+                # 단일 디코더 모드에서만 MV 가 곡의 끝 (두 플레이어 방식은 오디오 쪽이 결정)
+                log.info("비디오 종료, 다음 곡으로 전환")
                 self.next_song()
-        except Exception as e:
-            print(f"handle_video_status 오류: {e}")
+        except Exception:
+            log.exception("handle_video_status 오류")
     def format_time(self, ms):
         seconds = ms // 1000
         minutes = seconds // 60
         seconds = seconds % 60
         return f"{minutes:02d}:{seconds:02d}"
 
+def tile_count(value):
+    # 캐러셀 가운데 타일이 있어야 하므로 1 이상의 홀수만 받는다
+    count = int(value)
+    if count < 1 or count % 2 == 0:
+        raise argparse.ArgumentTypeError(f"타일 수는 1 이상의 홀수여야 합니다: {value}")
+    return count
+
 def main():
     try:
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--carousel", choices=("widgets", "painter"), default="widgets",
+                            help="캐러셀 렌더러 (widgets: 라벨 위젯, painter: paintEvent 한 번에 그리기)")
+        parser.add_argument("--tiles", type=tile_count, default=5, help="캐러셀에 보이는 타일 수 (1 이상의 홀수)")
+        parser.add_argument("--crossfade", type=int, default=0, help="곡 사이 크로스페이드 길이 (ms, 0 이면 바로 전환)")
+        parser.add_argument("--no-mv-audio", dest="mv_audio", action="store_false",
+                            help="뮤직비디오 모드에서도 항상 MP3 + 음소거된 MV 두 플레이어로 재생")
+        parser.add_argument("--no-video-preroll", dest="video_preroll", action="store_false",
+                            help="가사 모드에서 뮤직비디오를 미리 열어 두지 않음")
+        parser.add_argument("--preroll-memory-mb", type=int, default=DEFAULT_MEMORY_CAP_MB,
+                            help="이 메모리(RSS, MB)를 넘으면 미리 열어 둔 뮤직비디오를 닫음 (0 이면 제한 없음)")
+        parser.add_argument("--no-replaygain", dest="replaygain", action="store_false",
+                            help="곡별 음량 분석/보정 끄기")
+        parser.add_argument("--loudness-workers", type=int, default=None, help="음량 분석 프로세스 수")
+        parser.add_argument("--ffmpeg", default=None,
+                            help="ffmpeg 실행 파일 또는 bin 폴더 (예: D:/utils/ffmpeg/bin). 기본값은 MP3PLAYER_FFMPEG 환경 변수, 없으면 PATH")
+        parser.add_argument("--log", default=None,
+                            help="로그 레벨 (예: info, debug, info,temp9=debug). 기본값은 MP3PLAYER_LOG 환경 변수")
+        args, qt_args = parser.parse_known_args()
+        setup_logging(args.log)
         if not os.path.exists("images"):
-            print("images 디렉토리가 없습니다. images 디렉토리에 play.png, pause.png, rewind.png, fastforward.png, songs.png, mute.png를 준비하세요.")
+            log.error("images 디렉토리가 없습니다. images 디렉토리에 play.png, pause.png, rewind.png, fastforward.png, songs.png, mute.png를 준비하세요.")
             return
-        app = QtWidgets.QApplication(sys.argv)
-        window = MP3PlayerUI()
+        app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+        window = MP3PlayerUI(visible_tiles=args.tiles, carousel_mode=args.carousel, crossfade_ms=args.crossfade,
+                             mv_audio=args.mv_audio, video_preroll=args.video_preroll,
+                             preroll_memory_mb=args.preroll_memory_mb, replaygain=args.replaygain,
+                             loudness_workers=args.loudness_workers, ffmpeg_location=args.ffmpeg)
         window.show()
         sys.exit(app.exec_())
-    except Exception as e:
-        print(f"main 오류: {e}")
+    except Exception:
+        log.exception("main 오류")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+from PyQt5 import QtCore, QtGui
+
+from app_log import get_logger
+
+# 디스크 썸네일 캐시: 유튜브 원본(.webp, 보통 1280x720)을 플레이어가 쓰는 크기로
+# 미리 줄여 cache/thumbnails 에 저장한다. 캐시 파일의 mtime 을 원본 mtime 과 같게
+# 맞춰 두고, 원본이 바뀌면(mtime 불일치) 다시 생성한다.
+log = get_logger("thumbnail_cache")
+CACHE_DIR = os.path.join("cache", "thumbnails")
+
+# (가로, 세로) -> (종류 이름, 종횡비 모드)
+SIZES = {
+    (116, 116): ("tile", QtCore.Qt.KeepAspectRatio),
+    (216, 216): ("art", QtCore.Qt.KeepAspectRatio),
+    (800, 600): ("background", QtCore.Qt.KeepAspectRatioByExpanding),
+}
+
+
+class ThumbnailDiskCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.generated = 0
+
+    def cache_path(self, source, width, height):
+        kind, _ = SIZES[(width, height)]
+        digest = hashlib.sha1(os.path.abspath(source).encode("utf-8", "surrogatepass")).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f"{digest}_{kind}.png")
+
+    def get(self, source, width, height):
+        # 캐시된 축소 이미지 경로를 돌려준다. 지원하지 않는 크기면 None.
+        if (width, height) not in SIZES:
+            return None
+        try:
+            source_mtime = os.stat(source).st_mtime_ns
+        except OSError:
+            return None
+        path = self.cache_path(source, width, height)
+        try:
+            if os.stat(path).st_mtime_ns == source_mtime:
+                return path
+        except OSError:
+            pass
+        if self.generate(source, width, height, path, source_mtime):
+            return path
+        return None
+
+    def generate(self, source, width, height, path, source_mtime):
+        try:
+            image = QtGui.QImage(source)
+            if image.isNull():
+                return False
+            _, mode = SIZES[(width, height)]
+            image = image.scaled(width, height, mode, QtCore.Qt.SmoothTransformation)
+            if mode == QtCore.Qt.KeepAspectRatioByExpanding:
+                # 배경은 가운데를 기준으로 정확히 잘라 둔다
+                image = image.copy((image.width() - width) // 2, (image.height() - height) // 2, width, height)
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            temp_path = path + ".tmp"
+            if not image.save(temp_path, "PNG"):
+                return False
+            os.utime(temp_path, ns=(source_mtime, source_mtime))
+            os.replace(temp_path, path)
+            self.generated += 1
+            return True
+        except Exception:
+            log.exception("썸네일 캐시 생성 오류: %s", source)
+            return False
+
+    def pregenerate(self, folder):
+        # 다운로드 직후 모든 크기의 캐시를 미리 만들어 둔다
+        count = 0
+        for filename in sorted(os.listdir(folder)):
+            if filename.lower().endswith(".webp"):
+                source = os.path.join(folder, filename)
+                for width, height in SIZES:
+                    if self.get(source, width, height):
+                        count += 1
+        return count
+
+
+def _benchmark(count=30, frames=50):
+    # 캐러셀 한 프레임(타일 5개)을 원본에서 디코딩/축소할 때와 캐시에서 읽을 때 비교
+    app = QtGui.QGuiApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as root:
+        fmt = "WEBP" if b"webp" in QtGui.QImageWriter.supportedImageFormats() else "PNG"
+        sources = []
+        for i in range(count):
+            image = QtGui.QImage(1280, 720, QtGui.QImage.Format_RGB32)
+            gradient = QtGui.QLinearGradient(0, 0, 1280, 720)
+            gradient.setColorAt(0, QtGui.QColor.fromHsv(i * 12 % 360, 200, 220))
+            gradient.setColorAt(1, QtGui.QColor.fromHsv(i * 37 % 360, 160, 90))
+            painter = QtGui.QPainter(image)
+            painter.fillRect(image.rect(), gradient)
+            painter.end()
+            path = os.path.join(root, f"thumb{i:03d}.{fmt.lower()}")
+            image.save(path, fmt)
+            sources.append(path)
+
+        cache = ThumbnailDiskCache(os.path.join(root, "cache"))
+        for source in sources:
+            cache.get(source, 116, 116)
+
+        def frame_from_source(start):
+            for i in range(5):
+                pixmap = QtGui.QPixmap(sources[(start + i) % count])
+                pixmap.scaled(116, 116, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+
+        def frame_from_cache(start):
+            for i in range(5):
+                QtGui.QPixmap(cache.get(sources[(start + i) % count], 116, 116))
+
+        for label, frame in (("원본 디코딩", frame_from_source), ("디스크 캐시", frame_from_cache)):
+            start = time.perf_counter()
+            for n in range(frames):
+                frame(n)
+            per_frame = (time.perf_counter() - start) * 1000 / frames
+            print(f"{label} ({fmt}): 프레임당 {per_frame:.2f} ms")
+    del app
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,139 @@
+import difflib
+import os
+import re
+import sys
+import time
+import unicodedata
+
+# 정규화된 제목 -> 에셋 경로 인덱스. 곡 제목으로 썸네일/뮤직비디오를 찾을 때
+# 매번 목록 전체를 훑지 않도록 스캔할 때 한 번만 만든다.
+BRACKETS = re.compile(r"\([^)]*\)|\[[^\]]*\]|\{[^}]*\}|【[^】]*】|「[^」]*」|『[^』]*』|<[^>]*>")
+FUZZY_RATIO = 0.8
+MAX_CANDIDATES = 50
+
+
+def normalize_title(text, strip_brackets=True):
+    # NFC 정규화 + casefold, 괄호 안 내용(공식 MV 표기 등)과 문장부호 제거, 공백 정리
+    text = unicodedata.normalize("NFC", text).casefold()
+    if strip_brackets:
+        stripped = BRACKETS.sub(" ", text)
+        if stripped.strip():
+            text = stripped
+    chars = []
+    for ch in text:
+        category = unicodedata.category(ch)
+        chars.append(" " if category[0] in "PSZC" else ch)
+    return " ".join("".join(chars).split())
+
+
+class TitleIndex:
+    def __init__(self, filenames, folder, extension):
+        self.folder = folder
+        self.extension = extension.lower()
+        self.exact = {}
+        self.aliases = {}
+        self.items = []
+        self.tokens = {}
+        self.cache = {}
+        for filename in sorted(filenames):
+            name = filename[:-len(extension)] if filename.lower().endswith(self.extension) else filename
+            key = normalize_title(name)
+            path = os.path.join(folder, filename)
+            if not key:
+                continue
+            # 같은 정규화 제목이 여러 개면 정렬상 첫 파일을 쓴다.
+            # "아티스트_제목", "아티스트 - 제목" 형식이면 제목 부분도 별칭으로 등록
+            self.exact.setdefault(key, path)
+            for separator in ("_", " - "):
+                if separator in name:
+                    alias = normalize_title(name.split(separator, 1)[1])
+                    if alias:
+                        self.aliases.setdefault(alias, path)
+            item_id = len(self.items)
+            self.items.append((key, path))
+            for token in set(key.split()):
+                self.tokens.setdefault(token, []).append(item_id)
+        self.vocabulary = sorted(self.tokens)
+
+    def __len__(self):
+        return len(self.items)
+
+    def lookup(self, title):
+        if title.lower().endswith(self.extension):
+            title = title[:-len(self.extension)]
+        key = normalize_title(title)
+        if not key:
+            return None
+        path = self.exact.get(key) or self.aliases.get(key)
+        if path is not None:
+            return path
+        if key not in self.cache:
+            self.cache[key] = self.fuzzy_lookup(key)
+        return self.cache[key]
+
+    def fuzzy_lookup(self, key):
+        # 드문 토큰부터 후보를 모아 (포함 관계, 유사도, 경로) 순으로 결정적으로 고른다.
+        # 일치하는 토큰이 하나도 없을 때만 철자가 비슷한 토큰으로 후보를 찾는다.
+        query_tokens = sorted(set(key.split()))
+        postings = [self.tokens[token] for token in query_tokens if token in self.tokens]
+        if not postings:
+            for token in query_tokens:
+                for close in difflib.get_close_matches(token, self.vocabulary, n=3, cutoff=FUZZY_RATIO):
+                    postings.append(self.tokens[close])
+        shared = {}
+        for posting in sorted(postings, key=len):
+            if shared and len(posting) > MAX_CANDIDATES:
+                break
+            for item_id in posting:
+                shared[item_id] = shared.get(item_id, 0) + 1
+        if not shared:
+            return None
+        candidates = sorted(shared, key=lambda item_id: (-shared[item_id], item_id))[:MAX_CANDIDATES]
+        best = None
+        for item_id in candidates:
+            candidate, path = self.items[item_id]
+            contained = key in candidate or candidate in key
+            ratio = difflib.SequenceMatcher(None, key, candidate).ratio()
+            if not contained and ratio < FUZZY_RATIO:
+                continue
+            rank = (contained, ratio)
+            if best is None or rank > best[0] or (rank == best[0] and path < best[1]):
+                best = (rank, path)
+        return best[1] if best else None
+
+
+def _benchmark(count=10000, queries=2000):
+    # 10k 에셋에서 기존 선형 부분문자열 검색과 인덱스 조회 비용 비교
+    names = [f"Artist{i % 500}_Song Title {i:05d} (Official Video).mp4" for i in range(count)]
+    titles = [f"Song Title {(i * 7919) % count:05d}" for i in range(queries)]
+    fuzzy = [f"Artist{i % 500} Song Titel {(i * 104729) % count:05d}" for i in range(queries // 10)]
+
+    def linear(title):
+        song_name = title.lower().strip()
+        for mv in names:
+            mv_lower = mv.lower().replace(".mp4", "").strip()
+            if song_name in mv_lower or mv_lower in song_name:
+                return mv
+        return None
+
+    start = time.perf_counter()
+    index = TitleIndex(names, "mv", ".mp4")
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"인덱스 생성 ({count}개): {build_ms:.1f} ms")
+
+    sample = titles[:200]
+    start = time.perf_counter()
+    for title in sample:
+        linear(title)
+    print(f"선형 검색: 조회당 {(time.perf_counter() - start) * 1e6 / len(sample):.1f} us")
+
+    for label, batch in (("인덱스 (정확/별칭)", titles), ("인덱스 (퍼지, 첫 조회)", fuzzy),
+                         ("인덱스 (퍼지, 캐시)", fuzzy)):
+        start = time.perf_counter()
+        for title in batch:
+            index.lookup(title)
+        print(f"{label}: 조회당 {(time.perf_counter() - start) * 1e6 / len(batch):.2f} us")
+
+
+if __name__ == "__main__":
+    _benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,313 @@
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app_log import get_logger
+
+# 따로 돌리는 변환 단계: ffmpeg 작업을 코어 수만큼의 프로세스 풀에 나눠 돌린다.
+# 프로필마다 스트림별로 "그대로 복사해도 되는 코덱/비트레이트"를 정해 두고,
+# ffprobe 로 원본을 본 뒤 맞으면 재인코딩 없이 -c copy 로 옮긴다 (job01/job02 의 후처리기는 항상 다시 인코딩하거나 순차 처리).
+# MP3 출력은 앨범아트(attached picture)를 그대로 넘겨 cover_art 가 계속 쓸 수 있게 한다.
+log = get_logger("transcode")
+
+PROFILES = {
+    # 보관용: job01 과 같은 품질(LAME V0). MP3 원본은 손대지 않는다.
+    "archival": {
+        "extension": ".mp3",
+        "audio": {"copy": ("mp3",), "max_kbps": None, "encode": ["-c:a", "libmp3lame", "-q:a", "0"]},
+        "cover": True,
+    },
+    # 휴대폰용 작은 파일: 96 kbps MP3. 128 kbps 이하 MP3 만 그대로 복사.
+    "mobile-small": {
+        "extension": ".mp3",
+        "audio": {"copy": ("mp3",), "max_kbps": 128, "encode": ["-c:a", "libmp3lame", "-b:a", "96k"]},
+        "cover": True,
+    },
+    "opus": {
+        "extension": ".opus",
+        "audio": {"copy": ("opus",), "max_kbps": 160, "encode": ["-c:a", "libopus", "-b:a", "128k", "-vbr", "on"]},
+        "cover": False,  # Ogg 먹서는 그림 스트림을 쓰지 못한다
+    },
+    # 뮤직비디오: job02 의 FFmpegVideoConvertor 와 같은 MP4 (H.264 + AAC). 맞는 스트림은 리먹스만.
+    "mp4": {
+        "extension": ".mp4",
+        "video": {"copy": ("h264",), "max_kbps": None,
+                  "encode": ["-c:v", "libx264", "-preset", "veryfast", "-crf", "20", "-pix_fmt", "yuv420p"]},
+        "audio": {"copy": ("aac",), "max_kbps": None, "encode": ["-c:a", "aac", "-b:a", "192k"]},
+        "cover": False,
+        "output_args": ["-movflags", "+faststart"],
+    },
+}
+
+
+def find_tools(ffmpeg=None):
+    # (ffmpeg, ffprobe). ffprobe 는 ffmpeg 옆에 있는 것을 먼저 쓰고, 없으면 None.
+    ffmpeg = ffmpeg or shutil.which("ffmpeg")
+    if not ffmpeg:
+        return None, None
+    folder, name = os.path.split(ffmpeg)
+    sibling = os.path.join(folder, name.replace("ffmpeg", "ffprobe"))
+    return ffmpeg, sibling if folder and os.path.exists(sibling) else shutil.which("ffprobe")
+
+
+STREAM_LINE = re.compile(r"Stream #0:(\d+)\S*: (Audio|Video): (\w+)")
+KBPS = re.compile(r"(\d+) kb/s")
+
+
+def probe_streams(ffprobe, path, ffmpeg=None):
+    # ffprobe 가 없으면 (imageio-ffmpeg 처럼 ffmpeg 만 있는 경우) ffmpeg -i 출력에서 읽는다
+    if not ffprobe:
+        return probe_streams_ffmpeg(ffmpeg, path)
+    output = subprocess.run([ffprobe, "-v", "error", "-show_entries",
+                             "stream=index,codec_type,codec_name,bit_rate:stream_disposition=attached_pic:format=bit_rate",
+                             "-of", "json", path], check=True, capture_output=True, text=True).stdout
+    data = json.loads(output)
+    streams = data.get("streams") or []
+    # 컨테이너에 따라 스트림 비트레이트가 없으면 전체 비트레이트로 대신한다
+    for stream in streams:
+        if not stream.get("bit_rate"):
+            stream["bit_rate"] = (data.get("format") or {}).get("bit_rate")
+    return streams
+
+
+def probe_streams_ffmpeg(ffmpeg, path):
+    output = subprocess.run([ffmpeg, "-hide_banner", "-nostdin", "-i", path], capture_output=True, text=True,
+                            errors="replace").stderr
+    streams = []
+    total = None
+    for line in output.splitlines():
+        if "Duration:" in line and "bitrate:" in line:
+            match = KBPS.search(line.split("bitrate:", 1)[1])
+            total = str(int(match.group(1)) * 1000) if match else None
+        match = STREAM_LINE.search(line)
+        if not match:
+            continue
+        rate = KBPS.search(line)
+        streams.append({"index": int(match.group(1)), "codec_type": match.group(2).lower(),
+                        "codec_name": match.group(3), "bit_rate": str(int(rate.group(1)) * 1000) if rate else None,
+                        "disposition": {"attached_pic": int("(attached pic)" in line)}})
+    if not streams:
+        raise RuntimeError(output.strip().splitlines()[-1] if output.strip() else "ffmpeg 출력 없음")
+    for stream in streams:
+        stream["bit_rate"] = stream["bit_rate"] or total
+    return streams
+
+
+def stream_copyable(stream, spec):
+    if stream.get("codec_name") not in spec["copy"]:
+        return False
+    if spec["max_kbps"] is None:
+        return True
+    try:
+        return int(stream["bit_rate"]) <= spec["max_kbps"] * 1000
+    except (TypeError, ValueError):
+        return False
+
+
+def output_path(source, output_dir, profile_name):
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(output_dir, name + PROFILES[profile_name]["extension"])
+
+
+def build_command(ffmpeg, source, target, streams, profile_name):
+    # (ffmpeg 명령, "copy" / "encode" / "mixed"). 옮길 스트림이 없으면 (None, None).
+    profile = PROFILES[profile_name]
+    command = [ffmpeg, "-v", "error", "-nostdin", "-y", "-i", source, "-map_metadata", "0"]
+    modes = set()
+    for kind in ("video", "audio"):
+        spec = profile.get(kind)
+        if spec is None:
+            continue
+        candidates = [s for s in streams if s.get("codec_type") == kind
+                      and not (s.get("disposition") or {}).get("attached_pic")]
+        if not candidates:
+            continue
+        stream = candidates[0]
+        command += ["-map", f"0:{stream['index']}"]
+        if stream_copyable(stream, spec):
+            command += ["-c:" + kind[0], "copy"]
+            modes.add("copy")
+        else:
+            command += spec["encode"]
+            modes.add("encode")
+    if not modes:
+        return None, None
+    if profile["cover"]:
+        pictures = [s for s in streams if (s.get("disposition") or {}).get("attached_pic")]
+        if pictures:
+            command += ["-map", f"0:{pictures[0]['index']}", "-c:v", "copy", "-disposition:v", "attached_pic"]
+    if profile["extension"] == ".mp3":
+        command += ["-id3v2_version", "3"]
+    # 병렬성은 프로세스 풀이 맡으므로 인코더 스레드는 하나로 묶는다
+    command += profile.get("output_args", []) + ["-threads", "1", target]
+    return command, "mixed" if len(modes) > 1 else modes.pop()
+
+
+def transcode_file(source, output_dir, profile_name, ffmpeg=None, ffprobe=None):
+    # 프로세스 풀에서 실행된다. {"source", "output", "mode", "seconds", "bytes"} 또는 예외.
+    if not ffmpeg:
+        ffmpeg, ffprobe = find_tools()
+    start = time.perf_counter()
+    target = output_path(source, output_dir, profile_name)
+    result = {"source": source, "output": target, "mode": "skip", "seconds": 0.0, "bytes": 0}
+    try:
+        if os.path.getmtime(target) >= os.path.getmtime(source):
+            result["bytes"] = os.path.getsize(target)
+            return result  # 이미 변환된 파일
+    except OSError:
+        pass
+    temp_path = target[:-len(PROFILES[profile_name]["extension"])] + ".part" + PROFILES[profile_name]["extension"]
+    command, mode = build_command(ffmpeg, source, temp_path, probe_streams(ffprobe, source, ffmpeg), profile_name)
+    if command is None:
+        raise ValueError("변환할 스트림이 없음")
+    process = subprocess.run(command, capture_output=True, text=True)
+    if process.returncode != 0:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise RuntimeError(process.stderr.strip() or f"ffmpeg 종료 코드 {process.returncode}")
+    os.replace(temp_path, target)
+    result.update(mode=mode, seconds=time.perf_counter() - start, bytes=os.path.getsize(target))
+    return result
+
+
+def default_workers():
+    # 이 프로세스가 쓸 수 있는 코어 수 (affinity 가 없는 OS 는 전체 코어)
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def transcode_files(paths, output_dir, profile_name, workers=None, ffmpeg=None, on_result=None):
+    # 경로 목록을 프로세스 풀에서 변환한다. on_result(path, result 또는 None) 은 끝나는 순서대로 호출된다.
+    if profile_name not in PROFILES:
+        raise ValueError(f"알 수 없는 프로필: {profile_name} ({', '.join(PROFILES)})")
+    ffmpeg, ffprobe = find_tools(ffmpeg)
+    if not ffmpeg:
+        raise RuntimeError("ffmpeg 를 찾을 수 없습니다.")
+    os.makedirs(output_dir, exist_ok=True)
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers or default_workers(), mp_context=context) as pool:
+        futures = {pool.submit(transcode_file, path, output_dir, profile_name, ffmpeg, ffprobe): path
+                   for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                log.warning("변환 실패: %s - %s", path, e)
+                result = None
+            results[path] = result
+            if on_result is not None:
+                on_result(path, result)
+    return results
+
+
+def format_results(results, seconds):
+    modes = {}
+    for result in results.values():
+        mode = result["mode"] if result else "failed"
+        modes[mode] = modes.get(mode, 0) + 1
+    output_mb = sum(result["bytes"] for result in results.values() if result) / 1e6
+    counts = ", ".join(f"{mode} {count}" for mode, count in sorted(modes.items()))
+    return f"{len(results)}개 ({counts}), 출력 {output_mb:.1f} MB, {seconds:.1f} s, {len(results) * 60 / seconds:.1f} 개/분"
+
+
+def make_test_media(ffmpeg, folder, count, seconds):
+    # 벤치마크용 원본: 192 kbps MP3(일부 모노, 일부 앨범아트), Opus, H.264/AAC MP4, MPEG-4/MP3 MKV
+    def run(*args):
+        subprocess.run([ffmpeg, "-v", "error", "-nostdin", "-y"] + list(args), check=True)
+
+    cover = os.path.join(folder, "cover.jpg")
+    run("-f", "lavfi", "-i", "testsrc=size=500x500:duration=1", "-frames:v", "1", cover)
+    audio, video = [], []
+    for i in range(count):
+        path = os.path.join(folder, f"track{i:02d}.mp3")
+        layout = "mono" if i % 4 == 3 else "stereo"
+        source = f"anoisesrc=color=pink:duration={seconds}:seed={i},volume=-12dB,aformat=channel_layouts={layout}"
+        if i % 2:
+            run("-f", "lavfi", "-i", source, "-i", cover, "-map", "0:a", "-map", "1:v", "-c:a", "libmp3lame",
+                "-b:a", "192k", "-c:v", "copy", "-disposition:v", "attached_pic", "-id3v2_version", "3", path)
+        else:
+            run("-f", "lavfi", "-i", source, "-c:a", "libmp3lame", "-b:a", "192k", path)
+        audio.append(path)
+    for i in range(2):
+        path = os.path.join(folder, f"voice{i}.opus")
+        run("-f", "lavfi", "-i", f"sine=frequency={440 + i * 110}:duration={seconds}", "-c:a", "libopus",
+            "-b:a", "96k", path)
+        audio.append(path)
+        clip = f"testsrc2=size=640x360:rate=25:duration={min(seconds, 20)}"
+        tone = f"sine=frequency=330:duration={min(seconds, 20)}"
+        path = os.path.join(folder, f"clip{i}.mp4")
+        run("-f", "lavfi", "-i", clip, "-f", "lavfi", "-i", tone, "-c:v", "libx264", "-preset", "ultrafast",
+            "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", path)
+        video.append(path)
+        path = os.path.join(folder, f"clip{i}_mpeg4.mkv")
+        run("-f", "lavfi", "-i", clip, "-f", "lavfi", "-i", tone, "-c:v", "mpeg4", "-q:v", "5",
+            "-c:a", "libmp3lame", "-shortest", path)
+        video.append(path)
+    return audio, video
+
+
+def _benchmark(count=12, seconds=60, max_workers=None):
+    # 로컬에서 만든 곡/영상으로 프로필별 복사/인코딩 결과를 보고, 워커 수 1..N 에서의 처리량을 잰다
+    ffmpeg, ffprobe = find_tools()
+    if not ffmpeg:
+        print("ffmpeg 가 PATH 에 없습니다.")
+        return
+    cores = default_workers()
+    max_workers = max_workers or max(2, cores)
+    with tempfile.TemporaryDirectory() as root:
+        source_dir = os.path.join(root, "source")
+        os.makedirs(source_dir)
+        audio, video = make_test_media(ffmpeg, source_dir, count, seconds)
+        print(f"MP3 {count}개 ({seconds}초, 192 kbps) + Opus 2개, 영상 4개 (MP4 2, MKV 2)")
+
+        for profile_name in PROFILES:
+            paths = video if profile_name == "mp4" else audio
+            start = time.perf_counter()
+            results = transcode_files(paths, os.path.join(root, profile_name), profile_name, cores, ffmpeg)
+            print(f"{profile_name:12s}: {format_results(results, time.perf_counter() - start)}")
+        start = time.perf_counter()
+        results = transcode_files(audio, os.path.join(root, "mobile-small"), "mobile-small", cores, ffmpeg)
+        print(f"mobile-small 재실행: {format_results(results, time.perf_counter() - start)}")
+
+        baseline = None
+        for workers in range(1, max_workers + 1):
+            output_dir = os.path.join(root, f"scale{workers}")
+            start = time.perf_counter()
+            transcode_files(audio[:count], output_dir, "mobile-small", workers, ffmpeg)
+            elapsed = time.perf_counter() - start
+            per_minute = count * 60 / elapsed
+            baseline = baseline or per_minute
+            print(f"워커 {workers}개 (mobile-small): {per_minute:6.1f} 곡/분, "
+                  f"코어당 {per_minute / min(workers, cores):6.1f} 곡/분, 속도 향상 x{per_minute / baseline:.2f}")
+        print(f"사용 가능한 CPU 코어 {cores}개")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in PROFILES:
+        # python transcode.py <프로필> <원본 폴더> <출력 폴더> [워커 수]
+        if len(sys.argv) < 4:
+            print("사용법: python transcode.py <프로필> <원본 폴더> <출력 폴더> [워커 수]")
+            sys.exit(1)
+        source_dir, output_dir = sys.argv[2], sys.argv[3]
+        if sys.argv[1] == "mp4":
+            extensions = (".mp4", ".mkv", ".webm")
+        else:
+            extensions = (".mp3", ".m4a", ".opus", ".webm", ".wav", ".flac")
+        paths = sorted(os.path.join(source_dir, f) for f in os.listdir(source_dir) if f.lower().endswith(extensions))
+        start = time.perf_counter()
+        results = transcode_files(paths, output_dir, sys.argv[1], int(sys.argv[4]) if len(sys.argv) > 4 else None)
+        print(format_results(results, time.perf_counter() - start))
+    else:
+        _benchmark(*(int(arg) for arg in sys.argv[1:4]))
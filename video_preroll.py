@@ -0,0 +1,135 @@
+import os
+import sys
+
+from PyQt5 import QtCore
+from PyQt5.QtMultimedia import QMediaContent
+
+from app_log import get_logger
+
+# 뮤직비디오 미리 열기: 가사 모드에서 곡이 시작되면 매칭된 MV 를 비디오 플레이어에
+# 음소거/일시정지 상태로 열어 두어, 비디오 모드로 바꿀 때 setMedia/LoadedMedia 를
+# 기다리지 않게 한다. 프로세스 메모리(RSS)가 상한을 넘으면 열어 둔 MV 를 닫는다.
+log = get_logger("video_preroll")
+
+DEFAULT_MEMORY_CAP_MB = 600
+CHECK_INTERVAL_MS = 5000
+
+
+def windows_rss_bytes():
+    # Windows: GetProcessMemoryInfo 의 WorkingSetSize
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    kernel32 = ctypes.WinDLL("kernel32")
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    psapi = ctypes.WinDLL("psapi")
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+    if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        return None
+    return counters.WorkingSetSize
+
+
+def process_rss_bytes():
+    # 현재 RSS (바이트). 알 수 없으면 None (상한 검사 안 함).
+    # Windows 는 Win32 API, Linux 는 /proc, 그 밖의 POSIX(macOS 등)는 최대 RSS 로 대신한다.
+    try:
+        if sys.platform == "win32":
+            return windows_rss_bytes()
+        if os.path.exists("/proc/self/statm"):
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024  # macOS 는 바이트, 나머지는 KB
+    except Exception as e:
+        log.debug("RSS 를 읽지 못했습니다: %s", e)
+        return None
+
+
+class VideoPreroll(QtCore.QObject):
+    def __init__(self, video_player, memory_cap_mb=DEFAULT_MEMORY_CAP_MB, parent=None):
+        super().__init__(parent)
+        self.video_player = video_player
+        self.memory_cap = memory_cap_mb * 1024 * 1024
+        self.loaded_path = None  # 비디오 플레이어에 현재 열려 있는 MV
+        self.prerolled = False  # loaded_path 가 화면 없이 미리 열어 둔 것인지
+        self.failed = set()
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(CHECK_INTERVAL_MS)
+        self.timer.timeout.connect(self.check_memory)
+        self.warm = 0
+        self.cold = 0
+        self.dropped = 0
+
+    def over_cap(self):
+        if self.memory_cap <= 0:
+            return False
+        rss = process_rss_bytes()
+        return rss is not None and rss > self.memory_cap
+
+    def prepare(self, path):
+        # 가사 모드에서 호출. 이미 열려 있으면 그대로 둔다.
+        if not path or path in self.failed:
+            self.release()
+            return
+        if path == self.loaded_path:
+            self.video_player.setMuted(True)
+            self.video_player.pause()
+            self.prerolled = True
+            return
+        if self.over_cap():
+            self.release()
+            log.info("메모리 상한 초과로 MV 미리 열기 생략: %s", path)
+            return
+        self.video_player.setMuted(True)
+        self.video_player.setMedia(QMediaContent(QtCore.QUrl.fromLocalFile(path)))
+        self.video_player.pause()  # 첫 프레임까지 디코드해 둔다
+        self.loaded_path = path
+        self.prerolled = True
+        self.timer.start()
+        log.debug("MV 미리 열기: %s", path)
+
+    def open(self, path):
+        # 비디오 모드에서 호출. 미리 열어 둔 MV 면 True (setMedia 생략).
+        self.timer.stop()
+        warm = path == self.loaded_path
+        if warm:
+            self.warm += 1
+        else:
+            self.cold += 1
+            self.video_player.setMedia(QMediaContent(QtCore.QUrl.fromLocalFile(path)))
+            self.loaded_path = path
+        self.prerolled = False
+        return warm
+
+    def release(self):
+        self.timer.stop()
+        if self.loaded_path is not None:
+            self.video_player.setMedia(QMediaContent())
+        self.loaded_path = None
+        self.prerolled = False
+
+    def mark_failed(self, path):
+        self.failed.add(path)
+        if path == self.loaded_path:
+            self.release()
+
+    def check_memory(self):
+        if self.prerolled and self.over_cap():
+            log.info("메모리 상한 초과, 미리 열어 둔 MV 닫기: %s", self.loaded_path)
+            self.dropped += 1
+            self.release()
+
+    def stats(self):
+        rss = process_rss_bytes()
+        return {"warm": self.warm, "cold": self.cold, "dropped": self.dropped,
+                "rss_mb": rss // (1024 * 1024) if rss is not None else None}
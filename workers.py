@@ -0,0 +1,15 @@
+from PyQt5 import QtCore
+
+# 파이썬 백그라운드 작업 전용 스레드 풀.
+# Qt 는 QImage 스무스 스케일링 등에 전역 QThreadPool 을 내부적으로 사용한다.
+# GIL 을 필요로 하는 파이썬 QRunnable 이 전역 풀을 모두 차지하면, GIL 을 잡은 채
+# 스케일링을 기다리는 메인 스레드와 교착 상태가 되므로 풀을 분리한다.
+_pool = None
+
+
+def worker_pool():
+    global _pool
+    if _pool is None:
+        _pool = QtCore.QThreadPool()
+        _pool.setMaxThreadCount(max(2, QtCore.QThread.idealThreadCount()))
+    return _pool